@@ -43,47 +43,55 @@ class ExcelDataTransfer:
             with open(json_file, 'r') as f:
                 data = json.load(f)
             
-            # Extract relevant data
-            record = {}
-            
-            # Add form fields
-            if 'form_fields' in data and data['form_fields']:
-                record.update(data['form_fields'])
-            
-            # Add extracted data
-            if 'extracted_data' in data and data['extracted_data']:
-                record.update(data['extracted_data'])
-            
-            # Add metadata
-            if 'metadata' in data:
-                record['filename'] = data['metadata'].get('filename', '')
-                record['extraction_methods'] = ','.join(data['metadata'].get('extraction_methods', []))
-            
-            # Add table data as separate records if present
-            if 'table_data' in data and data['table_data']:
-                for i, table_row in enumerate(data['table_data']):
-                    table_record = record.copy()
-                    table_record.update({f"table_{k}": v for k, v in table_row.items()})
-                    table_record['record_type'] = 'table_row'
-                    table_record['row_number'] = i + 1
-                    self.data.append(table_record)
-                    
-                    # Update columns
-                    self.columns = list(set(self.columns) | set(table_record.keys()))
-            else:
-                # Add as single record
-                record['record_type'] = 'form'
-                self.data.append(record)
-                
-                # Update columns
-                self.columns = list(set(self.columns) | set(record.keys()))
-            
+            self.add_data(data)
             return True
         
         except Exception as e:
             print(f"Error processing JSON file {json_file}: {e}")
             return False
     
+    def add_data(self, data):
+        """
+        Add an already loaded extracted-data record to the dataset.
+        
+        Args:
+            data (dict): Extracted form data in the PDFDataExtractor JSON layout
+        """
+        # Extract relevant data
+        record = {}
+        
+        # Add form fields
+        if 'form_fields' in data and data['form_fields']:
+            record.update(data['form_fields'])
+        
+        # Add extracted data
+        if 'extracted_data' in data and data['extracted_data']:
+            record.update(data['extracted_data'])
+        
+        # Add metadata
+        if 'metadata' in data:
+            record['filename'] = data['metadata'].get('filename', '')
+            record['extraction_methods'] = ','.join(data['metadata'].get('extraction_methods', []))
+        
+        # Add table data as separate records if present
+        if 'table_data' in data and data['table_data']:
+            for i, table_row in enumerate(data['table_data']):
+                table_record = record.copy()
+                table_record.update({f"table_{k}": v for k, v in table_row.items()})
+                table_record['record_type'] = 'table_row'
+                table_record['row_number'] = i + 1
+                self.data.append(table_record)
+                
+                # Update columns
+                self.columns = list(set(self.columns) | set(table_record.keys()))
+        else:
+            # Add as single record
+            record['record_type'] = 'form'
+            self.data.append(record)
+            
+            # Update columns
+            self.columns = list(set(self.columns) | set(record.keys()))
+    
     def add_data_from_directory(self, json_dir):
         """
         Add data from all JSON files in a directory.
@@ -199,13 +207,18 @@ class ExcelDataTransfer:
         """
         Update the tracking spreadsheet with processing status.
         
+        Extracted records are joined against the tracking table on a normalized
+        (trimmed, lower-cased) email address, and every matched row is updated
+        in a single assignment.
+        
         Args:
             tracking_file (str): Path to the tracking spreadsheet
             email_column (str): Column name for email addresses
             status_column (str): Column name for processing status
             
         Returns:
-            bool: True if successful, False otherwise
+            dict: Reconciliation statistics ('matched', 'updated_rows',
+                  'unmatched', 'unmatched_emails'), or False if the update failed
         """
         try:
             # Load tracking spreadsheet
@@ -216,27 +229,48 @@ class ExcelDataTransfer:
                 print(f"Required columns not found in tracking spreadsheet: {email_column}, {status_column}")
                 return False
             
-            # Get emails from processed data
-            processed_emails = set()
-            for record in self.data:
-                if 'email' in record and record['email']:
-                    processed_emails.add(record['email'])
+            # Get normalized emails from processed data
+            processed_df = pd.DataFrame({'email': [record.get('email') for record in self.data]})
+            processed_df['_key'] = normalize_emails(processed_df['email'])
+            processed_df = processed_df.dropna(subset=['_key']).drop_duplicates('_key')
             
-            # Update status for processed emails
-            for email in processed_emails:
-                idx = tracking_df[tracking_df[email_column] == email].index
-                if len(idx) > 0:
-                    tracking_df.loc[idx[0], status_column] = 'Completed'
+            # Join processed emails against the tracking table
+            tracking_keys = pd.DataFrame({'_key': normalize_emails(tracking_df[email_column])})
+            matches = tracking_keys.reset_index().merge(processed_df[['_key']], on='_key', how='inner')
+            
+            # Update status for all matched rows at once
+            if not matches.empty:
+                tracking_df[status_column] = tracking_df[status_column].astype(object)
+                tracking_df.loc[matches['index'], status_column] = 'Completed'
             
             # Save updated tracking spreadsheet
             tracking_df.to_excel(tracking_file, index=False)
             
-            return True
+            unmatched = processed_df[~processed_df['_key'].isin(matches['_key'])]
+            return {
+                'matched': int(matches['_key'].nunique()),
+                'updated_rows': len(matches),
+                'unmatched': len(unmatched),
+                'unmatched_emails': unmatched['email'].tolist()
+            }
         
         except Exception as e:
             print(f"Error updating tracking spreadsheet: {e}")
             return False
 
+def normalize_emails(emails):
+    """
+    Normalize email addresses for matching.
+    
+    Args:
+        emails (pd.Series): Series of email addresses
+        
+    Returns:
+        pd.Series: Trimmed, lower-cased addresses, with blanks as missing values
+    """
+    normalized = emails.astype('string').str.strip().str.lower()
+    return normalized.mask(normalized == '')
+
 def process_extracted_data(input_path, output_file, tracking_file=None):
     """
     Process extracted data from JSON files and transfer to Excel.
@@ -265,6 +299,42 @@ def process_extracted_data(input_path, output_file, tracking_file=None):
             print(f"Failed to process JSON file: {input_path}")
             return None
     
+    return export_transfer(transfer, tracking_file)
+
+def process_extracted_records(records, output_file, tracking_file=None):
+    """
+    Transfer already loaded extracted-data records to Excel.
+    
+    Args:
+        records (iterable): Extracted data dictionaries in the PDFDataExtractor JSON layout
+        output_file (str): Path to save the Excel file
+        tracking_file (str, optional): Path to tracking spreadsheet to update
+        
+    Returns:
+        str: Path to the created Excel file
+    """
+    # Initialize Excel data transfer
+    transfer = ExcelDataTransfer(output_file)
+    
+    record_count = 0
+    for data in records:
+        transfer.add_data(data)
+        record_count += 1
+    print(f"Processed {record_count} extracted records")
+    
+    return export_transfer(transfer, tracking_file)
+
+def export_transfer(transfer, tracking_file=None):
+    """
+    Create the Excel file for a populated transfer and update tracking.
+    
+    Args:
+        transfer (ExcelDataTransfer): Transfer with collected data
+        tracking_file (str, optional): Path to tracking spreadsheet to update
+        
+    Returns:
+        str: Path to the created Excel file
+    """
     # Create Excel file
     excel_file = transfer.create_excel()
     if excel_file:
@@ -272,8 +342,10 @@ def process_extracted_data(input_path, output_file, tracking_file=None):
         
         # Update tracking spreadsheet if provided
         if tracking_file and os.path.exists(tracking_file):
-            if transfer.update_tracking_spreadsheet(tracking_file):
-                print(f"Updated tracking spreadsheet: {tracking_file}")
+            stats = transfer.update_tracking_spreadsheet(tracking_file)
+            if stats:
+                print(f"Updated tracking spreadsheet: {tracking_file} "
+                      f"({stats['matched']} matched, {stats['unmatched']} unmatched)")
             else:
                 print(f"Failed to update tracking spreadsheet: {tracking_file}")
     
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Forms Registry
+
+This script maintains a registry of the form PDFs in the forms directory.
+Forms are identified by filename, and their metadata (size, page count,
+field names and AcroForm field schema, SHA-256 hash) is computed once when a form is added or
+changed and kept in a SQLite file, so listing and lookups never have to
+touch the PDFs. Directory change notifications from watchdog invalidate
+the registry when available; otherwise the directory modification time
+is checked.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pypdf import PdfReader
+
+# Imported as part of the scripts package by the web app, or directly when run as a script
+try:
+    from scripts.pdf_extractor import extract_field_schema
+except ImportError:
+    from pdf_extractor import extract_field_schema
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+class _InvalidateHandler(FileSystemEventHandler):
+    """Marks the registry stale on any change to a PDF in the forms directory."""
+    
+    def __init__(self, registry):
+        self.registry = registry
+    
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(str(path).lower().endswith('.pdf') for path in paths):
+            self.registry.invalidate()
+
+def read_form_metadata(file_path, sha256=None):
+    """
+    Compute the metadata of a form PDF.
+    
+    Args:
+        file_path (str): Path to the PDF file
+        sha256 (str, optional): SHA-256 already computed while the file was written
+    
+    Returns:
+        dict: Page count, field names, field schema and SHA-256 hash; pages is None if the PDF can't be read
+    """
+    if sha256 is None:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+    
+    pages = None
+    schema = {'fingerprint': None, 'fields': []}
+    try:
+        reader = PdfReader(file_path)
+        pages = len(reader.pages)
+        schema = extract_field_schema(reader)
+    except Exception as e:
+        print(f"Error reading form {os.path.basename(file_path)}: {e}")
+    
+    fields = sorted({field['name'] for field in schema['fields']})
+    return {'pages': pages, 'fields': fields, 'schema': schema, 'sha256': sha256}
+
+class FormsRegistry:
+    def __init__(self, forms_dir, db_path=None, watch=False):
+        """
+        Initialize the registry for a directory of form PDFs.
+        
+        Args:
+            forms_dir (str): Directory containing form PDFs
+            db_path (str, optional): Path to the SQLite registry file
+            watch (bool): Watch the directory for changes with watchdog, if installed
+        """
+        self.forms_dir = forms_dir
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.abspath(forms_dir)), 'forms_registry.db')
+        self.lock = threading.Lock()
+        self.forms = None
+        self.dir_mtime = None
+        self.stale = True
+        self.observer = None
+        
+        os.makedirs(self.forms_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        
+        # Create the registry schema if it doesn't exist
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS forms (
+                    id TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    created TEXT NOT NULL,
+                    pages INTEGER,
+                    fields TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    fingerprint TEXT,
+                    schema TEXT
+                )
+            ''')
+            
+            # Registries created before field schemas were stored are re-read on the next scan
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(forms)')}
+            if 'schema' not in columns:
+                conn.execute('ALTER TABLE forms ADD COLUMN fingerprint TEXT')
+                conn.execute('ALTER TABLE forms ADD COLUMN schema TEXT')
+                conn.execute('UPDATE forms SET mtime_ns = 0')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_forms_fingerprint ON forms (fingerprint)')
+        
+        if watch and Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(_InvalidateHandler(self), self.forms_dir, recursive=False)
+            self.observer.daemon = True
+            self.observer.start()
+    
+    def _connect(self):
+        """
+        Open a connection to the registry database.
+        
+        Returns:
+            sqlite3.Connection: Connection with row access by column name
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _to_dict(self, row):
+        """
+        Convert a registry row to the form format.
+        
+        Args:
+            row (sqlite3.Row): Registry row
+        
+        Returns:
+            dict: Form dictionary
+        """
+        return {
+            'id': row['id'],
+            'name': os.path.splitext(row['id'])[0],
+            'path': os.path.join(self.forms_dir, row['id']),
+            'size': row['size'],
+            'created': row['created'],
+            'pages': row['pages'],
+            'fields': json.loads(row['fields']),
+            'sha256': row['sha256']
+        }
+    
+    def _upsert(self, conn, filename, stat_result, sha256=None):
+        """
+        Compute and store the metadata of a form.
+        
+        Args:
+            conn (sqlite3.Connection): Open registry connection
+            filename (str): Form file name
+            stat_result (os.stat_result): File status of the form
+            sha256 (str, optional): Precomputed SHA-256 of the form
+        """
+        metadata = read_form_metadata(os.path.join(self.forms_dir, filename), sha256)
+        conn.execute('''
+            INSERT OR REPLACE INTO forms (id, mtime_ns, size, created, pages, fields, sha256, fingerprint, schema)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            filename,
+            stat_result.st_mtime_ns,
+            stat_result.st_size,
+            datetime.fromtimestamp(stat_result.st_ctime).isoformat(),
+            metadata['pages'],
+            json.dumps(metadata['fields']),
+            metadata['sha256'],
+            metadata['schema']['fingerprint'],
+            json.dumps(metadata['schema'])
+        ))
+    
+    def invalidate(self):
+        """Mark the registry as needing a directory scan."""
+        self.stale = True
+    
+    def refresh(self):
+        """
+        Bring the registry in line with the forms directory.
+        
+        Only forms that are new, or whose modification time or size
+        changed, are read. Rows for deleted forms are removed.
+        
+        Returns:
+            dict: Counts of added/updated and removed forms
+        """
+        results = {'updated': 0, 'removed': 0}
+        
+        with self.lock:
+            self.stale = False
+            self.dir_mtime = os.stat(self.forms_dir).st_mtime_ns
+            
+            with self._connect() as conn:
+                known = {
+                    row['id']: (row['mtime_ns'], row['size'])
+                    for row in conn.execute('SELECT id, mtime_ns, size FROM forms')
+                }
+                
+                seen = set()
+                with os.scandir(self.forms_dir) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith('.pdf') or not entry.is_file():
+                            continue
+                        
+                        seen.add(entry.name)
+                        stat_result = entry.stat()
+                        if known.get(entry.name) != (stat_result.st_mtime_ns, stat_result.st_size):
+                            self._upsert(conn, entry.name, stat_result)
+                            results['updated'] += 1
+                
+                removed = [(form_id,) for form_id in known if form_id not in seen]
+                if removed:
+                    conn.executemany('DELETE FROM forms WHERE id = ?', removed)
+                    results['removed'] = len(removed)
+                
+                self.forms = {row['id']: self._to_dict(row) for row in conn.execute('SELECT * FROM forms ORDER BY id')}
+        
+        return results
+    
+    def _ensure_current(self):
+        """Rescan the directory if it changed since the last scan."""
+        if self.forms is None or self.stale:
+            self.refresh()
+        elif self.observer is None and os.stat(self.forms_dir).st_mtime_ns != self.dir_mtime:
+            self.refresh()
+    
+    def list(self):
+        """
+        Get all registered forms.
+        
+        Returns:
+            list: Form dictionaries, ordered by ID
+        """
+        self._ensure_current()
+        return list(self.forms.values())
+    
+    def count(self):
+        """
+        Get the number of registered forms.
+        
+        Returns:
+            int: Number of forms
+        """
+        self._ensure_current()
+        return len(self.forms)
+    
+    def get(self, form_id):
+        """
+        Look up a form by ID.
+        
+        Args:
+            form_id (str): Form ID (file name)
+        
+        Returns:
+            dict: Form dictionary, or None if not found
+        """
+        self._ensure_current()
+        return self.forms.get(form_id)
+    
+    def get_schema(self, form_id):
+        """
+        Get the AcroForm field schema of a form.
+        
+        Args:
+            form_id (str): Form ID (file name)
+            
+        Returns:
+            dict: Field schema ('fingerprint' and 'fields'), or None if not found
+        """
+        if self.get(form_id) is None:
+            return None
+        
+        with self._connect() as conn:
+            row = conn.execute('SELECT schema FROM forms WHERE id = ?', (form_id,)).fetchone()
+        return json.loads(row['schema']) if row and row['schema'] else None
+    
+    def match_schema(self, fingerprint):
+        """
+        Find the template schema for a filled-in form.
+        
+        Args:
+            fingerprint (str): Fingerprint of the filled-in form
+            
+        Returns:
+            dict: Field schema of the matching template, or None if no template matches
+        """
+        self._ensure_current()
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT schema FROM forms WHERE fingerprint = ? LIMIT 1', (fingerprint,)
+            ).fetchone()
+        return json.loads(row['schema']) if row else None
+    
+    def register(self, file_path, sha256=None):
+        """
+        Add or update a form right after it is written to the forms directory.
+        
+        Args:
+            file_path (str): Path to the form PDF
+            sha256 (str, optional): SHA-256 computed while the form was uploaded
+        
+        Returns:
+            dict: Form dictionary
+        """
+        form_id = os.path.basename(file_path)
+        with self.lock:
+            with self._connect() as conn:
+                self._upsert(conn, form_id, os.stat(file_path), sha256)
+                row = conn.execute('SELECT * FROM forms WHERE id = ?', (form_id,)).fetchone()
+            
+            form = self._to_dict(row)
+            if self.forms is not None:
+                self.forms[form_id] = form
+        return form
+    
+    def remove(self, form_id):
+        """
+        Delete a form and its registry entry.
+        
+        Args:
+            form_id (str): Form ID (file name)
+        
+        Returns:
+            bool: True if the form was deleted, False if not found
+        """
+        form = self.get(form_id)
+        if form is None:
+            return False
+        
+        with self.lock:
+            if os.path.exists(form['path']):
+                os.remove(form['path'])
+            with self._connect() as conn:
+                conn.execute('DELETE FROM forms WHERE id = ?', (form_id,))
+            self.forms.pop(form_id, None)
+        return True
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    if len(sys.argv) < 2:
+        print("Usage: python forms_registry.py <forms_dir> [db_path]")
+        sys.exit(1)
+    
+    registry = FormsRegistry(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    results = registry.refresh()
+    
+    print(f"Registry refreshed: {results['updated']} updated, {results['removed']} removed")
+    for form in registry.list():
+        print(f"  {form['id']}: {form['pages']} pages, {len(form['fields'])} fields, {form['size']} bytes")
@@ -22,6 +22,7 @@ import os
 import sys
 import argparse
 import datetime
+import m365_session
 from email_sender import EmailFormSender
 from tracking_database import TrackingDatabase
 from create_sample_tracking import create_sample_tracking_spreadsheet
@@ -40,25 +41,43 @@ for directory in [DATA_DIR, LOGS_DIR, FORMS_DIR, RETURNED_FORMS_DIR]:
 # Default tracking file
 DEFAULT_TRACKING_FILE = os.path.join(DATA_DIR, 'tracking.xlsx')
 
-def setup_authentication(args):
-    """
-    Set up Microsoft 365 authentication and create tracking database.
+# Microsoft 365 token, shared by all commands
+TOKEN_PATH = os.path.join(DATA_DIR, 'o365_token')
+
+def get_email_sender(args):
     """
-    print("Setting up Microsoft 365 authentication...")
+    Get an email sender on the shared Microsoft 365 session, authenticating if needed.
     
+    Args:
+        args (argparse.Namespace): Command line arguments with client_id and client_secret
+        
+    Returns:
+        EmailFormSender: Authenticated email sender, or None if authentication failed
+    """
     # Get client credentials
     client_id = args.client_id or input("Enter your Microsoft 365 application client ID: ")
     client_secret = args.client_secret or input("Enter your Microsoft 365 application client secret: ")
     
-    # Initialize the email sender
-    sender = EmailFormSender(client_id, client_secret, token_path=os.path.join(DATA_DIR, 'o365_token'))
+    # Later components created without credentials reuse the same session
+    m365_session.configure(client_id, client_secret, TOKEN_PATH)
+    sender = EmailFormSender()
     
     # Authenticate
-    if sender.authenticate():
-        print("Authentication successful!")
-    else:
+    if not sender.authenticate():
         print("Authentication failed. Please check your credentials and try again.")
+        return None
+    return sender
+
+def setup_authentication(args):
+    """
+    Set up Microsoft 365 authentication and create tracking database.
+    """
+    print("Setting up Microsoft 365 authentication...")
+    
+    # Initialize and authenticate the email sender
+    if get_email_sender(args) is None:
         return False
+    print("Authentication successful!")
     
     # Create tracking database
     if args.sample:
@@ -89,16 +108,9 @@ def send_forms(args):
         print(f"Error: Tracking file not found: {tracking_file}")
         return False
     
-    # Get client credentials
-    client_id = args.client_id or input("Enter your Microsoft 365 application client ID: ")
-    client_secret = args.client_secret or input("Enter your Microsoft 365 application client secret: ")
-    
-    # Initialize the email sender
-    sender = EmailFormSender(client_id, client_secret, token_path=os.path.join(DATA_DIR, 'o365_token'))
-    
-    # Authenticate
-    if not sender.authenticate():
-        print("Authentication failed. Please check your credentials and try again.")
+    # Initialize and authenticate the email sender
+    sender = get_email_sender(args)
+    if sender is None:
         return False
     
     # Get email content
@@ -145,16 +157,9 @@ def check_responses(args):
         print(f"Error: Tracking file not found: {tracking_file}")
         return False
     
-    # Get client credentials
-    client_id = args.client_id or input("Enter your Microsoft 365 application client ID: ")
-    client_secret = args.client_secret or input("Enter your Microsoft 365 application client secret: ")
-    
-    # Initialize the email sender
-    sender = EmailFormSender(client_id, client_secret, token_path=os.path.join(DATA_DIR, 'o365_token'))
-    
-    # Authenticate
-    if not sender.authenticate():
-        print("Authentication failed. Please check your credentials and try again.")
+    # Initialize and authenticate the email sender
+    sender = get_email_sender(args)
+    if sender is None:
         return False
     
     # Check for responses
@@ -9,39 +9,501 @@ SharePoint and OneDrive for file storage and retrieval.
 import os
 import sys
 import json
+import gzip
 import time
+import tarfile
+import fnmatch
+import hashlib
+import tempfile
+import itertools
+import posixpath
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
 from datetime import datetime
-from O365 import Account, FileSystemTokenBackend
+from urllib.parse import quote
+from requests.exceptions import HTTPError, ConnectionError, Timeout
 from O365.drive import DriveItem
 
+# Imported as part of the scripts package by the web app, or directly when run as a script
+try:
+    from scripts import m365_session
+except ImportError:
+    import m365_session
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Concurrent uploads per sync
+DEFAULT_UPLOAD_WORKERS = 4
+
+# Throttled (429/503) requests are retried this many times
+MAX_THROTTLE_RETRIES = 5
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Responses that mean a cached folder no longer exists remotely
+MISSING_FOLDER_STATUS_CODES = (404, 410)
+
+# Back-off in seconds when a throttled response has no Retry-After header, doubled per retry
+DEFAULT_RETRY_AFTER = 2
+
+def retry_after_seconds(response, attempt=0):
+    """
+    Get how long to wait before retrying a throttled request.
+    
+    Args:
+        response (requests.Response): Throttled response
+        attempt (int): Number of retries so far
+        
+    Returns:
+        float: Seconds to wait
+    """
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # An HTTP date instead of a number of seconds
+            try:
+                retry_at = parsedate_to_datetime(value)
+                return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    return DEFAULT_RETRY_AFTER * 2 ** attempt
+
+class DriveThrottle:
+    """
+    Shared back-off state for the requests made to one drive.
+    
+    When Graph throttles a request, every thread working on the same
+    drive pauses until the Retry-After time has passed, instead of each
+    one running into the throttling separately.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.resume_at = 0.0
+    
+    def wait(self):
+        """Sleep until the drive is no longer throttled."""
+        while True:
+            with self.lock:
+                delay = self.resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+    
+    def back_off(self, seconds):
+        """
+        Pause all requests to the drive.
+        
+        Args:
+            seconds (float): Seconds from now until requests may resume
+        """
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+    
+    def call(self, func, *args, **kwargs):
+        """
+        Run a Graph call, retrying it after the Retry-After delay while it is throttled.
+        
+        Args:
+            func (callable): Function making the request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The return value of func
+        """
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            self.wait()
+            try:
+                return func(*args, **kwargs)
+            except HTTPError as e:
+                if (e.response is None or e.response.status_code not in THROTTLE_STATUS_CODES
+                        or attempt == MAX_THROTTLE_RETRIES):
+                    raise
+                delay = retry_after_seconds(e.response, attempt)
+                print(f"Throttled by Microsoft Graph, retrying in {delay:g}s")
+                self.back_off(delay)
+
+# Files larger than this are uploaded in chunks through a resumable upload session
+UPLOAD_SESSION_THRESHOLD = 4 * 1024 * 1024
+
+# Upload session chunks must be a multiple of 320 KiB
+CHUNK_SIZE_UNIT = 320 * 1024
+DEFAULT_CHUNK_SIZE = 16 * CHUNK_SIZE_UNIT
+
+# Retries of a chunk after a network error, each after checking what the server received
+MAX_CHUNK_RETRIES = 5
+
+# Sync manifest kept in the synchronized directory in incremental mode
+MANIFEST_NAME = '.sync_manifest.json'
+
+# Manifest of downloaded files, kept in the download directory
+DOWNLOAD_MANIFEST_NAME = '.download_manifest.json'
+
+# Concurrent downloads per bulk download
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Folders of a snapshot backup repository: file contents stored once by SHA-256, and one manifest per snapshot
+BLOBS_FOLDER = 'blobs'
+SNAPSHOTS_FOLDER = 'snapshots'
+
+# Archive backups: file extension and default compression level per compression
+ARCHIVE_EXTENSIONS = {'gzip': '.tar.gz', 'zstd': '.tar.zst'}
+DEFAULT_COMPRESSION_LEVELS = {'gzip': 6, 'zstd': 3}
+
+# Listings request only these fields, a page at a time
+LIST_FIELDS = ('id', 'name', 'size', 'lastModifiedDateTime', 'eTag', 'cTag', 'file', 'folder', 'parentReference', 'webUrl')
+DEFAULT_PAGE_SIZE = 200
+
+def file_sha256(file_path):
+    """
+    Compute the SHA-256 of a file.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def local_file_changed(local_file, entry):
+    """
+    Check a local file against its manifest entry.
+    
+    The size and modification time are compared first; the file is only
+    hashed when they differ, and an entry whose content is unchanged is
+    updated to the new modification time.
+    
+    Args:
+        local_file (str): Path to the local file
+        entry (dict): Manifest entry of the file
+        
+    Returns:
+        bool: True if the content changed since it was synced
+    """
+    stat_result = os.stat(local_file)
+    if entry.get('size') == stat_result.st_size and entry.get('mtime_ns') == stat_result.st_mtime_ns:
+        return False
+    
+    if file_sha256(local_file) != entry.get('sha256'):
+        return True
+    
+    entry['size'] = stat_result.st_size
+    entry['mtime_ns'] = stat_result.st_mtime_ns
+    return False
+
+def split_remote_pattern(remote_path):
+    """
+    Split a remote path into the folder to list and a wildcard pattern below it.
+    
+    Args:
+        remote_path (str): Folder path, optionally with wildcards, e.g. 'Returned/*.pdf'
+        
+    Returns:
+        tuple: (folder path, pattern or None if the path has no wildcards)
+    """
+    parts = [part for part in (remote_path or '').replace('\\', '/').split('/') if part]
+    for i, part in enumerate(parts):
+        if any(char in part for char in '*?['):
+            return '/'.join(parts[:i]), '/'.join(parts[i:])
+    return '/'.join(parts), None
+
+def match_remote_path(rel_path, pattern):
+    """
+    Match a remote path against a wildcard pattern, ignoring case like OneDrive does.
+    
+    Args:
+        rel_path (str): Path relative to the listed folder
+        pattern (str): Pattern; without '/' it is matched against the file name only
+        
+    Returns:
+        bool: True if the path matches
+    """
+    rel_path, pattern = rel_path.lower(), pattern.lower()
+    if '/' not in pattern:
+        return fnmatch.fnmatchcase(posixpath.basename(rel_path), pattern)
+    # A leading **/ also matches files directly in the folder
+    return fnmatch.fnmatchcase(rel_path, pattern) or (
+        pattern.startswith('**/') and fnmatch.fnmatchcase(rel_path, pattern[3:])
+    )
+
+class _CountingWriter:
+    """Write target that only counts the bytes written to it."""
+    
+    def __init__(self):
+        self.size = 0
+    
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+    
+    def flush(self):
+        pass
+
+class _ChunkWriter:
+    """
+    Write target that hands the data on in fixed-size chunks.
+    
+    Only one chunk is held in memory; each full chunk is passed to
+    send(chunk, offset), and the remainder on close().
+    """
+    
+    def __init__(self, chunk_size, send):
+        self.chunk_size = chunk_size
+        self.send = send
+        self.buffer = bytearray()
+        self.offset = 0
+    
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_size:
+            self._send(bytes(self.buffer[:self.chunk_size]))
+            del self.buffer[:self.chunk_size]
+        return len(data)
+    
+    def _send(self, chunk):
+        self.send(chunk, self.offset)
+        self.offset += len(chunk)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        if self.buffer:
+            self._send(bytes(self.buffer))
+            self.buffer = bytearray()
+
+def write_archive(local_dir, output, compression='gzip', level=None, exclude=()):
+    """
+    Write a compressed tar archive of a directory to a file object.
+    
+    The output is deterministic for unchanged files: entries are added in
+    sorted order and the gzip header carries no timestamp, so the archive
+    can be written twice with the same size.
+    
+    Args:
+        local_dir (str): Directory to archive
+        output (file): Writable file object
+        compression (str): 'gzip' or 'zstd'
+        level (int, optional): Compression level, 6 for gzip and 3 for zstd by default
+        exclude (tuple): File names to leave out
+        
+    Returns:
+        int: Number of files archived
+    """
+    if compression not in ARCHIVE_EXTENSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+    
+    level = DEFAULT_COMPRESSION_LEVELS[compression] if level is None else level
+    if compression == 'zstd':
+        compressed = zstandard.ZstdCompressor(level=level).stream_writer(output, closefd=False)
+    else:
+        compressed = gzip.GzipFile(fileobj=output, mode='wb', compresslevel=level, mtime=0)
+    
+    count = 0
+    with compressed:
+        # Stream mode writes each member straight through, in 10 KiB records
+        with tarfile.open(fileobj=compressed, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            for root, dirs, files in os.walk(local_dir):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename in exclude:
+                        continue
+                    local_file = os.path.join(root, filename)
+                    tar.add(local_file, arcname=os.path.relpath(local_file, local_dir).replace('\\', '/'), recursive=False)
+                    count += 1
+    return count
+
+class SyncManifest:
+    """
+    Local record of a directory's synchronized state in cloud storage.
+    
+    For each target (drive and remote folder) the manifest keeps the
+    size, modification time and SHA-256 of every synced file together
+    with its remote item ID, eTag and cTag, and the drive's delta link.
+    """
+    
+    def __init__(self, path):
+        """
+        Load the manifest, starting empty if it doesn't exist or can't be read.
+        
+        Args:
+            path (str): Path to the manifest file
+        """
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {'targets': {}}
+    
+    def target(self, drive, remote_folder):
+        """
+        Get the synchronized state for a remote folder.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            remote_folder (str): Remote folder path
+            
+        Returns:
+            dict: Target state with 'delta_link' and 'files' (relative path -> entry)
+        """
+        key = f"{drive.object_id or 'default'}:{remote_folder.strip('/')}"
+        return self.data['targets'].setdefault(key, {'delta_link': None, 'files': {}})
+    
+    def find(self, drive, remote_file):
+        """
+        Find the manifest entry of a synced remote file.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            remote_file (str): Remote file path
+            
+        Returns:
+            dict: Manifest entry, or None if the file isn't in any synced folder
+        """
+        remote_file = remote_file.strip('/')
+        prefix = f"{drive.object_id or 'default'}:"
+        for key, target in self.data['targets'].items():
+            if not key.startswith(prefix):
+                continue
+            remote_folder = key[len(prefix):]
+            rel_path = remote_file[len(remote_folder) + 1:] if remote_folder else remote_file
+            if (not remote_folder or remote_file.startswith(remote_folder + '/')) and rel_path in target['files']:
+                return target['files'][rel_path]
+        return None
+    
+    def save(self):
+        """Write the manifest atomically."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+class UploadSessionStore:
+    """
+    Upload sessions of unfinished chunked uploads, persisted in a JSON file.
+    
+    An upload interrupted by a network error or a restart is resumed from
+    the session's upload URL as long as the local file is unchanged.
+    """
+    
+    def __init__(self, path):
+        """
+        Initialize the store.
+        
+        Args:
+            path (str): Path to the session state file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+    
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save(self, sessions):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(sessions, f, indent=2)
+        os.replace(temp_path, self.path)
+    
+    def get(self, key):
+        """
+        Get a saved upload session.
+        
+        Args:
+            key (str): Upload key
+            
+        Returns:
+            dict: Session state, or None if there is none
+        """
+        with self.lock:
+            return self._load().get(key)
+    
+    def put(self, key, session):
+        """
+        Save an upload session.
+        
+        Args:
+            key (str): Upload key
+            session (dict): Session state
+        """
+        with self.lock:
+            sessions = self._load()
+            sessions[key] = session
+            self._save(sessions)
+    
+    def remove(self, key):
+        """
+        Forget an upload session.
+        
+        Args:
+            key (str): Upload key
+        """
+        with self.lock:
+            sessions = self._load()
+            if sessions.pop(key, None) is not None:
+                self._save(sessions)
+
 class SharePointOneDriveIntegration:
-    def __init__(self, client_id, client_secret, token_path='./o365_token'):
+    def __init__(self, client_id=None, client_secret=None, token_path=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, session_threshold=UPLOAD_SESSION_THRESHOLD):
         """
         Initialize the SharePoint/OneDrive integration with Microsoft 365 credentials.
         
         Args:
-            client_id (str): Microsoft 365 application client ID
-            client_secret (str): Microsoft 365 application client secret
-            token_path (str): Path to store authentication tokens
+            client_id (str, optional): Microsoft 365 application client ID, the configured session's by default
+            client_secret (str, optional): Microsoft 365 application client secret
+            token_path (str, optional): Path to store authentication tokens
+            chunk_size (int): Chunk size for upload sessions, rounded down to a multiple of 320 KiB
+            session_threshold (int): Files larger than this many bytes are uploaded in resumable sessions
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_path = token_path
         
-        # Ensure token directory exists
-        os.makedirs(os.path.dirname(token_path), exist_ok=True)
+        # Use the shared Microsoft 365 session for these credentials
+        self.account = m365_session.get_account(client_id, client_secret, token_path)
+        self.token_backend = self.account.con.token_backend
         
-        # Set up authentication with Microsoft 365
-        self.token_backend = FileSystemTokenBackend(token_path=token_path)
-        self.account = Account((client_id, client_secret), token_backend=self.token_backend)
-        
-        # Define required scopes for SharePoint/OneDrive access
-        self.scopes = ['offline_access', 'files.readwrite.all', 'sites.readwrite.all']
+        # Request the scopes of all components, so the shared token also serves the email sender
+        self.scopes = m365_session.SCOPES
         
         # Initialize storage locations
         self.onedrive = None
         self.sharepoint_site = None
         self.sharepoint_drive = None
+        
+        # Remote folders resolved so far, per drive: normalized path -> Future of the folder DriveItem
+        self.folder_cache = {}
+        self.folder_lock = threading.Lock()
+        
+        # Throttling state per drive, shared by concurrent uploads
+        self.throttles = {}
+        
+        # Chunked uploads, with session state kept next to the token so they can be resumed
+        self.chunk_size = max(CHUNK_SIZE_UNIT, chunk_size - chunk_size % CHUNK_SIZE_UNIT)
+        self.session_threshold = session_threshold
+        self.upload_sessions = UploadSessionStore(
+            os.path.join(os.path.dirname(str(self.token_backend.token_path)), 'upload_sessions.json')
+        )
     
     def authenticate(self):
         """
@@ -50,11 +512,7 @@ class SharePointOneDriveIntegration:
         Returns:
             bool: True if authentication is successful, False otherwise
         """
-        if not self.account.is_authenticated:
-            # Initiate authentication flow
-            result = self.account.authenticate(scopes=self.scopes)
-            return result
-        return True
+        return m365_session.authenticate(self.account, self.scopes)
     
     def connect_to_onedrive(self):
         """
@@ -64,8 +522,8 @@ class SharePointOneDriveIntegration:
             bool: True if connection is successful, False otherwise
         """
         try:
-            # Get OneDrive instance
-            self.onedrive = self.account.storage()
+            # Get the default OneDrive drive
+            self.onedrive = self.account.storage().get_default_drive()
             return self.onedrive is not None
         except Exception as e:
             print(f"Error connecting to OneDrive: {e}")
@@ -99,13 +557,517 @@ class SharePointOneDriveIntegration:
             print(f"Error connecting to SharePoint: {e}")
             return False
     
-    def upload_file_to_onedrive(self, local_file, remote_folder=None):
+    def _get_drive(self, use_sharepoint=False):
+        """
+        Get the drive to work with, connecting to OneDrive if needed.
+        
+        Args:
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            
+        Returns:
+            Drive: Connected drive, or None if not connected
+        """
+        if use_sharepoint:
+            if not self.sharepoint_drive:
+                print("Not connected to SharePoint")
+            return self.sharepoint_drive
+        
+        if not self.onedrive:
+            self.connect_to_onedrive()
+        return self.onedrive
+    
+    @staticmethod
+    def _drive_url(drive, endpoint):
+        """
+        Build a Graph URL relative to a drive.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            endpoint (str): Endpoint below the drive, e.g. '/root/delta'
+            
+        Returns:
+            str: Full URL
+        """
+        return drive.build_url((f"/drives/{drive.object_id}" if drive.object_id else '/drive') + endpoint)
+    
+    def _throttle(self, drive):
+        """
+        Get the throttling state of a drive.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            
+        Returns:
+            DriveThrottle: Throttle shared by all requests to the drive
+        """
+        with self.folder_lock:
+            return self.throttles.setdefault(drive.object_id or 'default', DriveThrottle())
+    
+    def _resolve_folder(self, drive, remote_folder=None, create=True):
+        """
+        Get a remote folder by path, creating missing folders if requested.
+        
+        Resolved folders are cached per drive, so each folder costs at most
+        one path lookup (plus one create call per missing folder) for the
+        lifetime of this integration object. The first caller for a path
+        resolves it; concurrent callers for the same path wait for its
+        result, and callers for other paths aren't blocked.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            remote_folder (str, optional): Folder path, None for the root folder
+            create (bool): Whether to create the folder and its parents if missing
+            
+        Returns:
+            DriveItem: Folder item, or None if it doesn't exist and create is False
+        """
+        path = '/'.join(part for part in (remote_folder or '').replace('\\', '/').split('/') if part)
+        
+        # The lock only guards the cache, never a Graph request
+        with self.folder_lock:
+            cache = self.folder_cache.setdefault(drive.object_id or 'default', {})
+            pending = cache.get(path)
+            if pending is None:
+                pending = cache[path] = Future()
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            folder = pending.result()
+            if folder is None and create:
+                # The lookup didn't create the folder; resolve it again
+                return self._resolve_folder(drive, remote_folder, create)
+            return folder
+        
+        try:
+            folder = self._lookup_folder(drive, path, create)
+        except BaseException as e:
+            self._forget_folder(drive, path, pending)
+            pending.set_exception(e)
+            raise
+        
+        # Missing folders aren't cached, so they can still be created later
+        if folder is None:
+            self._forget_folder(drive, path, pending)
+        pending.set_result(folder)
+        return folder
+    
+    def _lookup_folder(self, drive, path, create):
+        """
+        Look up a remote folder by normalized path, creating it if requested.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            path (str): Normalized folder path, empty for the root folder
+            create (bool): Whether to create the folder and its parents if missing
+            
+        Returns:
+            DriveItem: Folder item, or None if it doesn't exist and create is False
+        """
+        throttle = self._throttle(drive)
+        if not path:
+            return throttle.call(drive.get_root_folder)
+        
+        try:
+            folder = throttle.call(drive.get_item_by_path, '/' + path)
+        except HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            folder = None
+        
+        if folder is not None and not folder.is_folder:
+            print(f"Remote path is not a folder: {path}")
+            return None
+        
+        if folder is None and create:
+            # Parents are resolved (and cached) first, then the missing folder is created
+            parent = self._resolve_folder(drive, posixpath.dirname(path), create)
+            try:
+                folder = throttle.call(parent.create_child_folder, posixpath.basename(path)) if parent else None
+            except HTTPError as e:
+                # The cached parent may have been removed remotely
+                if e.response is not None and e.response.status_code in MISSING_FOLDER_STATUS_CODES:
+                    self._forget_folder(drive, posixpath.dirname(path))
+                raise
+        
+        return folder
+    
+    def _forget_folder(self, drive, remote_folder, pending=None):
+        """
+        Drop a folder path from the cache.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            remote_folder (str): Folder path, None for the root folder
+            pending (Future, optional): Only drop the entry if it is still this one
+        """
+        path = '/'.join(part for part in (remote_folder or '').replace('\\', '/').split('/') if part)
+        with self.folder_lock:
+            cache = self.folder_cache.get(drive.object_id or 'default', {})
+            if path in cache and (pending is None or cache[path] is pending):
+                del cache[path]
+    
+    def clear_folder_cache(self):
+        """
+        Forget resolved remote folders, e.g. after folders were moved or deleted remotely.
+        """
+        with self.folder_lock:
+            self.folder_cache = {}
+    
+    def _upload(self, drive, local_file, remote_folder=None, remote_name=None):
+        """
+        Upload a file to a drive folder, creating the folder path if it doesn't exist.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            local_file (str): Path to the local file
+            remote_folder (str, optional): Remote folder path
+            remote_name (str, optional): Remote file name, the local file name by default
+            
+        Returns:
+            DriveItem: Uploaded file, or None if the upload failed
+        """
+        folder = self._resolve_folder(drive, remote_folder)
+        if not folder:
+            raise RuntimeError(f"Could not create folder: {remote_folder}")
+        
+        try:
+            if os.path.getsize(local_file) > self.session_threshold:
+                return self._upload_in_session(drive, folder, local_file, remote_name)
+            return self._throttle(drive).call(folder.upload_file, local_file, item_name=remote_name)
+        except HTTPError as e:
+            # The cached folder may have been removed remotely
+            if e.response is not None and e.response.status_code in MISSING_FOLDER_STATUS_CODES:
+                self._forget_folder(drive, remote_folder)
+            raise
+    
+    def _upload_in_session(self, drive, folder, local_file, remote_name=None):
+        """
+        Upload a large file in chunks through a resumable upload session.
+        
+        The session's upload URL is saved before the first chunk is sent.
+        After a network error, or when the same unchanged file is uploaded
+        again after an interruption, the server is asked which byte ranges
+        it still expects and the upload continues from there.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            folder (DriveItem): Destination folder
+            local_file (str): Path to the local file
+            remote_name (str, optional): Remote file name, the local file name by default
+            
+        Returns:
+            DriveItem: Uploaded file
+        """
+        file_name = remote_name or os.path.basename(local_file)
+        stat_result = os.stat(local_file)
+        size = stat_result.st_size
+        key = f"{drive.object_id or 'default'}:{folder.object_id}:{file_name}:{os.path.abspath(local_file)}"
+        
+        # Resume a saved session for the same, unchanged file
+        offset = 0
+        session = self.upload_sessions.get(key)
+        if session and (session['size'], session['mtime_ns']) == (size, stat_result.st_mtime_ns):
+            try:
+                offset = self._expected_offset(drive, session['upload_url'])
+                print(f"Resuming upload of {file_name} at byte {offset} of {size}")
+            except HTTPError:
+                # The session expired or was cancelled
+                session = None
+        else:
+            session = None
+        
+        if session is None:
+            upload_url = self._create_upload_session(drive, folder, file_name)
+            session = {'upload_url': upload_url, 'size': size, 'mtime_ns': stat_result.st_mtime_ns}
+            self.upload_sessions.put(key, session)
+        
+        with open(local_file, 'rb') as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                response = self._send_chunk(drive, session['upload_url'], chunk, offset, size, file_name)
+                if response.status_code in (200, 201):
+                    break
+                offset += len(chunk)
+        
+        self.upload_sessions.remove(key)
+        data = response.json()
+        return folder._classifier(data)(parent=folder, **{folder._cloud_data_key: data})
+    
+    def _create_upload_session(self, drive, folder, file_name):
+        """
+        Start an upload session that replaces any existing file of the same name.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            folder (DriveItem): Destination folder
+            file_name (str): Remote file name
+            
+        Returns:
+            str: Pre-authenticated upload URL
+        """
+        url = folder.build_url(f"/items/{folder.object_id}:/{quote(file_name)}:/createUploadSession")
+        data = self._throttle(drive).call(
+            drive.con.post, url, data={'item': {'@microsoft.graph.conflictBehavior': 'replace'}}
+        ).json()
+        return data['uploadUrl']
+    
+    def _expected_offset(self, drive, upload_url):
+        """
+        Ask an upload session which byte it expects next.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            upload_url (str): Upload URL of the session
+            
+        Returns:
+            int: The first byte of the first range the server still expects
+        """
+        status = self._throttle(drive).call(drive.con.naive_request, upload_url, 'GET').json()
+        ranges = status.get('nextExpectedRanges') or ['0-']
+        return int(ranges[0].split('-')[0])
+    
+    def _send_chunk(self, drive, upload_url, chunk, offset, size, file_name):
+        """
+        Send one chunk of an upload session, until the server has all of it.
+        
+        After a network error the server is asked which byte it expects
+        next, and only the rest of the chunk is sent again.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            upload_url (str): Upload URL of the session
+            chunk (bytes): Chunk data
+            offset (int): Position of the chunk in the file
+            size (int): Total file size
+            file_name (str): File name, for messages
+            
+        Returns:
+            requests.Response: Response to the last request; 200 or 201 once the file is complete
+        """
+        throttle = self._throttle(drive)
+        end = offset + len(chunk)
+        position = offset
+        retries = 0
+        while True:
+            data = chunk[position - offset:]
+            headers = {
+                'Content-type': 'application/octet-stream',
+                'Content-Length': str(len(data)),
+                'Content-Range': f"bytes {position}-{end - 1}/{size}"
+            }
+            
+            try:
+                # Upload URLs are pre-authenticated, so the request goes without the token
+                response = throttle.call(drive.con.naive_request, upload_url, 'PUT', data=data, headers=headers)
+            except (ConnectionError, Timeout) as e:
+                retries += 1
+                if retries > MAX_CHUNK_RETRIES:
+                    raise
+                print(f"Error uploading {file_name} at byte {position}, retrying: {e}")
+                time.sleep(DEFAULT_RETRY_AFTER * 2 ** (retries - 1))
+                position = self._expected_offset(drive, upload_url)
+            else:
+                if response.status_code in (200, 201):
+                    return response
+                position = int((response.json().get('nextExpectedRanges') or [f"{end}-"])[0].split('-')[0])
+            
+            if position >= end:
+                return response
+            if position < offset:
+                raise RuntimeError(f"Upload session of {file_name} lost data before byte {offset}")
+    
+    def upload_archive(self, local_dir, remote_folder, archive_name=None, use_sharepoint=False,
+                       compression='gzip', level=None):
+        """
+        Upload a directory as one compressed tar archive.
+        
+        The archive is streamed into an upload session chunk by chunk, so
+        neither the archive nor a temporary copy of it is ever stored. Upload
+        sessions need the total size up front, so the archive is compressed
+        once to measure it and a second time while uploading.
+        
+        Args:
+            local_dir (str): Local directory to archive
+            remote_folder (str): Remote folder path
+            archive_name (str, optional): Archive file name, <directory name> plus the extension by default
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            compression (str): 'gzip' or 'zstd' (requires the zstandard package)
+            level (int, optional): Compression level, 6 for gzip and 3 for zstd by default
+            
+        Returns:
+            DriveItem: Uploaded archive
+        """
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            raise RuntimeError("Not connected to cloud storage")
+        
+        archive_name = archive_name or os.path.basename(os.path.normpath(local_dir)) + ARCHIVE_EXTENSIONS[compression]
+        exclude = (MANIFEST_NAME,)
+        
+        counter = _CountingWriter()
+        write_archive(local_dir, counter, compression, level, exclude)
+        size = counter.size
+        
+        folder = self._resolve_folder(drive, remote_folder)
+        if not folder:
+            raise RuntimeError(f"Could not create folder: {remote_folder}")
+        upload_url = self._create_upload_session(drive, folder, archive_name)
+        
+        responses = []
+        
+        def send(chunk, offset):
+            if offset + len(chunk) > size:
+                raise RuntimeError("files changed while the archive was uploaded")
+            responses.append(self._send_chunk(drive, upload_url, chunk, offset, size, archive_name))
+        
+        try:
+            writer = _ChunkWriter(self.chunk_size, send)
+            write_archive(local_dir, writer, compression, level, exclude)
+            writer.close()
+            if writer.offset != size or responses[-1].status_code not in (200, 201):
+                raise RuntimeError("files changed while the archive was uploaded")
+        except Exception:
+            # Cancel the session so the partial upload is discarded
+            try:
+                drive.con.naive_request(upload_url, 'DELETE')
+            except Exception:
+                pass
+            raise
+        
+        data = responses[-1].json()
+        return folder._classifier(data)(parent=folder, **{folder._cloud_data_key: data})
+    
+    def _share_link(self, drive, item):
+        """
+        Create a view-only sharing link for a remote item.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            item (DriveItem): Remote item
+            
+        Returns:
+            str: Sharing link
+        """
+        permission = self._throttle(drive).call(item.share_with_link, share_type='view')
+        return permission.share_link
+    
+    def get_share_link(self, remote_file, use_sharepoint=False, local_dir=None, manifest_path=None):
+        """
+        Get a view-only sharing link for a remote file, creating it on first request.
+        
+        When the file was synced from local_dir, the link is cached in the
+        sync manifest and the manifest's item ID saves the path lookup.
+        
+        Args:
+            remote_file (str): Path to the remote file
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            local_dir (str, optional): Local directory the file was synced from
+            manifest_path (str, optional): Manifest file, .sync_manifest.json in local_dir by default
+            
+        Returns:
+            str: Sharing link, or None if the file doesn't exist or the link couldn't be created
+        """
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return None
+        
+        manifest = entry = None
+        if local_dir or manifest_path:
+            manifest = SyncManifest(manifest_path or os.path.join(local_dir, MANIFEST_NAME))
+            entry = manifest.find(drive, remote_file)
+            if entry and entry.get('share_link'):
+                return entry['share_link']
+        
+        try:
+            throttle = self._throttle(drive)
+            if entry and entry.get('item_id'):
+                item = throttle.call(drive.get_item, entry['item_id'])
+            else:
+                item = throttle.call(drive.get_item_by_path, '/' + remote_file.strip('/'))
+            if not item:
+                print(f"File not found: {remote_file}")
+                return None
+            
+            link = self._share_link(drive, item)
+        except Exception as e:
+            print(f"Error creating sharing link for {remote_file}: {e}")
+            return None
+        
+        if entry is not None:
+            entry['share_link'] = link
+            manifest.save()
+        return link
+    
+    def _delete_item(self, drive, item_id):
+        """
+        Delete a remote item by ID.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            item_id (str): Remote item ID
+            
+        Returns:
+            bool: True if the item was deleted or no longer exists
+        """
+        try:
+            self._throttle(drive).call(drive.con.delete, self._drive_url(drive, f"/items/{item_id}"))
+            return True
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return True
+            print(f"Error deleting remote item {item_id}: {e}")
+        except Exception as e:
+            print(f"Error deleting remote item {item_id}: {e}")
+        return False
+    
+    def _drive_content(self, drive, item_id):
+        """
+        Request the content of a remote file as a stream.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            item_id (str): Remote file ID
+            
+        Returns:
+            requests.Response: Streamed response, to be used as a context manager
+        """
+        return self._throttle(drive).call(drive.con.get, self._drive_url(drive, f"/items/{item_id}/content"), stream=True)
+    
+    def _download(self, drive, item_id, local_file):
+        """
+        Stream a remote file to disk.
+        
+        The file is written next to its destination and moved into place
+        once complete, so an interrupted download never leaves a partial file.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            item_id (str): Remote file ID
+            local_file (str): Path to save the file
+        """
+        directory = os.path.dirname(os.path.abspath(local_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(dir=directory, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as f, self._drive_content(drive, item_id) as response:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
+            os.replace(temp_file, local_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    
+    def upload_file_to_onedrive(self, local_file, remote_folder=None, share=True):
         """
         Upload a file to OneDrive.
         
         Args:
             local_file (str): Path to the local file
             remote_folder (str, optional): Remote folder path in OneDrive
+            share (bool): Return a view-only sharing link instead of the file's web URL
             
         Returns:
             str: URL of the uploaded file, or None if upload failed
@@ -115,39 +1077,12 @@ class SharePointOneDriveIntegration:
                 return None
         
         try:
-            # Get root folder or specified folder
-            if remote_folder:
-                # Create folder path if it doesn't exist
-                current_folder = self.onedrive.get_root_folder()
-                for folder_name in remote_folder.strip('/').split('/'):
-                    if not folder_name:
-                        continue
-                    
-                    # Check if folder exists
-                    folder_items = current_folder.get_items()
-                    folder_exists = False
-                    for item in folder_items:
-                        if item.is_folder and item.name == folder_name:
-                            current_folder = item
-                            folder_exists = True
-                            break
-                    
-                    # Create folder if it doesn't exist
-                    if not folder_exists:
-                        current_folder = current_folder.create_folder(folder_name)
-                
-                folder = current_folder
-            else:
-                folder = self.onedrive.get_root_folder()
-            
-            # Upload file
-            file_name = os.path.basename(local_file)
-            uploaded_file = folder.upload_file(local_file)
+            # Upload file to the root folder or specified folder
+            uploaded_file = self._upload(self.onedrive, local_file, remote_folder)
             
             if uploaded_file:
                 # Get sharing link
-                permission = uploaded_file.share_with_link(edit=False)
-                return permission.share_link
+                return self._share_link(self.onedrive, uploaded_file) if share else uploaded_file.web_url
             
             return None
         
@@ -155,13 +1090,14 @@ class SharePointOneDriveIntegration:
             print(f"Error uploading file to OneDrive: {e}")
             return None
     
-    def upload_file_to_sharepoint(self, local_file, remote_folder=None):
+    def upload_file_to_sharepoint(self, local_file, remote_folder=None, share=True):
         """
         Upload a file to SharePoint.
         
         Args:
             local_file (str): Path to the local file
             remote_folder (str, optional): Remote folder path in SharePoint
+            share (bool): Return a view-only sharing link instead of the file's web URL
             
         Returns:
             str: URL of the uploaded file, or None if upload failed
@@ -171,39 +1107,12 @@ class SharePointOneDriveIntegration:
             return None
         
         try:
-            # Get root folder or specified folder
-            if remote_folder:
-                # Create folder path if it doesn't exist
-                current_folder = self.sharepoint_drive.get_root_folder()
-                for folder_name in remote_folder.strip('/').split('/'):
-                    if not folder_name:
-                        continue
-                    
-                    # Check if folder exists
-                    folder_items = current_folder.get_items()
-                    folder_exists = False
-                    for item in folder_items:
-                        if item.is_folder and item.name == folder_name:
-                            current_folder = item
-                            folder_exists = True
-                            break
-                    
-                    # Create folder if it doesn't exist
-                    if not folder_exists:
-                        current_folder = current_folder.create_folder(folder_name)
-                
-                folder = current_folder
-            else:
-                folder = self.sharepoint_drive.get_root_folder()
-            
-            # Upload file
-            file_name = os.path.basename(local_file)
-            uploaded_file = folder.upload_file(local_file)
+            # Upload file to the root folder or specified folder
+            uploaded_file = self._upload(self.sharepoint_drive, local_file, remote_folder)
             
             if uploaded_file:
                 # Get sharing link
-                permission = uploaded_file.share_with_link(edit=False)
-                return permission.share_link
+                return self._share_link(self.sharepoint_drive, uploaded_file) if share else uploaded_file.web_url
             
             return None
         
@@ -245,102 +1154,414 @@ class SharePointOneDriveIntegration:
         Download a file from SharePoint.
         
         Args:
-            remote_file (str): Path to the remote file in SharePoint
-            local_file (str): Path to save the local file
+            remote_file (str): Path to the remote file in SharePoint
+            local_file (str): Path to save the local file
+            
+        Returns:
+            bool: True if download is successful, False otherwise
+        """
+        if not self.sharepoint_drive:
+            print("Not connected to SharePoint")
+            return False
+        
+        try:
+            # Get file by path
+            drive_item = self.sharepoint_drive.get_item_by_path(remote_file)
+            if not drive_item:
+                print(f"File not found in SharePoint: {remote_file}")
+                return False
+            
+            # Download file
+            return drive_item.download(local_file)
+        
+        except Exception as e:
+            print(f"Error downloading file from SharePoint: {e}")
+            return False
+    
+    def download_files(self, remote_path, local_dir, use_sharepoint=False, recursive=False,
+                       max_workers=DEFAULT_DOWNLOAD_WORKERS, manifest_path=None):
+        """
+        Download the files of a remote folder, or those matching a wildcard pattern.
+        
+        Files are streamed to disk concurrently. A manifest in local_dir
+        records each file's eTag, so files unchanged remotely whose local
+        copy is untouched are skipped on the next download. If the listing
+        fails part way, it counts as a failed file and its message is
+        returned in 'error'; files listed before the failure are still
+        downloaded.
+        
+        Args:
+            remote_path (str): Remote folder, or a pattern such as 'Returned/*.pdf';
+                a pattern containing '/' is matched against paths below the folder
+            local_dir (str): Local directory to download into, keeping the remote folder structure
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            recursive (bool): Include files in subfolders
+            max_workers (int): Number of concurrent downloads
+            manifest_path (str, optional): Manifest file, .download_manifest.json in local_dir by default
+            
+        Returns:
+            dict: Dictionary with download results, including the paths of the downloaded files
+        """
+        results = {
+            'total_files': 0,
+            'downloaded_files': 0,
+            'failed_files': 0,
+            'skipped_files': 0,
+            'downloaded_paths': []
+        }
+        
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return results
+        
+        remote_folder, pattern = split_remote_pattern(remote_path)
+        if pattern and ('/' in pattern or '**' in pattern):
+            recursive = True
+        
+        os.makedirs(local_dir, exist_ok=True)
+        manifest = SyncManifest(manifest_path or os.path.join(local_dir, DOWNLOAD_MANIFEST_NAME))
+        target = manifest.target(drive, remote_folder)
+        
+        def download(item, local_file):
+            self._download(drive, item['id'], local_file)
+            return os.stat(local_file)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {}
+            
+            # Downloads start while the listing is still being read
+            try:
+                for item in self.iter_files(remote_folder, use_sharepoint, recursive=recursive):
+                    rel_path = item['path']
+                    if pattern and not match_remote_path(rel_path, pattern):
+                        continue
+                    
+                    results['total_files'] += 1
+                    local_file = os.path.join(local_dir, *rel_path.split('/'))
+                    
+                    entry = target['files'].get(rel_path)
+                    if entry and item['etag'] and entry.get('etag') == item['etag'] and os.path.isfile(local_file):
+                        stat_result = os.stat(local_file)
+                        if (stat_result.st_size, stat_result.st_mtime_ns) == (entry['size'], entry['mtime_ns']):
+                            results['skipped_files'] += 1
+                            continue
+                    
+                    futures[executor.submit(download, item, local_file)] = (item, rel_path, local_file)
+            except Exception as e:
+                results['failed_files'] += 1
+                results['error'] = f"Error listing {remote_folder or '/'}: {e}"
+                print(results['error'])
+            
+            for future in as_completed(futures):
+                item, rel_path, local_file = futures[future]
+                try:
+                    stat_result = future.result()
+                except Exception as e:
+                    results['failed_files'] += 1
+                    print(f"Error downloading {rel_path}: {e}")
+                    continue
+                
+                target['files'][rel_path] = {
+                    'size': stat_result.st_size,
+                    'mtime_ns': stat_result.st_mtime_ns,
+                    'item_id': item['id'],
+                    'etag': item['etag'],
+                    'ctag': item['ctag']
+                }
+                results['downloaded_files'] += 1
+                results['downloaded_paths'].append(local_file)
+                print(f"Downloaded: {rel_path}")
+        
+        manifest.save()
+        return results
+    
+    def list_files_in_onedrive(self, remote_folder=None):
+        """
+        List files in an OneDrive folder.
+        
+        The folder is read through iter_files, page by page with only the
+        fields in LIST_FIELDS. Use iter_files directly for large folders.
+        
+        Args:
+            remote_folder (str, optional): Remote folder path in OneDrive
+            
+        Returns:
+            list: Items in the folder, as yielded by iter_files
+        """
+        try:
+            return list(self.iter_files(remote_folder, include_folders=True))
+        except Exception as e:
+            print(f"Error listing files in OneDrive: {e}")
+            return []
+    
+    def list_files_in_sharepoint(self, remote_folder=None):
+        """
+        List files in a SharePoint folder.
+        
+        The folder is read through iter_files, page by page with only the
+        fields in LIST_FIELDS. Use iter_files directly for large folders.
+        
+        Args:
+            remote_folder (str, optional): Remote folder path in SharePoint
+            
+        Returns:
+            list: Items in the folder, as yielded by iter_files
+        """
+        try:
+            return list(self.iter_files(remote_folder, use_sharepoint=True, include_folders=True))
+        except Exception as e:
+            print(f"Error listing files in SharePoint: {e}")
+            return []
+    
+    def _iter_pages(self, drive, folder_id, fields=LIST_FIELDS, page_size=DEFAULT_PAGE_SIZE, delta=False):
+        """
+        Yield the items of a folder listing or delta feed, one page in memory at a time.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            folder_id (str): Folder item ID
+            fields (tuple): Fields to request
+            page_size (int): Items per page
+            delta (bool): Read the folder's delta feed, which covers all descendants, instead of its children
+            
+        Yields:
+            dict: Item data as returned by Graph
+        """
+        throttle = self._throttle(drive)
+        url = self._drive_url(drive, f"/items/{folder_id}/{'delta' if delta else 'children'}")
+        params = {'$select': ','.join(fields), '$top': page_size}
+        while url:
+            data = throttle.call(drive.con.get, url, params=params).json()
+            yield from data.get('value', [])
+            
+            # The next link already carries the query
+            url = data.get('@odata.nextLink')
+            params = None
+    
+    def _iter_tree(self, drive, folder, page_size):
+        """
+        Yield all items below a folder from the delta feed, with their paths.
+        
+        Delta items don't carry parent paths, so paths are rebuilt from the
+        folders seen so far. OneDrive for Business and SharePoint only serve
+        the delta feed of the root folder; for other folders the root feed
+        is read and items outside the folder are dropped.
+        
+        Args:
+            drive (Drive): OneDrive or SharePoint drive
+            folder (DriveItem): Folder to list
+            page_size (int): Items per page
+            
+        Yields:
+            dict: Item data, with 'path' relative to the folder
+        """
+        fields = LIST_FIELDS + ('deleted', 'root')
+        root = self._resolve_folder(drive, create=False)
+        feed = self._iter_pages(drive, folder.object_id, fields, page_size, delta=True)
+        try:
+            first = next(feed, None)
+        except HTTPError as e:
+            if folder.object_id == root.object_id or e.response is None or e.response.status_code not in (400, 403, 404, 501):
+                raise
+            feed = self._iter_pages(drive, root.object_id, fields, page_size, delta=True)
+            first = next(feed, None)
+        
+        # Folder ID -> path below the listed folder, None for folders outside it
+        folders = {folder.object_id: ''}
+        # Items whose parent folder hasn't been seen yet, by parent ID
+        pending = {}
+        
+        def place(item):
+            parent = folders[item['parentReference']['id']]
+            if parent is None:
+                if 'folder' in item:
+                    folders[item['id']] = None
+                    for child in pending.pop(item['id'], []):
+                        yield from place(child)
+                return
+            
+            item['path'] = posixpath.join(parent, item['name'])
+            if 'folder' in item:
+                folders[item['id']] = item['path']
+            yield item
+            for child in pending.pop(item['id'], []):
+                yield from place(child)
+        
+        for item in itertools.chain([first] if first else [], feed):
+            if 'deleted' in item or item['id'] == folder.object_id:
+                continue
+            
+            parent_id = (item.get('parentReference') or {}).get('id')
+            if 'root' in item or parent_id is None:
+                folders.setdefault(item['id'], None)
+            elif parent_id in folders:
+                yield from place(item)
+            else:
+                pending.setdefault(parent_id, []).append(item)
+    
+    def iter_files(self, remote_folder=None, use_sharepoint=False, recursive=False, extensions=None,
+                   modified_since=None, include_folders=False, page_size=DEFAULT_PAGE_SIZE):
+        """
+        List a remote folder lazily, one page in memory at a time.
+        
+        Only the fields in LIST_FIELDS are requested. Recursive listings
+        read the folder's delta feed, which returns the whole tree in far
+        fewer requests than walking it folder by folder.
+        
+        Errors while reading the listing are raised to the caller, so a
+        listing cut short is never mistaken for a complete one.
+        
+        Args:
+            remote_folder (str, optional): Remote folder path, None for the root folder
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            recursive (bool): Include the contents of subfolders
+            extensions (tuple, optional): Only files with these extensions, e.g. ('.pdf',)
+            modified_since (datetime, optional): Only files modified after this time; naive times are local
+            include_folders (bool): Yield folders as well as files; the filters apply to files only
+            page_size (int): Items per request
             
-        Returns:
-            bool: True if download is successful, False otherwise
+        Yields:
+            dict: Item with id, name, path (relative to the folder), size, modified,
+                is_folder, etag, ctag and web_url
         """
-        if not self.sharepoint_drive:
-            print("Not connected to SharePoint")
-            return False
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return
         
-        try:
-            # Get file by path
-            drive_item = self.sharepoint_drive.get_item_by_path(remote_file)
-            if not drive_item:
-                print(f"File not found in SharePoint: {remote_file}")
-                return False
-            
-            # Download file
-            return drive_item.download(local_file)
+        if extensions:
+            extensions = tuple(ext.lower() if ext.startswith('.') else f".{ext.lower()}" for ext in extensions)
+        if modified_since is not None and modified_since.tzinfo is None:
+            modified_since = modified_since.astimezone()
         
-        except Exception as e:
-            print(f"Error downloading file from SharePoint: {e}")
-            return False
+        folder = self._resolve_folder(drive, remote_folder, create=False)
+        if not folder:
+            print(f"Folder not found: {remote_folder or '/'}")
+            return
+        
+        if recursive:
+            items = self._iter_tree(drive, folder, page_size)
+        else:
+            items = self._iter_pages(drive, folder.object_id, LIST_FIELDS, page_size)
+        
+        for item in items:
+            is_folder = 'folder' in item
+            if is_folder:
+                if not include_folders:
+                    continue
+            else:
+                if extensions and not item['name'].lower().endswith(extensions):
+                    continue
+                if modified_since is not None and \
+                        datetime.fromisoformat(item['lastModifiedDateTime'].replace('Z', '+00:00')) <= modified_since:
+                    continue
+            
+            yield {
+                'id': item['id'],
+                'name': item['name'],
+                'path': item.get('path', item['name']),
+                'size': item.get('size'),
+                'modified': item.get('lastModifiedDateTime'),
+                'is_folder': is_folder,
+                'etag': item.get('eTag'),
+                'ctag': item.get('cTag'),
+                'web_url': item.get('webUrl')
+            }
     
-    def list_files_in_onedrive(self, remote_folder=None):
+    def _read_remote_changes(self, drive, target, url):
         """
-        List files in an OneDrive folder.
+        Read the drive's delta feed and match the changes to synced files.
+        
+        Files whose cTag isn't known yet, because they were just uploaded,
+        get their eTag and cTag recorded; files whose content tag changed,
+        or that were deleted, are reported as changed.
         
         Args:
-            remote_folder (str, optional): Remote folder path in OneDrive
+            drive (Drive): OneDrive or SharePoint drive
+            target (dict): Manifest target state
+            url (str): Delta link to read from, None to start from the current state
             
         Returns:
-            list: List of file items in the folder
+            tuple: (set of relative paths changed remotely, new delta link or None if the feed couldn't be read)
         """
-        if not self.onedrive:
-            if not self.connect_to_onedrive():
-                return []
+        changed = set()
+        if not url:
+            return changed, self._latest_delta_link(drive)
         
+        by_id = {entry['item_id']: rel_path for rel_path, entry in target['files'].items() if entry.get('item_id')}
+        throttle = self._throttle(drive)
         try:
-            # Get folder
-            if remote_folder:
-                folder = self.onedrive.get_item_by_path(remote_folder)
-                if not folder or not folder.is_folder:
-                    print(f"Folder not found in OneDrive: {remote_folder}")
-                    return []
-            else:
-                folder = self.onedrive.get_root_folder()
-            
-            # Get items in folder
-            items = folder.get_items()
-            return list(items)
-        
+            while True:
+                data = throttle.call(drive.con.get, url).json()
+                for item in data.get('value', []):
+                    rel_path = by_id.get(item.get('id'))
+                    if rel_path is None:
+                        continue
+                    
+                    entry = target['files'][rel_path]
+                    if 'deleted' in item:
+                        changed.add(rel_path)
+                    elif entry.get('ctag') is None and item.get('size') == entry.get('size'):
+                        entry['etag'] = item.get('eTag')
+                        entry['ctag'] = item.get('cTag')
+                    elif item.get('cTag') != entry.get('ctag'):
+                        changed.add(rel_path)
+                    else:
+                        entry['etag'] = item.get('eTag')
+                
+                if '@odata.nextLink' not in data:
+                    return changed, data.get('@odata.deltaLink')
+                url = data['@odata.nextLink']
         except Exception as e:
-            print(f"Error listing files in OneDrive: {e}")
-            return []
+            # An expired delta link (410 Gone) or an unreachable feed leaves only the local comparison
+            print(f"Error reading remote changes, comparing local files only: {e}")
+            return changed, None
     
-    def list_files_in_sharepoint(self, remote_folder=None):
+    def _latest_delta_link(self, drive):
         """
-        List files in a SharePoint folder.
+        Get a delta link for the drive's current state, without enumerating the drive.
         
         Args:
-            remote_folder (str, optional): Remote folder path in SharePoint
+            drive (Drive): OneDrive or SharePoint drive
             
         Returns:
-            list: List of file items in the folder
+            str: Delta link, or None if it couldn't be retrieved
         """
-        if not self.sharepoint_drive:
-            print("Not connected to SharePoint")
-            return []
-        
         try:
-            # Get folder
-            if remote_folder:
-                folder = self.sharepoint_drive.get_item_by_path(remote_folder)
-                if not folder or not folder.is_folder:
-                    print(f"Folder not found in SharePoint: {remote_folder}")
-                    return []
-            else:
-                folder = self.sharepoint_drive.get_root_folder()
-            
-            # Get items in folder
-            items = folder.get_items()
-            return list(items)
-        
+            response = self._throttle(drive).call(
+                drive.con.get, self._drive_url(drive, '/root/delta'), params={'token': 'latest'}
+            )
+            return response.json().get('@odata.deltaLink')
         except Exception as e:
-            print(f"Error listing files in SharePoint: {e}")
-            return []
+            print(f"Error getting delta link: {e}")
+            return None
     
-    def sync_local_to_cloud(self, local_dir, remote_folder, use_sharepoint=False):
+    def sync_local_to_cloud(self, local_dir, remote_folder, use_sharepoint=False, max_workers=DEFAULT_UPLOAD_WORKERS,
+                            incremental=False, delete_remote=False, manifest_path=None, share_links=False):
         """
         Synchronize local directory to cloud storage.
         
+        Remote folders are created first, in order; files are then uploaded
+        by a bounded pool of threads that back off together when the drive
+        is throttled.
+        
+        In incremental mode a manifest of the synced files is kept, and
+        only files that are new, changed locally, or changed or deleted
+        remotely (according to the drive's delta feed) are uploaded. The
+        rest are counted as skipped.
+        
+        Sharing links cost one extra request per file, so by default the
+        results list each file's web URL; use get_share_link to create a
+        link when one is needed.
+        
         Args:
             local_dir (str): Local directory to synchronize
             remote_folder (str): Remote folder path in cloud storage
             use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            max_workers (int): Number of concurrent uploads, 1 to upload sequentially
+            incremental (bool): Upload only changed files, using the sync manifest
+            delete_remote (bool): In incremental mode, delete remote copies of files deleted locally
+            manifest_path (str, optional): Manifest file, .sync_manifest.json in local_dir by default
+            share_links (bool): Create a view-only sharing link for every uploaded file
             
         Returns:
             dict: Dictionary with sync results
@@ -350,6 +1571,7 @@ class SharePointOneDriveIntegration:
             'uploaded_files': 0,
             'failed_files': 0,
             'skipped_files': 0,
+            'deleted_files': 0,
             'uploaded_urls': {}
         }
         
@@ -358,63 +1580,473 @@ class SharePointOneDriveIntegration:
             print(f"Local directory not found: {local_dir}")
             return results
         
+        manifest_path = os.path.abspath(manifest_path or os.path.join(local_dir, MANIFEST_NAME))
+        
         # Get list of local files
         local_files = []
         for root, _, files in os.walk(local_dir):
             for file in files:
                 local_file = os.path.join(root, file)
-                rel_path = os.path.relpath(local_file, local_dir)
+                if os.path.abspath(local_file) in (manifest_path, f"{manifest_path}.tmp"):
+                    continue
+                rel_path = os.path.relpath(local_file, local_dir).replace('\\', '/')
                 local_files.append((local_file, rel_path))
         
         results['total_files'] = len(local_files)
         
-        # Upload each file
-        for local_file, rel_path in local_files:
-            # Determine remote path
-            remote_path = os.path.join(remote_folder, rel_path).replace('\\', '/')
-            remote_dir = os.path.dirname(remote_path)
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            results['failed_files'] = len(local_files)
+            return results
+        
+        # Compare with the manifest and the remote changes since the last sync
+        target = None
+        previous_entries = {}
+        if incremental:
+            manifest = SyncManifest(manifest_path)
+            target = manifest.target(drive, remote_folder)
+            remote_changed, delta_link = self._read_remote_changes(drive, target, target.get('delta_link'))
             
-            try:
-                # Upload file
-                if use_sharepoint:
-                    url = self.upload_file_to_sharepoint(local_file, remote_dir)
+            local_paths = {rel_path for _, rel_path in local_files}
+            for rel_path in [rel_path for rel_path in target['files'] if rel_path not in local_paths]:
+                entry = target['files'].pop(rel_path)
+                if delete_remote and entry.get('item_id') and self._delete_item(drive, entry['item_id']):
+                    results['deleted_files'] += 1
+                    print(f"Deleted: {rel_path}")
+            
+            changed_files = []
+            for local_file, rel_path in local_files:
+                entry = target['files'].get(rel_path)
+                if entry and rel_path not in remote_changed and not local_file_changed(local_file, entry):
+                    results['skipped_files'] += 1
                 else:
-                    url = self.upload_file_to_onedrive(local_file, remote_dir)
+                    changed_files.append((local_file, rel_path))
+                    
+                    # The delta link moves past remote changes, so their entries are dropped
+                    # until the upload succeeds and a failed upload is retried by the next sync
+                    if rel_path in remote_changed and entry:
+                        previous_entries[rel_path] = target['files'].pop(rel_path)
+            local_files = changed_files
+        
+        # Create each remote folder once, parents before children, before uploading
+        remote_dirs = {posixpath.dirname(posixpath.join(remote_folder, rel_path)) for _, rel_path in local_files}
+        for remote_dir in sorted(remote_dirs):
+            try:
+                self._resolve_folder(drive, remote_dir)
+            except Exception as e:
+                print(f"Error creating remote folder {remote_dir}: {e}")
+        
+        def upload(local_file, rel_path):
+            # Determine remote path
+            remote_dir = posixpath.dirname(posixpath.join(remote_folder, rel_path))
+            
+            uploaded_file = self._upload(drive, local_file, remote_dir)
+            if not uploaded_file:
+                return None, None
+            
+            return uploaded_file, self._share_link(drive, uploaded_file) if share_links else uploaded_file.web_url
+        
+        # Upload the files concurrently; results are collected on this thread
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(upload, local_file, rel_path): (local_file, rel_path)
+                for local_file, rel_path in local_files
+            }
+            
+            for future in as_completed(futures):
+                local_file, rel_path = futures[future]
+                try:
+                    uploaded_file, url = future.result()
+                    
+                    if url:
+                        results['uploaded_files'] += 1
+                        results['uploaded_urls'][rel_path] = url
+                        print(f"Uploaded: {rel_path} -> {url}")
+                        
+                        if target is not None:
+                            # Replacing a file keeps its item, so an existing sharing link stays valid
+                            previous = target['files'].get(rel_path) or previous_entries.get(rel_path) or {}
+                            share_link = url if share_links else None
+                            if not share_link and previous.get('item_id') == uploaded_file.object_id:
+                                share_link = previous.get('share_link')
+                            
+                            stat_result = os.stat(local_file)
+                            target['files'][rel_path] = {
+                                'size': stat_result.st_size,
+                                'mtime_ns': stat_result.st_mtime_ns,
+                                'sha256': file_sha256(local_file),
+                                'item_id': uploaded_file.object_id,
+                                'etag': None,
+                                'ctag': None,
+                                'share_link': share_link
+                            }
+                    else:
+                        results['failed_files'] += 1
+                        print(f"Failed to upload: {rel_path}")
                 
-                if url:
-                    results['uploaded_files'] += 1
-                    results['uploaded_urls'][rel_path] = url
-                    print(f"Uploaded: {rel_path} -> {url}")
-                else:
+                except Exception as e:
                     results['failed_files'] += 1
-                    print(f"Failed to upload: {rel_path}")
-            
-            except Exception as e:
-                results['failed_files'] += 1
-                print(f"Error uploading {rel_path}: {e}")
+                    print(f"Error uploading {rel_path}: {e}")
+        
+        if target is not None:
+            # Reading the changes made during the sync records the tags of the uploaded files;
+            # files changed remotely meanwhile are dropped from the manifest to be uploaded next time
+            if delta_link:
+                changed_during_sync, delta_link = self._read_remote_changes(drive, target, delta_link)
+                for rel_path in changed_during_sync:
+                    target['files'].pop(rel_path, None)
+            target['delta_link'] = delta_link
+            manifest.save()
         
         return results
     
-    def create_backup(self, local_dir, backup_name=None, use_sharepoint=False):
+    def create_backup(self, local_dir, backup_name=None, use_sharepoint=False, incremental=False, snapshot=False,
+                      archive=None, compression_level=None):
         """
         Create a backup of a local directory in cloud storage.
         
         Args:
             local_dir (str): Local directory to backup
-            backup_name (str, optional): Name for the backup folder
+            backup_name (str, optional): Name for the backup folder, or for the snapshot or archive
             use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            incremental (bool): Keep one backup folder per directory and upload only
+                changed files to it, instead of a new timestamped copy
+            snapshot (bool): Store a deduplicated snapshot instead, see create_snapshot
+            archive (str, optional): 'gzip' or 'zstd' to upload one compressed archive
+                to the Backups folder instead of the individual files
+            compression_level (int, optional): Compression level of the archive
             
         Returns:
             dict: Dictionary with backup results
         """
+        if snapshot:
+            return self.create_snapshot(local_dir, backup_name, use_sharepoint=use_sharepoint)
+        if archive:
+            return self._create_archive_backup(local_dir, backup_name, use_sharepoint, archive, compression_level)
+        
         # Generate backup folder name
         if not backup_name:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_name = f"Backup_{os.path.basename(local_dir)}_{timestamp}"
+            if incremental:
+                backup_name = f"Backup_{os.path.basename(os.path.normpath(local_dir))}"
+            else:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                backup_name = f"Backup_{os.path.basename(local_dir)}_{timestamp}"
         
         # Sync to cloud
         remote_folder = f"Backups/{backup_name}"
-        return self.sync_local_to_cloud(local_dir, remote_folder, use_sharepoint)
+        return self.sync_local_to_cloud(local_dir, remote_folder, use_sharepoint, incremental=incremental)
+    
+    def _create_archive_backup(self, local_dir, backup_name, use_sharepoint, compression, level):
+        """
+        Back up a directory as one compressed archive in the Backups folder.
+        
+        Args:
+            local_dir (str): Local directory to backup
+            backup_name (str, optional): Archive name without extension, Backup_<directory>_<timestamp> by default
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            compression (str): 'gzip' or 'zstd'
+            level (int, optional): Compression level
+            
+        Returns:
+            dict: Dictionary with backup results; all files count as uploaded or failed together
+        """
+        results = {
+            'total_files': 0,
+            'uploaded_files': 0,
+            'failed_files': 0,
+            'skipped_files': 0,
+            'uploaded_urls': {},
+            'archive': None
+        }
+        
+        # Check if local directory exists
+        if not os.path.isdir(local_dir):
+            print(f"Local directory not found: {local_dir}")
+            return results
+        
+        results['total_files'] = sum(
+            1 for _, _, files in os.walk(local_dir) for filename in files if filename != MANIFEST_NAME
+        )
+        
+        if not backup_name:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            backup_name = f"Backup_{os.path.basename(os.path.normpath(local_dir))}_{timestamp}"
+        archive_name = backup_name + ARCHIVE_EXTENSIONS.get(compression, '')
+        
+        try:
+            item = self.upload_archive(local_dir, 'Backups', archive_name, use_sharepoint, compression, level)
+        except Exception as e:
+            print(f"Error uploading backup archive {archive_name}: {e}")
+            results['failed_files'] = results['total_files']
+            return results
+        
+        results['uploaded_files'] = results['total_files']
+        results['uploaded_urls'][archive_name] = item.web_url
+        results['archive'] = f"Backups/{archive_name}"
+        print(f"Uploaded: {archive_name} ({item.size} bytes) -> {item.web_url}")
+        return results
+    
+    @staticmethod
+    def _snapshot_repository(local_dir, repository=None):
+        """
+        Get the remote folder holding the snapshots of a directory.
+        
+        Args:
+            local_dir (str): Local directory
+            repository (str, optional): Repository folder path
+            
+        Returns:
+            str: Repository folder path, Backups/Snapshots_<directory name> by default
+        """
+        return repository or f"Backups/Snapshots_{os.path.basename(os.path.normpath(local_dir))}"
+    
+    def create_snapshot(self, local_dir, snapshot_name=None, use_sharepoint=False, repository=None,
+                        max_workers=DEFAULT_UPLOAD_WORKERS):
+        """
+        Create a deduplicated, content-addressed snapshot of a local directory.
+        
+        File contents are stored once in the repository's blobs folder,
+        named by their SHA-256, and each snapshot is a small manifest
+        mapping relative paths to hashes. Only contents not stored by an
+        earlier snapshot are uploaded, followed by the manifest.
+        
+        Args:
+            local_dir (str): Local directory to back up
+            snapshot_name (str, optional): Snapshot name, the current timestamp by default
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            repository (str, optional): Repository folder path, Backups/Snapshots_<directory name> by default
+            max_workers (int): Number of concurrent uploads
+            
+        Returns:
+            dict: Dictionary with backup results; skipped files are contents already stored
+        """
+        results = {
+            'total_files': 0,
+            'uploaded_files': 0,
+            'failed_files': 0,
+            'skipped_files': 0,
+            'uploaded_bytes': 0,
+            'snapshot': None
+        }
+        
+        # Check if local directory exists
+        if not os.path.isdir(local_dir):
+            print(f"Local directory not found: {local_dir}")
+            return results
+        
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return results
+        
+        repository = self._snapshot_repository(local_dir, repository)
+        snapshot_name = snapshot_name or datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        # Hash the local files; identical files share one blob
+        files = {}
+        blobs = {}
+        for root, _, filenames in os.walk(local_dir):
+            for filename in filenames:
+                local_file = os.path.join(root, filename)
+                rel_path = os.path.relpath(local_file, local_dir).replace('\\', '/')
+                try:
+                    stat_result = os.stat(local_file)
+                    sha256 = file_sha256(local_file)
+                except OSError as e:
+                    print(f"Error reading {rel_path}: {e}")
+                    results['failed_files'] += 1
+                    continue
+                
+                files[rel_path] = {'sha256': sha256, 'size': stat_result.st_size, 'mtime_ns': stat_result.st_mtime_ns}
+                blobs.setdefault(sha256, local_file)
+        
+        results['total_files'] = len(files) + results['failed_files']
+        
+        try:
+            blobs_folder = posixpath.join(repository, BLOBS_FOLDER)
+            stored = {item['name'] for item in self._iter_pages(drive, self._resolve_folder(drive, blobs_folder).object_id, ('name',), 999)}
+        except Exception as e:
+            print(f"Error reading snapshot repository {repository}: {e}")
+            results['failed_files'] = results['total_files']
+            return results
+        
+        missing = {sha256: local_file for sha256, local_file in blobs.items() if sha256 not in stored}
+        results['skipped_files'] = len(files) - sum(1 for entry in files.values() if entry['sha256'] in missing)
+        
+        def upload(sha256, local_file):
+            # A file changed since it was hashed would be stored under the wrong name
+            if file_sha256(local_file) != sha256:
+                raise RuntimeError("file changed during backup")
+            return self._upload(drive, local_file, blobs_folder, sha256)
+        
+        failed_blobs = set()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(upload, sha256, local_file): sha256 for sha256, local_file in missing.items()}
+            
+            for future in as_completed(futures):
+                sha256 = futures[future]
+                try:
+                    if not future.result():
+                        raise RuntimeError("upload failed")
+                    results['uploaded_bytes'] += os.path.getsize(missing[sha256])
+                except Exception as e:
+                    failed_blobs.add(sha256)
+                    print(f"Error uploading {os.path.relpath(missing[sha256], local_dir)}: {e}")
+        
+        for entry in files.values():
+            if entry['sha256'] in failed_blobs:
+                results['failed_files'] += 1
+            elif entry['sha256'] in missing:
+                results['uploaded_files'] += 1
+        
+        # A snapshot referencing missing blobs couldn't be restored
+        if failed_blobs:
+            print(f"Snapshot {snapshot_name} not saved: {len(failed_blobs)} files failed to upload")
+            return results
+        
+        manifest = {
+            'snapshot': snapshot_name,
+            'source': os.path.abspath(local_dir),
+            'created': datetime.now().isoformat(),
+            'files': files
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_file = os.path.join(temp_dir, f"{snapshot_name}.json")
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f)
+            
+            try:
+                self._upload(drive, manifest_file, posixpath.join(repository, SNAPSHOTS_FOLDER))
+            except Exception as e:
+                print(f"Error saving snapshot {snapshot_name}: {e}")
+                return results
+        
+        results['snapshot'] = snapshot_name
+        print(f"Snapshot {snapshot_name}: {results['uploaded_files']} files uploaded, {results['skipped_files']} already stored")
+        return results
+    
+    def list_snapshots(self, local_dir, use_sharepoint=False, repository=None):
+        """
+        List the snapshots stored for a directory.
+        
+        Args:
+            local_dir (str): Local directory the snapshots were taken of
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            repository (str, optional): Repository folder path, Backups/Snapshots_<directory name> by default
+            
+        Returns:
+            list: Snapshot names, oldest first for timestamp names
+        """
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return []
+        
+        try:
+            folder = self._resolve_folder(
+                drive, posixpath.join(self._snapshot_repository(local_dir, repository), SNAPSHOTS_FOLDER), create=False
+            )
+            if not folder:
+                return []
+            names = (item['name'] for item in self._iter_pages(drive, folder.object_id, ('name',), 999))
+            return sorted(name[:-len('.json')] for name in names if name.endswith('.json'))
+        except Exception as e:
+            print(f"Error listing snapshots: {e}")
+            return []
+    
+    def restore_snapshot(self, local_dir, snapshot_name=None, target_dir=None, use_sharepoint=False, repository=None,
+                         max_workers=DEFAULT_UPLOAD_WORKERS):
+        """
+        Restore a directory from a snapshot.
+        
+        Files already present in the target directory with the right
+        content are kept; the others are downloaded from their blobs,
+        verified against their hash and moved into place.
+        
+        Args:
+            local_dir (str): Local directory the snapshot was taken of
+            snapshot_name (str, optional): Snapshot to restore, the latest by default
+            target_dir (str, optional): Directory to restore into, local_dir by default
+            use_sharepoint (bool): Whether to use SharePoint instead of OneDrive
+            repository (str, optional): Repository folder path, Backups/Snapshots_<directory name> by default
+            max_workers (int): Number of concurrent downloads
+            
+        Returns:
+            dict: Dictionary with restore results
+        """
+        results = {
+            'total_files': 0,
+            'restored_files': 0,
+            'failed_files': 0,
+            'skipped_files': 0,
+            'snapshot': None
+        }
+        
+        drive = self._get_drive(use_sharepoint)
+        if not drive:
+            return results
+        
+        repository = self._snapshot_repository(local_dir, repository)
+        target_dir = target_dir or local_dir
+        
+        if not snapshot_name:
+            snapshots = self.list_snapshots(local_dir, use_sharepoint, repository)
+            if not snapshots:
+                print(f"No snapshots found in {repository}")
+                return results
+            snapshot_name = snapshots[-1]
+        
+        throttle = self._throttle(drive)
+        try:
+            item = throttle.call(drive.get_item_by_path, f"/{repository}/{SNAPSHOTS_FOLDER}/{snapshot_name}.json")
+            with self._drive_content(drive, item.object_id) as response:
+                files = response.json()['files']
+        except Exception as e:
+            print(f"Error reading snapshot {snapshot_name}: {e}")
+            return results
+        
+        results['snapshot'] = snapshot_name
+        results['total_files'] = len(files)
+        
+        def restore(rel_path, entry):
+            local_file = os.path.join(target_dir, *rel_path.split('/'))
+            if os.path.isfile(local_file) and os.path.getsize(local_file) == entry['size'] \
+                    and file_sha256(local_file) == entry['sha256']:
+                return False
+            
+            blob = throttle.call(drive.get_item_by_path, f"/{repository}/{BLOBS_FOLDER}/{entry['sha256']}")
+            os.makedirs(os.path.dirname(local_file), exist_ok=True)
+            
+            # Downloaded next to the destination and only moved into place once verified
+            fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(local_file), prefix='.restore-')
+            try:
+                with os.fdopen(fd, 'wb') as f, self._drive_content(drive, blob.object_id) as response:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                
+                if file_sha256(temp_file) != entry['sha256']:
+                    raise RuntimeError("content doesn't match the snapshot")
+                os.replace(temp_file, local_file)
+                os.utime(local_file, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            return True
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(restore, rel_path, entry): rel_path for rel_path, entry in files.items()}
+            
+            for future in as_completed(futures):
+                rel_path = futures[future]
+                try:
+                    if future.result():
+                        results['restored_files'] += 1
+                    else:
+                        results['skipped_files'] += 1
+                except Exception as e:
+                    results['failed_files'] += 1
+                    print(f"Error restoring {rel_path}: {e}")
+        
+        return results
+    
 
 def setup_cloud_storage(client_id, client_secret, site_name=None):
     """
@@ -454,23 +2086,38 @@ if __name__ == "__main__":
         print("\nCommands:")
         print("  upload <local_file> <remote_folder> [--sharepoint <site_name>]")
         print("  download <remote_file> <local_file> [--sharepoint <site_name>]")
-        print("  list <remote_folder> [--sharepoint <site_name>]")
-        print("  sync <local_dir> <remote_folder> [--sharepoint <site_name>]")
-        print("  backup <local_dir> [backup_name] [--sharepoint <site_name>]")
+        print("  pull <remote_folder_or_pattern> <local_dir> [--recursive] [--sharepoint <site_name>]")
+        print("  list <remote_folder> [--recursive] [--ext <.pdf,...>] [--sharepoint <site_name>]")
+        print("  link <remote_file> [local_dir] [--sharepoint <site_name>]")
+        print("  sync <local_dir> <remote_folder> [--incremental [--delete]] [--sharepoint <site_name>]")
+        print("  backup <local_dir> [backup_name] [--incremental | --snapshot | --archive gzip|zstd [--level <n>]] [--sharepoint <site_name>]")
+        print("  snapshots <local_dir> [--sharepoint <site_name>]")
+        print("  restore <local_dir> [snapshot_name] [--sharepoint <site_name>]")
         sys.exit(1)
     
     client_id = sys.argv[1]
     client_secret = sys.argv[2]
     command = sys.argv[3]
     
-    # Check for SharePoint option
+    # Check for SharePoint and incremental sync options
     use_sharepoint = False
     site_name = None
+    incremental = "--incremental" in sys.argv
+    delete_remote = "--delete" in sys.argv
+    snapshot = "--snapshot" in sys.argv
+    archive = None
+    compression_level = None
+    extensions = None
     for i, arg in enumerate(sys.argv):
         if arg == "--sharepoint" and i + 1 < len(sys.argv):
             use_sharepoint = True
             site_name = sys.argv[i + 1]
-            break
+        elif arg == "--archive" and i + 1 < len(sys.argv):
+            archive = sys.argv[i + 1]
+        elif arg == "--level" and i + 1 < len(sys.argv):
+            compression_level = int(sys.argv[i + 1])
+        elif arg == "--ext" and i + 1 < len(sys.argv):
+            extensions = tuple(sys.argv[i + 1].split(','))
     
     # Set up integration
     integration = setup_cloud_storage(client_id, client_secret, site_name)
@@ -517,54 +2164,129 @@ if __name__ == "__main__":
             print("Failed to download file")
             sys.exit(1)
     
+    elif command == "pull":
+        if len(sys.argv) < 6:
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> pull <remote_folder_or_pattern> <local_dir> [--recursive] [--sharepoint <site_name>]")
+            sys.exit(1)
+        
+        remote_path = sys.argv[4]
+        local_dir = sys.argv[5]
+        
+        results = integration.download_files(remote_path, local_dir, use_sharepoint, recursive="--recursive" in sys.argv)
+        
+        print("\nDownload Results:")
+        print(f"  Total files: {results['total_files']}")
+        print(f"  Downloaded: {results['downloaded_files']}")
+        print(f"  Failed: {results['failed_files']}")
+        print(f"  Skipped: {results['skipped_files']}")
+        if results['failed_files']:
+            sys.exit(1)
+    
     elif command == "list":
         if len(sys.argv) < 5:
-            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> list <remote_folder> [--sharepoint <site_name>]")
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> list <remote_folder> [--recursive] [--ext <.pdf,...>] [--sharepoint <site_name>]")
             sys.exit(1)
         
         remote_folder = sys.argv[4]
         
-        if use_sharepoint:
-            items = integration.list_files_in_sharepoint(remote_folder)
-        else:
-            items = integration.list_files_in_onedrive(remote_folder)
-        
         print(f"Files in {remote_folder}:")
-        for item in items:
-            item_type = "Folder" if item.is_folder else "File"
-            print(f"  {item.name} ({item_type})")
+        items = integration.iter_files(
+            remote_folder, use_sharepoint, recursive="--recursive" in sys.argv,
+            extensions=extensions, include_folders=not extensions
+        )
+        try:
+            for item in items:
+                item_type = "Folder" if item['is_folder'] else "File"
+                print(f"  {item['path']} ({item_type})")
+        except Exception as e:
+            print(f"Error listing {remote_folder}: {e}")
+            sys.exit(1)
+    
+    elif command == "link":
+        if len(sys.argv) < 5:
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> link <remote_file> [local_dir] [--sharepoint <site_name>]")
+            sys.exit(1)
+        
+        remote_file = sys.argv[4]
+        local_dir = sys.argv[5] if len(sys.argv) > 5 and not sys.argv[5].startswith("--") else None
+        
+        url = integration.get_share_link(remote_file, use_sharepoint, local_dir)
+        if url:
+            print(f"Sharing link: {url}")
+        else:
+            print("Failed to create sharing link")
+            sys.exit(1)
     
     elif command == "sync":
         if len(sys.argv) < 6:
-            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> sync <local_dir> <remote_folder> [--sharepoint <site_name>]")
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> sync <local_dir> <remote_folder> [--incremental [--delete]] [--sharepoint <site_name>]")
             sys.exit(1)
         
         local_dir = sys.argv[4]
         remote_folder = sys.argv[5]
         
-        results = integration.sync_local_to_cloud(local_dir, remote_folder, use_sharepoint)
+        results = integration.sync_local_to_cloud(
+            local_dir, remote_folder, use_sharepoint, incremental=incremental, delete_remote=delete_remote
+        )
         
         print("\nSync Results:")
         print(f"  Total files: {results['total_files']}")
         print(f"  Uploaded: {results['uploaded_files']}")
         print(f"  Failed: {results['failed_files']}")
         print(f"  Skipped: {results['skipped_files']}")
+        print(f"  Deleted: {results['deleted_files']}")
     
     elif command == "backup":
         if len(sys.argv) < 5:
-            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> backup <local_dir> [backup_name] [--sharepoint <site_name>]")
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> backup <local_dir> [backup_name] [--incremental | --snapshot | --archive gzip|zstd [--level <n>]] [--sharepoint <site_name>]")
             sys.exit(1)
         
         local_dir = sys.argv[4]
         backup_name = sys.argv[5] if len(sys.argv) > 5 and not sys.argv[5].startswith("--") else None
         
-        results = integration.create_backup(local_dir, backup_name, use_sharepoint)
+        results = integration.create_backup(
+            local_dir, backup_name, use_sharepoint, incremental, snapshot, archive, compression_level
+        )
         
         print("\nBackup Results:")
         print(f"  Total files: {results['total_files']}")
         print(f"  Uploaded: {results['uploaded_files']}")
         print(f"  Failed: {results['failed_files']}")
         print(f"  Skipped: {results['skipped_files']}")
+        if snapshot:
+            print(f"  Snapshot: {results['snapshot'] or 'not saved'}")
+        if archive:
+            print(f"  Archive: {results['archive'] or 'not uploaded'}")
+    
+    elif command == "snapshots":
+        if len(sys.argv) < 5:
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> snapshots <local_dir> [--sharepoint <site_name>]")
+            sys.exit(1)
+        
+        local_dir = sys.argv[4]
+        
+        print(f"Snapshots of {local_dir}:")
+        for snapshot_name in integration.list_snapshots(local_dir, use_sharepoint):
+            print(f"  {snapshot_name}")
+    
+    elif command == "restore":
+        if len(sys.argv) < 5:
+            print("Usage: python sharepoint_onedrive.py <client_id> <client_secret> restore <local_dir> [snapshot_name] [--sharepoint <site_name>]")
+            sys.exit(1)
+        
+        local_dir = sys.argv[4]
+        snapshot_name = sys.argv[5] if len(sys.argv) > 5 and not sys.argv[5].startswith("--") else None
+        
+        results = integration.restore_snapshot(local_dir, snapshot_name, use_sharepoint=use_sharepoint)
+        
+        print("\nRestore Results:")
+        print(f"  Snapshot: {results['snapshot']}")
+        print(f"  Total files: {results['total_files']}")
+        print(f"  Restored: {results['restored_files']}")
+        print(f"  Failed: {results['failed_files']}")
+        print(f"  Skipped: {results['skipped_files']}")
+        if not results['snapshot'] or results['failed_files']:
+            sys.exit(1)
     
     else:
         print(f"Unknown command: {command}")
@@ -6,13 +6,784 @@ This script creates and manages the tracking database/spreadsheet for the email
 It provides a structure to track email status and form returns.
 """
 
+import io
 import os
+import re
+import csv
+import json
+import heapq
+import base64
+import bisect
+import tempfile
+import functools
+import threading
+import contextlib
+from collections import deque
 import pandas as pd
 import datetime
-from openpyxl import load_workbook
+from types import MappingProxyType
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+# File locks for writers sharing the spreadsheet across processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Default tracking spreadsheet, next to the scripts directory
+DEFAULT_TRACKING_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tracking.xlsx')
+
+# Header styles of the tracking spreadsheet
+HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+HEADER_BORDER = Border(
+    left=Side(style="thin"), 
+    right=Side(style="thin"), 
+    top=Side(style="thin"), 
+    bottom=Side(style="thin")
+)
+
+# Loose email check for imports: one @, no whitespace, a dot in the domain
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Import file columns accepted for each recipient field, compared case-insensitively
+IMPORT_COLUMNS = {
+    'Email': ('email', 'email address', 'e-mail'),
+    'Name': ('name', 'full name', 'recipient')
+}
+
+# Rejected import rows reported back in the summary
+MAX_IMPORT_ERRORS = 20
+
+def file_signature(file_path):
+    """
+    Get a signature that changes whenever a file is replaced or rewritten.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        tuple: (inode, modification time in ns, size), or None if the file doesn't exist
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+@contextlib.contextmanager
+def write_lock(file_path):
+    """
+    Hold the cross-process write lock of a spreadsheet.
+    
+    Writers read, change and replace the whole spreadsheet, so they hold
+    this lock for the entire read-modify-write to keep concurrent writers,
+    e.g. job workers and web requests, from overwriting each other's rows.
+    The lock is taken on a '.lock' file next to the spreadsheet.
+    
+    Args:
+        file_path (str): Path to the spreadsheet
+    """
+    with open(f"{file_path}.lock", 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def write_locked(method):
+    """
+    Run a TrackingDatabase method while holding the spreadsheet's write lock.
+    
+    Args:
+        method (callable): Method reading and writing the spreadsheet
+    
+    Returns:
+        callable: Wrapped method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with write_lock(self.file_path):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class RecordIndex:
+    """
+    In-memory query index over an immutable sequence of records.
+    
+    Filter values are served from an inverted index and sort orders are
+    built once per sort key, so paging through a large table costs
+    O(page size) per request once the index is warm. Pages are addressed
+    with opaque keyset cursors that stay valid when the table changes.
+    """
+    
+    def __init__(self, records, filter_keys, sort_fields, date_field=None):
+        """
+        Build the inverted filter index.
+        
+        Args:
+            records (tuple): Immutable sequence of record mappings
+            filter_keys (callable): Function returning (filter name, value) pairs for a record
+            sort_fields (dict): Sort key name -> record field
+            date_field (str, optional): Record field used for date range filters
+        """
+        self.records = records
+        self.sort_fields = sort_fields
+        self.date_field = date_field
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._matches = {}
+        
+        self._postings = {}
+        for position, record in enumerate(records):
+            for key in filter_keys(record):
+                self._postings.setdefault(key, []).append(position)
+    
+    @staticmethod
+    def _sort_value(record, field):
+        """
+        Build the sort key of a record, with missing values sorted last.
+        
+        Args:
+            record (Mapping): Record to sort
+            field (str): Record field to sort by
+            
+        Returns:
+            tuple: (is missing, comparable value, record ID)
+        """
+        value = record.get(field)
+        if value is None:
+            return (True, '', record['id'])
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            value = str(value).lower()
+        return (False, value, record['id'])
+    
+    def _order(self, sort):
+        """
+        Get positions sorted ascending by a sort key, with their keys.
+        
+        Args:
+            sort (str): Sort key name
+            
+        Returns:
+            tuple: (list of sort keys, list of positions)
+        """
+        with self._lock:
+            if sort not in self._orders:
+                field = self.sort_fields[sort]
+                order = sorted(
+                    (self._sort_value(record, field), position)
+                    for position, record in enumerate(self.records)
+                )
+                self._orders[sort] = ([key for key, _ in order], [position for _, position in order])
+            return self._orders[sort]
+    
+    def _match(self, filters, date_from, date_to):
+        """
+        Get the set of positions matching the filters.
+        
+        Args:
+            filters (dict): Filter name -> required value
+            date_from (str, optional): Inclusive lower bound on the date field
+            date_to (str, optional): Inclusive upper bound on the date field
+            
+        Returns:
+            set: Matching positions, or None if nothing is filtered
+        """
+        cache_key = (tuple(sorted(filters.items())), date_from, date_to)
+        with self._lock:
+            if cache_key in self._matches:
+                return self._matches[cache_key]
+        
+        matches = None
+        for key in sorted(filters.items(), key=lambda item: len(self._postings.get(item, ()))):
+            postings = self._postings.get(key, ())
+            matches = set(postings) if matches is None else matches.intersection(postings)
+            if not matches:
+                break
+        
+        if self.date_field and (date_from or date_to):
+            candidates = range(len(self.records)) if matches is None else matches
+            matches = set()
+            for position in candidates:
+                value = self.records[position].get(self.date_field)
+                if value is None:
+                    continue
+                if date_from and value < date_from:
+                    continue
+                # Compare date-only upper bounds against the whole day
+                if date_to and value[:len(date_to)] > date_to:
+                    continue
+                matches.add(position)
+        
+        with self._lock:
+            # Keep only a bounded number of filter results per snapshot
+            if len(self._matches) >= 64:
+                self._matches.clear()
+            self._matches[cache_key] = matches
+        return matches
+    
+    def query(self, filters=None, sort='id', descending=False, cursor=None, limit=100,
+              date_from=None, date_to=None):
+        """
+        Get one page of records.
+        
+        Args:
+            filters (dict, optional): Filter name -> required value
+            sort (str): Sort key name
+            descending (bool): Whether to sort in descending order
+            cursor (str, optional): Cursor returned with the previous page
+            limit (int): Maximum number of records to return
+            date_from (str, optional): Inclusive lower bound on the date field
+            date_to (str, optional): Inclusive upper bound on the date field
+            
+        Returns:
+            dict: Page with 'items', 'total' and 'next_cursor'
+        """
+        if sort not in self.sort_fields:
+            raise ValueError(f"Unknown sort key: {sort}")
+        
+        filters = {name: value for name, value in (filters or {}).items() if value not in (None, '')}
+        matches = self._match(filters, date_from, date_to)
+        keys, positions = self._order(sort)
+        
+        # Find where the previous page ended
+        if cursor:
+            cursor_sort, cursor_descending, last_key = decode_cursor(cursor)
+            if (cursor_sort, cursor_descending) != (sort, descending):
+                raise ValueError("Cursor does not match the requested sort order")
+            try:
+                start = bisect.bisect_left(keys, last_key) - 1 if descending else bisect.bisect_right(keys, last_key)
+            except TypeError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+        else:
+            start = len(keys) - 1 if descending else 0
+        
+        step = -1 if descending else 1
+        items = []
+        index = start
+        last = None
+        while 0 <= index < len(positions) and len(items) < limit:
+            position = positions[index]
+            if matches is None or position in matches:
+                items.append(self.records[position])
+                last = index
+            index += step
+        
+        has_more = False
+        while 0 <= index < len(positions):
+            if matches is None or positions[index] in matches:
+                has_more = True
+                break
+            index += step
+        
+        return {
+            'items': items,
+            'total': len(self.records) if matches is None else len(matches),
+            'next_cursor': encode_cursor(sort, descending, keys[last]) if has_more and last is not None else None
+        }
+
+def encode_cursor(sort, descending, sort_key):
+    """
+    Encode a sort order and sort key as an opaque page cursor.
+    
+    Args:
+        sort (str): Sort key name of the page
+        descending (bool): Whether the page is sorted in descending order
+        sort_key (tuple): Sort key of the last record on a page
+        
+    Returns:
+        str: URL-safe cursor string
+    """
+    cursor = [sort, 'desc' if descending else 'asc', list(sort_key)]
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    Decode a page cursor back into its sort order and sort key.
+    
+    Args:
+        cursor (str): Cursor string from encode_cursor
+        
+    Returns:
+        tuple: (sort key name, descending, sort key)
+    """
+    try:
+        sort, order, sort_key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(sort, str) or order not in ('asc', 'desc') or not isinstance(sort_key, list):
+            raise ValueError(cursor)
+        return sort, order == 'desc', tuple(sort_key)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+class TrackingSnapshot(tuple):
+    """
+    Immutable tuple of tracking records with lazily built query indexes.
+    """
+    
+    def tracking_index(self):
+        """
+        Get the query index over tracking records.
+        
+        Returns:
+            RecordIndex: Index with status, form and recipient filters
+        """
+        index = self.__dict__.get('_tracking_index')
+        if index is None:
+            index = RecordIndex(self, tracking_filter_keys, TRACKING_SORT_FIELDS, date_field='date_sent')
+            self.__dict__['_tracking_index'] = index
+        return index
+    
+    def recipients(self):
+        """
+        Get per-recipient aggregates of the tracking records.
+        
+        Returns:
+            tuple: Immutable recipient mappings, in first-seen order
+        """
+        recipients = self.__dict__.get('_recipients')
+        if recipients is None:
+            aggregates = {}
+            for record in self:
+                email = record['recipient_email']
+                if email is None:
+                    continue
+                if email not in aggregates:
+                    aggregates[email] = {
+                        'id': email,
+                        'email': email,
+                        'name': record['recipient_name'],
+                        'formsSent': 0,
+                        'formsReturned': 0,
+                        'lastSent': None,
+                        'forms': []
+                    }
+                aggregate = aggregates[email]
+                if record['email_status'] == 'Sent':
+                    aggregate['formsSent'] += 1
+                if record['returned']:
+                    aggregate['formsReturned'] += 1
+                if record['date_sent'] and (aggregate['lastSent'] is None or record['date_sent'] > aggregate['lastSent']):
+                    aggregate['lastSent'] = record['date_sent']
+                if record['form_id'] and record['form_id'] not in aggregate['forms']:
+                    aggregate['forms'].append(record['form_id'])
+            
+            recipients = tuple(
+                MappingProxyType(dict(aggregate, forms=tuple(aggregate['forms'])))
+                for aggregate in aggregates.values()
+            )
+            self.__dict__['_recipients'] = recipients
+        return recipients
+    
+    def recipients_index(self):
+        """
+        Get the query index over recipient aggregates.
+        
+        Returns:
+            RecordIndex: Index with status and form filters
+        """
+        index = self.__dict__.get('_recipients_index')
+        if index is None:
+            index = RecordIndex(self.recipients(), recipient_filter_keys, RECIPIENT_SORT_FIELDS, date_field='lastSent')
+            self.__dict__['_recipients_index'] = index
+        return index
+
+TRACKING_SORT_FIELDS = {
+    'id': 'id',
+    'dateSent': 'date_sent',
+    'dateReturned': 'date_returned',
+    'recipientName': 'recipient_name',
+    'recipientEmail': 'recipient_email',
+    'formName': 'form_name'
+}
+
+RECIPIENT_SORT_FIELDS = {
+    'name': 'name',
+    'email': 'email',
+    'formsSent': 'formsSent',
+    'formsReturned': 'formsReturned',
+    'lastSent': 'lastSent'
+}
+
+def tracking_filter_keys(record):
+    """
+    Get the filter keys a tracking record is indexed under.
+    
+    Args:
+        record (Mapping): Tracking record
+        
+    Returns:
+        list: (filter name, value) pairs
+    """
+    keys = [('recipient', record['recipient_email']), ('form', record['form_id'])]
+    if record['email_status'] == 'Sent':
+        keys.append(('status', 'sent'))
+    if record['returned']:
+        keys.append(('status', 'returned'))
+    else:
+        keys.append(('status', 'not-returned'))
+    if record['processed']:
+        keys.append(('status', 'processed'))
+    return keys
+
+def recipient_filter_keys(recipient):
+    """
+    Get the filter keys a recipient aggregate is indexed under.
+    
+    Args:
+        recipient (Mapping): Recipient aggregate
+        
+    Returns:
+        list: (filter name, value) pairs
+    """
+    keys = [('form', form_id) for form_id in recipient['forms']]
+    if recipient['formsSent'] > 0:
+        keys.append(('status', 'sent'))
+    if recipient['formsReturned'] > 0:
+        keys.append(('status', 'returned'))
+    if recipient['formsReturned'] < recipient['formsSent']:
+        keys.append(('status', 'not-returned'))
+    return keys
+
+class TrackingCache:
+    """
+    Process-wide read cache of tracking spreadsheet snapshots.
+    
+    A snapshot is reused until the spreadsheet's inode, modification time or
+    size changes, or until a write through TrackingDatabase invalidates it.
+    Snapshots are tuples of read-only mappings, so concurrent requests can
+    share them, and the indexes built on them, without copying.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+    
+    def get(self, file_path, loader):
+        """
+        Get the snapshot for a file, loading it if missing or stale.
+        
+        Args:
+            file_path (str): Path to the tracking spreadsheet
+            loader (callable): Function that loads records from the file path
+            
+        Returns:
+            TrackingSnapshot: Immutable snapshot of tracking records
+        """
+        file_path = os.path.abspath(file_path)
+        signature = file_signature(file_path)
+        
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+            
+            snapshot = TrackingSnapshot(MappingProxyType(record) for record in loader(file_path)) if signature else TrackingSnapshot()
+            self._entries[file_path] = (signature, snapshot)
+            return snapshot
+    
+    def invalidate(self, file_path=None):
+        """
+        Drop cached snapshots.
+        
+        Args:
+            file_path (str, optional): Spreadsheet to invalidate, all if None
+        """
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+tracking_cache = TrackingCache()
+
+# Number of entries kept in the recent activity ring buffer
+RECENT_ACTIVITY_SIZE = 20
+
+class TrackingStats:
+    """
+    Materialized dashboard counters and recent activity for tracking spreadsheets.
+    
+    Counters are kept in a JSON file next to the spreadsheet, tagged with the
+    spreadsheet signature they describe. Writes through TrackingDatabase apply
+    status deltas to them incrementally; if the spreadsheet was changed by
+    anything else, the counters are rebuilt once from a tracking snapshot.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+    
+    @staticmethod
+    def stats_path(file_path):
+        """
+        Get the path of the counters file for a tracking spreadsheet.
+        
+        Args:
+            file_path (str): Path to the tracking spreadsheet
+            
+        Returns:
+            str: Path to the counters JSON file
+        """
+        return os.path.splitext(file_path)[0] + '_stats.json'
+    
+    def _load_state(self, file_path):
+        state = self._states.get(file_path)
+        if state is None:
+            try:
+                with open(self.stats_path(file_path), 'r') as f:
+                    data = json.load(f)
+                state = {
+                    'signature': tuple(data['signature']) if data.get('signature') else None,
+                    'counters': data['counters'],
+                    'recent_activity': deque(data['recent_activity'], maxlen=RECENT_ACTIVITY_SIZE)
+                }
+            except (OSError, ValueError, KeyError):
+                return None
+            self._states[file_path] = state
+        return state
+    
+    def _save_state(self, file_path, state):
+        self._states[file_path] = state
+        stats_path = self.stats_path(file_path)
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(stats_path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'signature': list(state['signature']) if state['signature'] else None,
+                    'counters': state['counters'],
+                    'recent_activity': list(state['recent_activity'])
+                }, f)
+            os.replace(temp_path, stats_path)
+        except OSError as e:
+            print(f"Error saving tracking stats: {e}")
+    
+    @staticmethod
+    def _rebuild(file_path):
+        """
+        Compute counters and recent activity from a full tracking snapshot.
+        
+        Args:
+            file_path (str): Path to the tracking spreadsheet
+            
+        Returns:
+            dict: Stats state
+        """
+        # Taken before reading, so a write during the rebuild leaves the counters stale rather than wrong
+        signature = file_signature(file_path)
+        records = tracking_cache.get(file_path, load_tracking_records)
+        
+        counters = {'recipients': 0, 'emails_sent': 0, 'forms_returned': 0, 'forms_processed': 0}
+        activities = []
+        recipients = set()
+        for record in records:
+            if record['recipient_email']:
+                recipients.add(normalize_email(record['recipient_email']))
+            if record['email_status'] == 'Sent':
+                counters['emails_sent'] += 1
+                if record['date_sent']:
+                    activities.append(activity_entry(record['date_sent'], 'Sent', record['recipient_name']))
+            if record['returned']:
+                counters['forms_returned'] += 1
+                if record['date_returned']:
+                    activities.append(activity_entry(record['date_returned'], 'Returned', record['recipient_name']))
+            if record['processed']:
+                counters['forms_processed'] += 1
+        counters['recipients'] = len(recipients)
+        
+        recent = heapq.nlargest(RECENT_ACTIVITY_SIZE, activities, key=lambda activity: activity['date'])
+        return {
+            'signature': signature,
+            'counters': counters,
+            'recent_activity': deque(reversed(recent), maxlen=RECENT_ACTIVITY_SIZE)
+        }
+    
+    def get(self, file_path):
+        """
+        Get dashboard counters and recent activity, newest activity first.
+        
+        Args:
+            file_path (str): Path to the tracking spreadsheet
+            
+        Returns:
+            dict: 'counters' and 'recent_activity'
+        """
+        file_path = os.path.abspath(file_path)
+        signature = file_signature(file_path)
+        
+        with self._lock:
+            state = self._states.get(file_path)
+            if state is None or state['signature'] != signature:
+                # Another process may have updated the counters file
+                self._states.pop(file_path, None)
+                state = self._load_state(file_path)
+                if state is None or state['signature'] != signature:
+                    state = self._rebuild(file_path)
+                    self._save_state(file_path, state)
+            
+            return {
+                'counters': dict(state['counters']),
+                'recent_activity': list(reversed(state['recent_activity']))
+            }
+    
+    def apply(self, file_path, before_signature, deltas, activities=()):
+        """
+        Apply the effect of a write to the materialized counters.
+        
+        Args:
+            file_path (str): Path to the tracking spreadsheet
+            before_signature (tuple): Spreadsheet signature before the write
+            deltas (dict): Counter name -> change
+            activities (iterable): Activity entries produced by the write
+        """
+        file_path = os.path.abspath(file_path)
+        
+        with self._lock:
+            self._states.pop(file_path, None)
+            state = self._load_state(file_path)
+            if state is None or state['signature'] != before_signature:
+                # Counters no longer describe the file; rebuild on next read
+                self._states.pop(file_path, None)
+                return
+            
+            for name, change in deltas.items():
+                state['counters'][name] = state['counters'].get(name, 0) + change
+            state['recent_activity'].extend(activities)
+            state['signature'] = file_signature(file_path)
+            self._save_state(file_path, state)
+
+dashboard_stats = TrackingStats()
+
+def activity_entry(date, status, name):
+    """
+    Build a recent activity entry.
+    
+    Args:
+        date (str): ISO date of the event
+        status (str): Event status ('Sent', 'Returned', 'Processed')
+        name (str): Recipient's name
+        
+    Returns:
+        dict: Activity entry
+    """
+    descriptions = {
+        'Sent': f"Form sent to {name}",
+        'Returned': f"Form returned from {name}",
+        'Processed': f"Form processed for {name}"
+    }
+    return {'date': date, 'activity': descriptions.get(status, f"{status}: {name}"), 'status': status}
+
+def status_deltas(before, after):
+    """
+    Compute counter changes between two versions of a tracking row.
+    
+    Args:
+        before (dict): Row values before the write, or None for a new row
+        after (dict): Row values after the write
+        
+    Returns:
+        dict: Counter name -> change
+    """
+    before = before or {}
+    checks = {
+        'emails_sent': lambda row: row.get('Email Status') == 'Sent',
+        'forms_returned': lambda row: row.get('Form Status') == 'Returned',
+        'forms_processed': lambda row: row.get('Processing Status') == 'Completed'
+    }
+    deltas = {name: int(check(after)) - int(check(before)) for name, check in checks.items()}
+    return {name: change for name, change in deltas.items() if change}
+
+def normalize_email(email):
+    """
+    Normalize an email address for comparisons between recipients.
+    
+    Args:
+        email (str): Email address as entered, imported or read from a message
+        
+    Returns:
+        str: Address without surrounding whitespace, in lower case
+    """
+    return str(email).strip().lower()
+
+def is_valid_email(email):
+    """
+    Check that a value looks like an email address.
+    
+    Args:
+        email (str): Value to check
+    
+    Returns:
+        bool: True if the value is a plausible email address
+    """
+    return isinstance(email, str) and EMAIL_PATTERN.match(email) is not None
+
+def read_import_rows(source, filename=None):
+    """
+    Open a CSV or Excel recipients file for reading row by row.
+    
+    The header row is read straight away, so a file without an email
+    column is rejected before any rows are processed.
+    
+    Args:
+        source (str or file): Path or binary file object of the import file
+        filename (str, optional): File name used to detect the format, if source is a file object
+    
+    Returns:
+        generator: (row number, {'Email': ..., 'Name': ...}) for every non-empty data row
+    """
+    name = (filename or (source if isinstance(source, str) else '')).lower()
+    if name.endswith('.csv'):
+        if isinstance(source, str):
+            stream = open(source, 'r', encoding='utf-8-sig', newline='')
+            close = stream.close
+        else:
+            stream = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+            # Leave the caller's file open
+            close = stream.detach
+        rows = csv.reader(stream)
+    elif name.endswith('.xlsx'):
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        close = workbook.close
+    else:
+        raise ValueError("Import file must be a .csv or .xlsx file")
+    
+    header = [str(cell).strip().lower() if cell is not None else '' for cell in next(rows, ())]
+    columns = {
+        field: next((i for i, column in enumerate(header) if column in names), None)
+        for field, names in IMPORT_COLUMNS.items()
+    }
+    if columns['Email'] is None:
+        close()
+        raise ValueError("Import file has no Email column")
+    
+    def generate():
+        try:
+            for row_number, row in enumerate(rows, start=2):
+                values = {
+                    field: row[i] if i is not None and i < len(row) else None
+                    for field, i in columns.items()
+                }
+                if any(value not in (None, '') for value in values.values()):
+                    yield row_number, values
+        finally:
+            close()
+    
+    return generate()
+
 class TrackingDatabase:
     def __init__(self, file_path):
         """
@@ -27,19 +798,26 @@ class TrackingDatabase:
             'Date Received', 'Form Status', 'Form Path', 'Processing Status'
         ]
         
-        # Create the database if it doesn't exist
-        if not os.path.exists(file_path):
+        self.prepare()
+    
+    @write_locked
+    def prepare(self):
+        """
+        Create the database if it doesn't exist, or add missing columns to it.
+        """
+        if not os.path.exists(self.file_path):
             self.create_new_database()
         else:
             # Validate existing database
             try:
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(self.file_path)
                 missing_columns = [col for col in self.required_columns if col not in df.columns]
                 if missing_columns:
                     print(f"Adding missing columns to tracking database: {missing_columns}")
                     for col in missing_columns:
                         df[col] = None
-                    df.to_excel(file_path, index=False)
+                    df.to_excel(self.file_path, index=False)
+                    tracking_cache.invalidate(self.file_path)
             except Exception as e:
                 print(f"Error validating tracking database: {e}")
                 self.create_new_database()
@@ -52,7 +830,7 @@ class TrackingDatabase:
         df = pd.DataFrame(columns=self.required_columns)
         
         # Save the dataframe to Excel
-        df.to_excel(self.file_path, index=False)
+        self.save(df)
         
         # Apply formatting
         self.apply_formatting()
@@ -67,24 +845,13 @@ class TrackingDatabase:
         wb = load_workbook(self.file_path)
         ws = wb.active
         
-        # Define styles
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        centered_alignment = Alignment(horizontal="center", vertical="center")
-        border = Border(
-            left=Side(style="thin"), 
-            right=Side(style="thin"), 
-            top=Side(style="thin"), 
-            bottom=Side(style="thin")
-        )
-        
         # Format headers
         for col in range(1, len(self.required_columns) + 1):
             cell = ws.cell(row=1, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = centered_alignment
-            cell.border = border
+            cell.fill = HEADER_FILL
+            cell.font = HEADER_FONT
+            cell.alignment = HEADER_ALIGNMENT
+            cell.border = HEADER_BORDER
             
             # Adjust column width based on header text
             column_letter = get_column_letter(col)
@@ -92,7 +859,85 @@ class TrackingDatabase:
         
         # Save the formatted workbook
         wb.save(self.file_path)
+        tracking_cache.invalidate(self.file_path)
     
+    def save(self, df):
+        """
+        Write the tracking dataframe and invalidate cached snapshots.
+        
+        Args:
+            df (pd.DataFrame): Tracking dataframe to save
+        """
+        df.to_excel(self.file_path, index=False)
+        tracking_cache.invalidate(self.file_path)
+    
+    def record_stats(self, before_signature, deltas, activities=()):
+        """
+        Update the materialized dashboard counters after a write.
+        
+        Args:
+            before_signature (tuple): Spreadsheet signature before the write
+            deltas (dict): Counter name -> change
+            activities (iterable): Activity entries produced by the write
+        """
+        dashboard_stats.apply(self.file_path, before_signature, deltas, activities)
+    
+    def record_row_change(self, before_signature, old_row, new_row):
+        """
+        Update the dashboard counters for a changed or added tracking row.
+        
+        Args:
+            before_signature (tuple): Spreadsheet signature before the write
+            old_row (dict): Row values before the write, or None for a new row
+            new_row (dict): Row values after the write
+        """
+        self.record_row_changes(before_signature, [(old_row, new_row)])
+    
+    def record_row_changes(self, before_signature, changes):
+        """
+        Update the dashboard counters for the rows changed or added by one write.
+        
+        Args:
+            before_signature (tuple): Spreadsheet signature before the write
+            changes (list): (row before the write or None for a new row, row after the write) pairs
+        """
+        deltas = {}
+        activities = []
+        now = datetime.datetime.now().isoformat()
+        for old_row, new_row in changes:
+            row_deltas = status_deltas(old_row, new_row)
+            if old_row is None:
+                # Rows are only added for addresses not already in the database
+                row_deltas['recipients'] = 1
+            
+            if row_deltas.get('emails_sent', 0) > 0:
+                activities.append(activity_entry(_cell_value(new_row.get('Date Sent')) or now, 'Sent', new_row.get('Name')))
+            if row_deltas.get('forms_returned', 0) > 0:
+                activities.append(activity_entry(_cell_value(new_row.get('Date Received')) or now, 'Returned', new_row.get('Name')))
+            if row_deltas.get('forms_processed', 0) > 0:
+                activities.append(activity_entry(now, 'Processed', new_row.get('Name')))
+            
+            for name, change in row_deltas.items():
+                deltas[name] = deltas.get(name, 0) + change
+        
+        self.record_stats(before_signature, deltas, activities)
+    
+    @staticmethod
+    def find_recipient(df, email):
+        """
+        Find a recipient's rows, comparing addresses like the import does.
+        
+        Args:
+            df (pd.DataFrame): Tracking dataframe
+            email (str): Recipient's email address, in any case
+            
+        Returns:
+            pd.Index: Index of the matching rows
+        """
+        emails = df['Email'].where(df['Email'].notna(), '').astype(str).str.strip().str.lower()
+        return df[emails == normalize_email(email)].index
+    
+    @write_locked
     def add_recipients(self, recipients_list):
         """
         Add new recipients to the tracking database.
@@ -104,18 +949,26 @@ class TrackingDatabase:
             int: Number of recipients added
         """
         # Load the current database
+        before = file_signature(self.file_path)
         df = pd.read_excel(self.file_path)
         
+        # Addresses are compared like the import does, ignoring case and surrounding whitespace
+        seen = {normalize_email(email) for email in df['Email'] if isinstance(email, str)}
+        
         # Process each recipient
         added_count = 0
         for recipient in recipients_list:
             if 'Email' in recipient and recipient['Email']:
+                email = str(recipient['Email']).strip()
+                
                 # Check if recipient already exists
-                if not df[df['Email'] == recipient['Email']].shape[0]:
+                if normalize_email(email) not in seen:
+                    seen.add(normalize_email(email))
+                    
                     # Create a new record
                     new_record = {
                         'Name': recipient.get('Name', ''),
-                        'Email': recipient.get('Email', ''),
+                        'Email': email,
                         'Email Status': 'Not Sent',
                         'Form Status': 'Not Returned',
                         'Processing Status': 'Not Started'
@@ -127,12 +980,113 @@ class TrackingDatabase:
         
         # Save the updated database
         if added_count > 0:
-            df.to_excel(self.file_path, index=False)
+            self.save(df)
             self.apply_formatting()
+            self.record_stats(before, {'recipients': added_count})
             print(f"Added {added_count} new recipients to the tracking database")
         
         return added_count
     
+    @write_locked
+    def import_recipients(self, source, filename=None):
+        """
+        Stream recipients from a CSV or Excel file into the tracking database.
+        
+        The tracking spreadsheet and the import file are both read row by
+        row and written to a new spreadsheet in one pass, so memory is
+        bounded by the set of known email addresses rather than the size
+        of either file. Rows without a valid email address, or with an
+        address already in the database or earlier in the file, are skipped.
+        
+        Args:
+            source (str or file): Path or binary file object of the import file
+            filename (str, optional): File name used to detect the format, if source is a file object
+        
+        Returns:
+            dict: Row counts ('total', 'imported', 'duplicates', 'invalid') and the first rejected rows in 'errors'
+        """
+        rows = read_import_rows(source, filename)
+        before = file_signature(self.file_path)
+        summary = {'total': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+        
+        existing = load_workbook(self.file_path, read_only=True)
+        output = Workbook(write_only=True)
+        ws = output.create_sheet()
+        try:
+            existing_rows = existing.active.iter_rows(values_only=True)
+            header = list(next(existing_rows, ()))
+            while header and header[-1] is None:
+                header.pop()
+            header = header or list(self.required_columns)
+            email_column = header.index('Email')
+            
+            # Write-only sheets take their formatting as the rows are written
+            for col, column in enumerate(header, start=1):
+                ws.column_dimensions[get_column_letter(col)].width = max(15, len(str(column)) + 2)
+            header_cells = []
+            for column in header:
+                cell = WriteOnlyCell(ws, value=column)
+                cell.fill = HEADER_FILL
+                cell.font = HEADER_FONT
+                cell.alignment = HEADER_ALIGNMENT
+                cell.border = HEADER_BORDER
+                header_cells.append(cell)
+            ws.append(header_cells)
+            
+            # Copy the existing rows, remembering their addresses
+            seen = set()
+            for row in existing_rows:
+                ws.append(row[:len(header)])
+                email = row[email_column] if email_column < len(row) else None
+                if isinstance(email, str):
+                    seen.add(normalize_email(email))
+            
+            for row_number, values in rows:
+                summary['total'] += 1
+                email = str(values['Email']).strip() if values['Email'] is not None else ''
+                
+                if not is_valid_email(email):
+                    summary['invalid'] += 1
+                    if len(summary['errors']) < MAX_IMPORT_ERRORS:
+                        summary['errors'].append({'row': row_number, 'email': email, 'error': 'Invalid email address'})
+                    continue
+                
+                if normalize_email(email) in seen:
+                    summary['duplicates'] += 1
+                    continue
+                seen.add(normalize_email(email))
+                
+                new_record = {
+                    'Name': str(values['Name']).strip() if values['Name'] is not None else '',
+                    'Email': email,
+                    'Email Status': 'Not Sent',
+                    'Form Status': 'Not Returned',
+                    'Processing Status': 'Not Started'
+                }
+                ws.append([new_record.get(column) for column in header])
+                summary['imported'] += 1
+        finally:
+            existing.close()
+            rows.close()
+        
+        # Replace the spreadsheet atomically so readers never see a partial file
+        if summary['imported'] > 0:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.file_path)), suffix='.xlsx')
+            os.close(fd)
+            try:
+                output.save(temp_path)
+                os.replace(temp_path, self.file_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            tracking_cache.invalidate(self.file_path)
+            self.record_stats(before, {'recipients': summary['imported']})
+        
+        print(f"Imported {summary['imported']} of {summary['total']} recipients "
+              f"({summary['duplicates']} duplicates, {summary['invalid']} invalid)")
+        return summary
+    
+    @write_locked
     def update_email_status(self, email, status, sent_date=None):
         """
         Update the email status for a recipient.
@@ -146,12 +1100,15 @@ class TrackingDatabase:
             bool: True if the update was successful, False otherwise
         """
         # Load the current database
+        before = file_signature(self.file_path)
         df = pd.read_excel(self.file_path)
         
         # Find the recipient
-        recipient_idx = df[df['Email'] == email].index
+        recipient_idx = self.find_recipient(df, email)
         
         if len(recipient_idx) > 0:
+            old_row = df.loc[recipient_idx[0]].to_dict()
+            
             # Update the status
             df.loc[recipient_idx[0], 'Email Status'] = status
             
@@ -163,11 +1120,13 @@ class TrackingDatabase:
                     df.loc[recipient_idx[0], 'Date Sent'] = datetime.datetime.now()
             
             # Save the updated database
-            df.to_excel(self.file_path, index=False)
+            self.save(df)
+            self.record_row_change(before, old_row, df.loc[recipient_idx[0]].to_dict())
             return True
         
         return False
     
+    @write_locked
     def update_form_status(self, email, status, form_path=None, received_date=None):
         """
         Update the form status for a recipient.
@@ -182,12 +1141,15 @@ class TrackingDatabase:
             bool: True if the update was successful, False otherwise
         """
         # Load the current database
+        before = file_signature(self.file_path)
         df = pd.read_excel(self.file_path)
         
         # Find the recipient
-        recipient_idx = df[df['Email'] == email].index
+        recipient_idx = self.find_recipient(df, email)
         
         if len(recipient_idx) > 0:
+            old_row = df.loc[recipient_idx[0]].to_dict()
+            
             # Update the status
             df.loc[recipient_idx[0], 'Form Status'] = status
             
@@ -203,11 +1165,13 @@ class TrackingDatabase:
                     df.loc[recipient_idx[0], 'Date Received'] = datetime.datetime.now()
             
             # Save the updated database
-            df.to_excel(self.file_path, index=False)
+            self.save(df)
+            self.record_row_change(before, old_row, df.loc[recipient_idx[0]].to_dict())
             return True
         
         return False
     
+    @write_locked
     def update_processing_status(self, email, status):
         """
         Update the processing status for a recipient's form.
@@ -220,21 +1184,116 @@ class TrackingDatabase:
             bool: True if the update was successful, False otherwise
         """
         # Load the current database
+        before = file_signature(self.file_path)
         df = pd.read_excel(self.file_path)
         
         # Find the recipient
-        recipient_idx = df[df['Email'] == email].index
+        recipient_idx = self.find_recipient(df, email)
         
         if len(recipient_idx) > 0:
+            old_row = df.loc[recipient_idx[0]].to_dict()
+            
             # Update the status
             df.loc[recipient_idx[0], 'Processing Status'] = status
             
             # Save the updated database
-            df.to_excel(self.file_path, index=False)
+            self.save(df)
+            self.record_row_change(before, old_row, df.loc[recipient_idx[0]].to_dict())
             return True
         
         return False
     
+    def get_tracking_data(self):
+        """
+        Get tracking records from the shared read cache.
+        
+        Returns:
+            tuple: Immutable snapshot of tracking record mappings
+        """
+        return get_tracking_data(self.file_path)
+    
+    def add_tracking_record(self, email, name, form_id=None, form_name=None, sent_date=None):
+        """
+        Record that a form was sent to a recipient, adding the recipient if needed.
+        
+        Args:
+            email (str): Recipient's email address
+            name (str): Recipient's name
+            form_id (str, optional): ID of the form that was sent
+            form_name (str, optional): Name of the form that was sent
+            sent_date (datetime, optional): Date when the email was sent
+            
+        Returns:
+            bool: True if the record was written
+        """
+        return self.add_tracking_records([{
+            'email': email,
+            'name': name,
+            'form_id': form_id,
+            'form_name': form_name,
+            'sent_date': sent_date
+        }]) > 0
+    
+    @write_locked
+    def add_tracking_records(self, records):
+        """
+        Record a batch of sent forms, adding recipients if needed.
+        
+        The spreadsheet is read and written once for the whole batch.
+        
+        Args:
+            records (list): Dictionaries with 'email' and 'name', and optionally
+                'form_id', 'form_name' and 'sent_date'
+            
+        Returns:
+            int: Number of records written
+        """
+        if not records:
+            return 0
+        
+        # Load the current database
+        before = file_signature(self.file_path)
+        df = pd.read_excel(self.file_path)
+        
+        for col in ['Form ID', 'Form Name']:
+            if col not in df.columns:
+                df[col] = None
+        for col in ['Date Sent', 'Email Status', 'Form ID', 'Form Name']:
+            df[col] = df[col].astype(object)
+        
+        # Row index -> row values before the batch, None for added rows
+        old_rows = {}
+        for record in records:
+            email = record['email']
+            
+            # Find the recipient, or add a new row
+            recipient_idx = self.find_recipient(df, email)
+            if len(recipient_idx) > 0:
+                idx = recipient_idx[0]
+                if idx not in old_rows:
+                    old_rows[idx] = df.loc[idx].to_dict()
+            else:
+                idx = len(df)
+                old_rows[idx] = None
+                df = pd.concat([df, pd.DataFrame([{
+                    'Name': record['name'],
+                    'Email': str(email).strip(),
+                    'Form Status': 'Not Returned',
+                    'Processing Status': 'Not Started'
+                }])], ignore_index=True).astype({col: object for col in ['Date Sent', 'Email Status', 'Form ID', 'Form Name']})
+            
+            # Update the sent information
+            sent_date = record.get('sent_date')
+            df.loc[idx, 'Email Status'] = 'Sent'
+            df.loc[idx, 'Date Sent'] = sent_date if isinstance(sent_date, datetime.datetime) else datetime.datetime.now()
+            df.loc[idx, 'Form ID'] = record.get('form_id')
+            df.loc[idx, 'Form Name'] = record.get('form_name')
+        
+        # Save the updated database
+        self.save(df)
+        self.record_row_changes(before, [(old_row, df.loc[idx].to_dict()) for idx, old_row in old_rows.items()])
+        return len(records)
+    
     def get_recipients_by_status(self, email_status=None, form_status=None, processing_status=None):
         """
         Get recipients filtered by various status fields.
@@ -305,6 +1364,140 @@ class TrackingDatabase:
         
         return report
 
+def _cell_value(value):
+    """
+    Convert a spreadsheet cell to a JSON-friendly value.
+    
+    Args:
+        value: Cell value read by pandas
+        
+    Returns:
+        Value with missing cells as None and dates as ISO strings
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+def load_tracking_records(file_path):
+    """
+    Load tracking spreadsheet rows as tracking record dictionaries.
+    
+    Args:
+        file_path (str): Path to the tracking spreadsheet
+        
+    Returns:
+        list: List of tracking record dictionaries
+    """
+    df = pd.read_excel(file_path)
+    
+    def column(name):
+        if name in df.columns:
+            return [_cell_value(value) for value in df[name]]
+        return [None] * len(df)
+    
+    rows = zip(
+        column('Email'), column('Name'), column('Form ID'), column('Form Name'),
+        column('Date Sent'), column('Email Status'), column('Date Received'),
+        column('Form Status'), column('Form Path'), column('Processing Status'),
+        column('Date Processed')
+    )
+    
+    records = []
+    for i, (email, name, form_id, form_name, date_sent, email_status, date_received,
+            form_status, form_path, processing_status, date_processed) in enumerate(rows):
+        records.append({
+            'id': i + 1,
+            'recipient_email': email,
+            'recipient_name': name,
+            'form_id': form_id,
+            'form_name': form_name,
+            'date_sent': date_sent,
+            'email_status': email_status,
+            'returned': form_status == 'Returned',
+            'date_returned': date_received,
+            'form_path': form_path,
+            'processed': processing_status == 'Completed',
+            'processing_status': processing_status,
+            'date_processed': date_processed
+        })
+    
+    return records
+
+def get_tracking_data(tracking_file=None):
+    """
+    Get tracking records through the shared read cache.
+    
+    Args:
+        tracking_file (str, optional): Path to the tracking spreadsheet
+        
+    Returns:
+        TrackingSnapshot: Immutable snapshot of tracking record mappings
+    """
+    return tracking_cache.get(tracking_file or DEFAULT_TRACKING_FILE, load_tracking_records)
+
+def get_dashboard_stats(tracking_file=None):
+    """
+    Get materialized dashboard counters and recent activity.
+    
+    Args:
+        tracking_file (str, optional): Path to the tracking spreadsheet
+        
+    Returns:
+        dict: 'counters' and 'recent_activity', newest activity first
+    """
+    return dashboard_stats.get(tracking_file or DEFAULT_TRACKING_FILE)
+
+def add_tracking_record(recipient_email, recipient_name, form_id=None, form_name=None, tracking_file=None):
+    """
+    Record a sent form in the tracking spreadsheet.
+    
+    Args:
+        recipient_email (str): Recipient's email address
+        recipient_name (str): Recipient's name
+        form_id (str, optional): ID of the form that was sent
+        form_name (str, optional): Name of the form that was sent
+        tracking_file (str, optional): Path to the tracking spreadsheet
+        
+    Returns:
+        bool: True if the record was written
+    """
+    db = TrackingDatabase(tracking_file or DEFAULT_TRACKING_FILE)
+    return db.add_tracking_record(recipient_email, recipient_name, form_id, form_name)
+
+def add_tracking_records(records, tracking_file=None):
+    """
+    Record a batch of sent forms in the tracking spreadsheet with one write.
+    
+    Args:
+        records (list): Dictionaries with 'email' and 'name', and optionally
+            'form_id', 'form_name' and 'sent_date'
+        tracking_file (str, optional): Path to the tracking spreadsheet
+        
+    Returns:
+        int: Number of records written
+    """
+    db = TrackingDatabase(tracking_file or DEFAULT_TRACKING_FILE)
+    return db.add_tracking_records(records)
+
+def import_recipients(source, filename=None, tracking_file=None):
+    """
+    Import recipients from a CSV or Excel file into the tracking spreadsheet.
+    
+    Args:
+        source (str or file): Path or binary file object of the import file
+        filename (str, optional): File name used to detect the format, if source is a file object
+        tracking_file (str, optional): Path to the tracking spreadsheet
+    
+    Returns:
+        dict: Import summary (see TrackingDatabase.import_recipients)
+    """
+    db = TrackingDatabase(tracking_file or DEFAULT_TRACKING_FILE)
+    return db.import_recipients(source, filename)
+
 if __name__ == "__main__":
     print("Tracking Database Creator - Use this module by importing it in your main script")
     print("Example usage:")
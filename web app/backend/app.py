@@ -1,15 +1,24 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, make_response, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import json
+import hashlib
+import mimetypes
 import datetime
+import functools
+import tempfile
+import time
 import sys
 
 # Add parent directory to path to import from scripts
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from scripts import tracking_database, email_sender, pdf_extractor, excel_transfer, sharepoint_onedrive
+from scripts.forms_registry import FormsRegistry
+import jobs
+from static_assets import StaticAssets, COMPRESS_MIN_SIZE, choose_encoding, compress
+from uploads import StreamingUploadRequest
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend')
@@ -18,6 +27,7 @@ CORS(app)
 # Configure JWT
 app.config['JWT_SECRET_KEY'] = 'your-secret-key'  # Change this in production
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = datetime.timedelta(days=1)
+app.config['JWT_TOKEN_LOCATION'] = ['headers']
 jwt = JWTManager(app)
 
 # Load configuration
@@ -48,19 +58,152 @@ def load_config():
 
 def save_config(config):
     os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-    with open(CONFIG_PATH, 'w') as f:
+    # Replace the file atomically so other workers never read a partial config
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(CONFIG_PATH), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
         json.dump(config, f, indent=2)
+    os.replace(temp_path, CONFIG_PATH)
 
 config = load_config()
+config_signature = tracking_database.file_signature(CONFIG_PATH)
+
+@app.before_request
+def refresh_config():
+    """
+    Reload the configuration when config.json was changed by another worker.
+    
+    The module-level config is updated in place, so every view, and the
+    ETag of the settings, describe the same version of the file.
+    """
+    global config_signature
+    signature = tracking_database.file_signature(CONFIG_PATH)
+    if signature and signature != config_signature:
+        config.update(load_config())
+        config_signature = signature
+
+# Directory of uploaded form PDFs and the registry of their metadata
+FORMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
+forms_registry = FormsRegistry(FORMS_PATH, os.path.join(os.path.dirname(CONFIG_PATH), 'forms_registry.db'), watch=True)
+
+# Form uploads are streamed to a temporary file in the forms directory while
+# being hashed, so memory use doesn't grow with the upload size
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE_MB', 200)) * 1024 * 1024
+
+class FormUploadRequest(StreamingUploadRequest):
+    upload_dir = FORMS_PATH
+    max_upload_size = MAX_UPLOAD_SIZE
+    stream_endpoints = ('create_form',)
+
+app.request_class = FormUploadRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE + 1024 * 1024
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    return jsonify({"error": f"Upload exceeds the {MAX_UPLOAD_SIZE // (1024 * 1024)} MB limit"}), 413
+
+# Queue for long-running operations, processed by the job workers
+job_queue = jobs.JobQueue()
+
+# Event stream timing, in seconds. Streams end before the gunicorn timeout
+# and clients reconnect with Last-Event-ID.
+EVENT_POLL_INTERVAL = 0.5
+EVENT_STREAM_DURATION = 60
+EVENT_HEARTBEAT_INTERVAL = 15
+MAX_LONG_POLL_TIMEOUT = 30
+
+# Pagination limits for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def conditional(*sources):
+    """
+    Answer conditional GETs from the signatures of the files a view reads.
+    
+    The ETag covers the source signatures and the query string, so a 304 is
+    returned before the view loads any data.
+    
+    Args:
+        *sources: Callables returning the paths the response is built from
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            signatures = [tracking_database.file_signature(source()) for source in sources]
+            etag = hashlib.sha1(
+                json.dumps([signatures, request.path, request.query_string.decode()]).encode()
+            ).hexdigest()
+            mtimes = [signature[1] for signature in signatures if signature]
+            last_modified = datetime.datetime.fromtimestamp(max(mtimes) // 10**9, datetime.timezone.utc) if mtimes else None
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(last_modified and request.if_modified_since and last_modified <= request.if_modified_since)
+            
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            # Weak, since the body may be sent with different encodings
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+# Content-hashed, precompressed js/ and css/ assets
+static_assets = StaticAssets(app.static_folder)
+
+def encoded_response(content, mimetype, cache_control):
+    """Send the best precompressed variant of a body the client accepts."""
+    encoding = choose_encoding(request.accept_encodings)
+    response = Response(content.get(encoding, content[None]), mimetype=mimetype)
+    if encoding in content:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON responses above the size threshold."""
+    if (response.mimetype != 'application/json' or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
 
 # Serve static files
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    if path and os.path.exists(os.path.join(app.static_folder, path)):
+    # Hashed asset names never change content, so they are cached for a year
+    asset = static_assets.lookup(path)
+    if asset:
+        return encoded_response(asset['content'], mimetypes.guess_type(path)[0], 'public, max-age=31536000, immutable')
+    
+    if path and path != 'index.html' and os.path.exists(os.path.join(app.static_folder, path)):
         return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    
+    # The index is always revalidated so it picks up new asset hashes
+    index = static_assets.render_index()
+    response = encoded_response(index['content'], 'text/html', 'no-cache')
+    response.set_etag(index['etag'], weak=True)
+    return response.make_conditional(request)
 
 # Authentication routes
 @app.route('/api/auth/login', methods=['POST'])
@@ -138,81 +281,44 @@ def get_user():
 @app.route('/api/dashboard/summary', methods=['GET'])
 @jwt_required()
 def get_dashboard_summary():
-    # Get tracking data
-    tracking_data = tracking_database.get_tracking_data()
+    # Get materialized tracking counters
+    stats = tracking_database.get_dashboard_stats()
+    counters = stats['counters']
     
     # Count forms
-    forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-    forms_count = len([f for f in os.listdir(forms_path) if f.endswith('.pdf')]) if os.path.exists(forms_path) else 0
-    
-    # Count recipients
-    recipients = set()
-    for record in tracking_data:
-        recipients.add(record['recipient_email'])
-    
-    # Count emails sent and forms returned
-    emails_sent = len(tracking_data)
-    forms_returned = sum(1 for record in tracking_data if record['returned'])
-    
-    # Get recent activity
-    recent_activity = []
-    for record in sorted(tracking_data, key=lambda x: x['date_sent'], reverse=True)[:5]:
-        activity = {
-            "date": record['date_sent'],
-            "activity": f"Form sent to {record['recipient_name']}",
-            "status": "Sent"
-        }
-        recent_activity.append(activity)
-        
-        if record['returned']:
-            activity = {
-                "date": record['date_returned'],
-                "activity": f"Form returned from {record['recipient_name']}",
-                "status": "Returned"
-            }
-            recent_activity.append(activity)
+    forms_count = forms_registry.count()
     
     return jsonify({
         "formsCount": forms_count,
-        "recipientsCount": len(recipients),
-        "emailsSentCount": emails_sent,
-        "formsReturnedCount": forms_returned,
-        "recentActivity": sorted(recent_activity, key=lambda x: x['date'], reverse=True)[:5]
+        "recipientsCount": counters['recipients'],
+        "emailsSentCount": counters['emails_sent'],
+        "formsReturnedCount": counters['forms_returned'],
+        "recentActivity": stats['recent_activity'][:5]
     })
 
 # Forms routes
 @app.route('/api/forms', methods=['GET'])
 @jwt_required()
+@conditional(lambda: FORMS_PATH)
 def get_forms():
-    forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-    if not os.path.exists(forms_path):
-        os.makedirs(forms_path)
-    
-    forms = []
-    for filename in os.listdir(forms_path):
-        if filename.endswith('.pdf'):
-            form_path = os.path.join(forms_path, filename)
-            form_stat = os.stat(form_path)
-            forms.append({
-                "id": filename,
-                "name": os.path.splitext(filename)[0],
-                "path": form_path,
-                "size": form_stat.st_size,
-                "created": datetime.datetime.fromtimestamp(form_stat.st_ctime).isoformat()
-            })
-    
-    return jsonify(forms)
+    return jsonify(forms_registry.list())
 
 @app.route('/api/forms/<form_id>', methods=['GET'])
 @jwt_required()
 def get_form(form_id):
-    forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-    form_path = os.path.join(forms_path, form_id)
+    if forms_registry.get(form_id) is None:
+        return jsonify({"error": "Form not found"}), 404
     
-    if not os.path.exists(form_path):
+    return send_from_directory(FORMS_PATH, form_id)
+
+@app.route('/api/forms/<form_id>/schema', methods=['GET'])
+@jwt_required()
+def get_form_schema(form_id):
+    schema = forms_registry.get_schema(form_id)
+    if schema is None:
         return jsonify({"error": "Form not found"}), 404
     
-    return send_from_directory(forms_path, form_id)
+    return jsonify(schema)
 
 @app.route('/api/forms', methods=['POST'])
 @jwt_required()
@@ -226,37 +332,26 @@ def create_form():
         return jsonify({"error": "No selected file"}), 400
     
     if file and file.filename.endswith('.pdf'):
-        forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-        if not os.path.exists(forms_path):
-            os.makedirs(forms_path)
-        
-        filename = file.filename
-        file_path = os.path.join(forms_path, filename)
-        file.save(file_path)
+        # The upload was streamed to disk and hashed while it was received
+        upload = file.stream
+        if not upload.is_pdf:
+            return jsonify({"error": "File is not a PDF"}), 400
         
-        form_stat = os.stat(file_path)
+        filename = os.path.basename(file.filename)
+        file_path = os.path.join(FORMS_PATH, filename)
+        upload.commit(file_path)
         
-        return jsonify({
-            "id": filename,
-            "name": os.path.splitext(filename)[0],
-            "path": file_path,
-            "size": form_stat.st_size,
-            "created": datetime.datetime.fromtimestamp(form_stat.st_ctime).isoformat()
-        })
+        # Compute the form's metadata once, at upload time
+        return jsonify(forms_registry.register(file_path, upload.hexdigest()))
     
     return jsonify({"error": "Invalid file type"}), 400
 
 @app.route('/api/forms/<form_id>', methods=['DELETE'])
 @jwt_required()
 def delete_form(form_id):
-    forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-    form_path = os.path.join(forms_path, form_id)
-    
-    if not os.path.exists(form_path):
+    if not forms_registry.remove(form_id):
         return jsonify({"error": "Form not found"}), 404
     
-    os.remove(form_path)
-    
     return jsonify({"message": "Form deleted successfully"})
 
 @app.route('/api/forms/<form_id>/send', methods=['POST'])
@@ -272,75 +367,73 @@ def send_form(form_id):
     if not recipients:
         return jsonify({"error": "No recipients specified"}), 400
     
-    forms_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'forms')
-    form_path = os.path.join(forms_path, form_id)
-    
-    if not os.path.exists(form_path):
+    form = forms_registry.get(form_id)
+    if form is None:
         return jsonify({"error": "Form not found"}), 404
     
-    # Send emails
-    results = []
-    for recipient in recipients:
-        try:
-            # Personalize message
-            personalized_message = message.replace('{Name}', recipient['name'])
-            personalized_message += f"\n\n{config['email_templates']['signature']}"
-            
-            # Send email
-            email_sender.send_email(
-                recipient['email'],
-                recipient['name'],
-                subject,
-                personalized_message,
-                form_path
-            )
-            
-            # Track the sent form
-            tracking_database.add_tracking_record(
-                recipient['email'],
-                recipient['name'],
-                form_id,
-                os.path.splitext(form_id)[0]
-            )
-            
-            results.append({
-                "recipient": recipient,
-                "status": "sent",
-                "message": "Email sent successfully"
-            })
-        except Exception as e:
-            results.append({
-                "recipient": recipient,
-                "status": "failed",
-                "message": str(e)
-            })
+    # Queue the emails for the job workers
+    job_id = job_queue.enqueue('send_form', {
+        "form_id": form_id,
+        "form_path": form['path'],
+        "subject": subject,
+        "message": message,
+        "signature": config['email_templates']['signature'],
+        "recipients": recipients
+    }, get_jwt_identity())
+    
+    return jsonify({"jobId": job_id}), 202
+
+def page_args(default_sort, default_order='asc'):
+    """Parse pagination, filter and sort query parameters."""
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("Invalid limit")
     
-    return jsonify(results)
+    return {
+        "filters": {
+            "status": request.args.get('status'),
+            "form": request.args.get('form'),
+            "recipient": request.args.get('recipient')
+        },
+        "sort": request.args.get('sort', default_sort),
+        "descending": request.args.get('order', default_order).lower() == 'desc',
+        "cursor": request.args.get('cursor'),
+        "limit": limit,
+        "date_from": request.args.get('dateFrom'),
+        "date_to": request.args.get('dateTo')
+    }
+
+def page_response(page, items):
+    return jsonify({
+        "items": items,
+        "total": page['total'],
+        "nextCursor": page['next_cursor']
+    })
 
 # Recipients routes
 @app.route('/api/recipients', methods=['GET'])
 @jwt_required()
+@conditional(lambda: tracking_database.DEFAULT_TRACKING_FILE)
 def get_recipients():
-    # Get tracking data to extract unique recipients
+    # Query recipient aggregates of the cached tracking snapshot
     tracking_data = tracking_database.get_tracking_data()
     
-    recipients = {}
-    for record in tracking_data:
-        email = record['recipient_email']
-        if email not in recipients:
-            recipients[email] = {
-                "id": email,
-                "email": email,
-                "name": record['recipient_name'],
-                "formsSent": 0,
-                "formsReturned": 0
-            }
-        
-        recipients[email]['formsSent'] += 1
-        if record['returned']:
-            recipients[email]['formsReturned'] += 1
-    
-    return jsonify(list(recipients.values()))
+    try:
+        args = page_args('name')
+        args['filters'].pop('recipient')
+        page = tracking_data.recipients_index().query(**args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return page_response(page, [{
+        "id": recipient['id'],
+        "email": recipient['email'],
+        "name": recipient['name'],
+        "formsSent": recipient['formsSent'],
+        "formsReturned": recipient['formsReturned'],
+        "lastSent": recipient['lastSent']
+    } for recipient in page['items']])
 
 @app.route('/api/recipients', methods=['POST'])
 @jwt_required()
@@ -354,7 +447,14 @@ def create_recipient():
     if not email or not name:
         return jsonify({"error": "Missing email or name"}), 400
     
-    # We don't actually store recipients separately, just return success
+    email = email.strip()
+    if not tracking_database.is_valid_email(email):
+        return jsonify({"error": "Invalid email address"}), 400
+    
+    db = tracking_database.TrackingDatabase(tracking_database.DEFAULT_TRACKING_FILE)
+    if not db.add_recipients([{'Name': name, 'Email': email}]):
+        return jsonify({"error": "Recipient already exists"}), 409
+    
     return jsonify({
         "id": email,
         "email": email,
@@ -363,15 +463,42 @@ def create_recipient():
         "formsReturned": 0
     })
 
+@app.route('/api/recipients/import', methods=['POST'])
+@jwt_required()
+def import_recipients():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+    
+    # The upload was streamed to a temporary file, which is read back row by row
+    try:
+        summary = tracking_database.import_recipients(file.stream, file.filename)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        file.close()
+    
+    return jsonify(summary)
+
 # Tracking routes
 @app.route('/api/tracking', methods=['GET'])
 @jwt_required()
+@conditional(lambda: tracking_database.DEFAULT_TRACKING_FILE)
 def get_tracking():
     tracking_data = tracking_database.get_tracking_data()
     
+    try:
+        page = tracking_data.tracking_index().query(**page_args('dateSent', 'desc'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     # Convert to API format
     result = []
-    for record in tracking_data:
+    for record in page['items']:
         result.append({
             "id": record['id'],
             "recipientEmail": record['recipient_email'],
@@ -382,24 +509,23 @@ def get_tracking():
             "returned": record['returned'],
             "dateReturned": record['date_returned'] if record['returned'] else None,
             "processed": record['processed'],
-            "dateProcessed": record['date_processed'] if record['processed'] else None
+            "dateProcessed": record['date_processed'] if record['processed'] else None,
+            "status": "Returned" if record['returned'] else (record['email_status'] or "Not Sent")
         })
     
-    return jsonify(result)
+    return page_response(page, result)
 
 @app.route('/api/tracking/check-returns', methods=['POST'])
 @jwt_required()
 def check_returns():
-    # This would normally check email for returned forms
-    # For demo purposes, we'll just return a success message
-    return jsonify({
-        "message": "Check completed",
-        "newReturns": 0
-    })
+    job_id = job_queue.enqueue('check_returns', {}, get_jwt_identity())
+    
+    return jsonify({"jobId": job_id}), 202
 
 # Data extraction routes
 @app.route('/api/extraction', methods=['GET'])
 @jwt_required()
+@conditional(lambda: tracking_database.DEFAULT_TRACKING_FILE)
 def get_extraction():
     tracking_data = tracking_database.get_tracking_data()
     
@@ -429,18 +555,107 @@ def extract_data():
     if not form_ids:
         return jsonify({"error": "No forms specified"}), 400
     
-    # This would normally extract data from the forms
-    # For demo purposes, we'll just return a success message
+    job_id = job_queue.enqueue('extract', {"form_ids": form_ids}, get_jwt_identity())
+    
+    return jsonify({"jobId": job_id}), 202
+
+# Job routes
+@app.route('/api/jobs', methods=['GET'])
+@jwt_required()
+def get_jobs():
+    status = request.args.get('status')
+    try:
+        limit = min(int(request.args.get('limit', 50)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    
+    return jsonify(job_queue.list(status, limit))
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job)
+
+@app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_job(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    if not job_queue.cancel(job_id):
+        return jsonify({"error": "Job already finished"}), 409
+    
+    return jsonify(job_queue.get(job_id))
+
+# Event routes
+def event_cursor(value):
+    """Parse a last-seen event ID, defaulting to the newest event."""
+    if value in (None, ''):
+        return job_queue.last_event_id()
+    return int(value)
+
+# EventSource cannot set headers, so only the event stream takes ?jwt=<token>
+@app.route('/api/events/stream', methods=['GET'])
+@jwt_required(locations=['query_string'])
+def stream_events():
+    try:
+        last_event_id = event_cursor(request.headers.get('Last-Event-ID') or request.args.get('lastEventId'))
+    except ValueError:
+        return jsonify({"error": "Invalid event ID"}), 400
+    
+    def generate(last_event_id):
+        deadline = time.monotonic() + EVENT_STREAM_DURATION
+        last_write = time.monotonic()
+        yield f"retry: 1000\nid: {last_event_id}\n\n"
+        
+        while time.monotonic() < deadline:
+            events = job_queue.events_since(last_event_id)
+            for event in events:
+                last_event_id = event['id']
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            
+            if events:
+                last_write = time.monotonic()
+            else:
+                if time.monotonic() - last_write >= EVENT_HEARTBEAT_INTERVAL:
+                    yield ": heartbeat\n\n"
+                    last_write = time.monotonic()
+                time.sleep(EVENT_POLL_INTERVAL)
+    
+    return Response(stream_with_context(generate(last_event_id)), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@app.route('/api/events', methods=['GET'])
+@jwt_required()
+def poll_events():
+    try:
+        last_event_id = event_cursor(request.args.get('after'))
+        timeout = min(float(request.args.get('timeout', 25)), MAX_LONG_POLL_TIMEOUT)
+    except ValueError:
+        return jsonify({"error": "Invalid event ID or timeout"}), 400
+    
+    # Wait until events arrive or the timeout expires
+    deadline = time.monotonic() + timeout
+    events = job_queue.events_since(last_event_id)
+    while not events and time.monotonic() < deadline:
+        time.sleep(EVENT_POLL_INTERVAL)
+        events = job_queue.events_since(last_event_id)
+    
     return jsonify({
-        "message": "Extraction completed",
-        "processed": len(form_ids),
-        "successful": len(form_ids),
-        "failed": 0
+        "events": events,
+        "lastEventId": events[-1]['id'] if events else last_event_id
     })
 
 # Settings routes
 @app.route('/api/settings', methods=['GET'])
 @jwt_required()
+@conditional(lambda: CONFIG_PATH)
 def get_settings():
     # Return non-sensitive settings
     return jsonify({
@@ -486,4 +701,9 @@ def update_settings():
     })
 
 if __name__ == '__main__':
+    # Start the job workers in the reloader's serving process only
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        import tasks
+        tasks.start_workers(int(os.environ.get('JOB_WORKERS', 2)))
+    
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the web application.
+
+Runs a number of concurrent clients against API endpoints for a fixed
+duration and reports throughput and latency. Run it against the server
+once per gunicorn configuration to compare worker models, e.g.:
+
+    GUNICORN_WORKER_CLASS=sync gunicorn -c gunicorn_config.py app:app
+    python benchmark.py --concurrency 50 --slow 10
+
+    GUNICORN_WORKER_CLASS=gthread gunicorn -c gunicorn_config.py app:app
+    python benchmark.py --concurrency 50 --slow 10
+
+The --slow clients hold long-poll requests open the way I/O-bound
+requests do, so the run shows how much throughput is left for the
+remaining clients while workers wait on I/O.
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.request
+import urllib.error
+
+def login(base_url, email, password):
+    """
+    Log in and get an access token.
+    
+    Args:
+        base_url (str): Server URL
+        email (str): User email
+        password (str): User password
+    
+    Returns:
+        str: Access token
+    """
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login",
+        data=json.dumps({'email': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)['access_token']
+
+def run_client(url, token, deadline, latencies, errors):
+    """
+    Request a URL repeatedly until the deadline.
+    
+    Args:
+        url (str): URL to request
+        token (str): Access token
+        deadline (float): time.monotonic() value to stop at
+        latencies (list): List to append request latencies to
+        errors (list): List to append errors to
+    """
+    while time.monotonic() < deadline:
+        request = urllib.request.Request(url, headers={'Authorization': f"Bearer {token}"})
+        start = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+            latencies.append(time.monotonic() - start)
+        except (urllib.error.URLError, OSError) as e:
+            errors.append(str(e))
+
+def percentile(values, fraction):
+    """
+    Get a percentile of a list of values.
+    
+    Args:
+        values (list): Sorted values
+        fraction (float): Percentile as a fraction, e.g. 0.95
+    
+    Returns:
+        float: Percentile value, 0 if there are no values
+    """
+    if not values:
+        return 0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def run_benchmark(base_url, token, endpoint, concurrency, duration, slow=0):
+    """
+    Run the benchmark.
+    
+    Args:
+        base_url (str): Server URL
+        token (str): Access token
+        endpoint (str): Endpoint the measured clients request
+        concurrency (int): Number of measured clients
+        duration (float): Benchmark duration in seconds
+        slow (int): Number of extra clients holding long-poll requests open
+    
+    Returns:
+        dict: Request count, throughput, latency percentiles and errors
+    """
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = []
+    threads = []
+    
+    # Slow clients are not measured; they only occupy server capacity
+    for _ in range(slow):
+        url = f"{base_url}/api/events?timeout=30"
+        threads.append(threading.Thread(target=run_client, args=(url, token, deadline, [], []), daemon=True))
+    
+    for _ in range(concurrency):
+        url = f"{base_url}{endpoint}"
+        threads.append(threading.Thread(target=run_client, args=(url, token, deadline, latencies, errors), daemon=True))
+    
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads[slow:]:
+        thread.join()
+    elapsed = time.monotonic() - start
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0) * 1000
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load benchmark for the Email Form System web application')
+    parser.add_argument('--url', default='http://localhost:5000', help='Server URL')
+    parser.add_argument('--endpoint', default='/api/tracking', help='Endpoint to benchmark')
+    parser.add_argument('--concurrency', type=int, default=20, help='Number of concurrent clients')
+    parser.add_argument('--duration', type=float, default=30, help='Duration in seconds')
+    parser.add_argument('--slow', type=int, default=0, help='Number of clients holding long-poll requests open')
+    parser.add_argument('--email', default='admin@example.com', help='Login email')
+    parser.add_argument('--password', default='admin123', help='Login password')
+    parser.add_argument('--token', help='Access token, instead of logging in')
+    args = parser.parse_args()
+    
+    try:
+        token = args.token or login(args.url, args.email, args.password)
+    except Exception as e:
+        print(f"Error logging in: {e}")
+        sys.exit(1)
+    
+    print(f"Benchmarking {args.url}{args.endpoint} with {args.concurrency} clients "
+          f"({args.slow} slow) for {args.duration:g}s...")
+    results = run_benchmark(args.url, token, args.endpoint, args.concurrency, args.duration, args.slow)
+    
+    print(f"Requests:     {results['requests']} ({results['errors']} errors)")
+    print(f"Throughput:   {results['requests_per_second']:.1f} requests/s")
+    print(f"Latency p50:  {results['p50_ms']:.1f} ms")
+    print(f"Latency p95:  {results['p95_ms']:.1f} ms")
+    print(f"Latency max:  {results['max_ms']:.1f} ms")
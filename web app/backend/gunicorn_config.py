@@ -1,3 +1,41 @@
+import os
+import sys
+import multiprocessing
+
 bind = "0.0.0.0:5000"
-workers = 4
 timeout = 120
+
+# Worker model: 'gthread' (default), 'gevent' (requires the gevent package) or 'sync'.
+# Microsoft Graph calls run in the job workers, but event streams, long polls
+# and uploads still wait on I/O, so threaded or green workers keep the web
+# workers available while those requests are open.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Worker processes, by default one per CPU core (capped) for threaded and
+# green workers and the usual (2 x cores) + 1 for sync workers
+cpu_count = multiprocessing.cpu_count()
+default_workers = cpu_count * 2 + 1 if worker_class == 'sync' else min(cpu_count, 8)
+workers = int(os.environ.get('GUNICORN_WORKERS', default_workers))
+
+# Threads per worker for gthread workers
+threads = int(os.environ.get('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+
+# Concurrent connections per worker for gevent workers
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Number of job worker processes for queued long-running operations
+job_workers = int(os.environ.get('JOB_WORKERS', 2))
+
+def when_ready(server):
+    # Start the job workers alongside the web workers
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import tasks
+    server.job_processes, server.job_stop_event = tasks.start_workers(job_workers)
+
+def on_exit(server):
+    # Let the job workers finish their current job before shutdown
+    stop_event = getattr(server, 'job_stop_event', None)
+    if stop_event is not None:
+        stop_event.set()
+        for process in server.job_processes:
+            process.join(timeout)
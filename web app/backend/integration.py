@@ -7,11 +7,15 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import existing functionality
+from scripts import m365_session
 from scripts.email_sender import EmailFormSender
 from scripts.tracking_database import TrackingDatabase
-from scripts.pdf_extractor import PDFDataExtractor, process_pdf_batch
-from scripts.excel_transfer import process_extracted_data
+from scripts.pdf_extractor import PDFDataExtractor, process_pdf_batch, form_fingerprint
+from pypdf import PdfReader
+from scripts.excel_transfer import process_extracted_data, process_extracted_records
 from scripts.sharepoint_onedrive import SharePointOneDriveIntegration
+from scripts.extracted_catalog import ExtractedDataCatalog
+from scripts.forms_registry import FormsRegistry
 
 class EmailFormSystemIntegration:
     """
@@ -43,10 +47,20 @@ class EmailFormSystemIntegration:
         self.config_path = config_path or os.path.join(self.data_dir, 'config.json')
         self.config = self.load_config()
         
+        # All components share one Microsoft 365 session for the configured credentials
+        if self.config.get('client_id') and self.config.get('client_secret'):
+            m365_session.configure(self.config['client_id'], self.config['client_secret'], self.token_path)
+        
         # Initialize components
         self.email_sender = None
         self.tracking_db = None
         self.sharepoint_onedrive = None
+        
+        # Persistent catalog of extracted data files with stable IDs
+        self.extracted_catalog = ExtractedDataCatalog(self.extracted_dir)
+        
+        # Registry of form PDFs with cached metadata, keyed by file name
+        self.forms_registry = FormsRegistry(self.forms_dir, os.path.join(self.data_dir, 'forms_registry.db'))
     
     def load_config(self):
         """
@@ -74,6 +88,11 @@ class EmailFormSystemIntegration:
                 json.dump(default_config, f, indent=4)
             return default_config
     
+    @property
+    def token_path(self):
+        """Path of the Microsoft 365 token, from the configuration."""
+        return self.config.get('token_path') or os.path.join(self.data_dir, 'o365_token')
+    
     def save_config(self):
         """Save configuration to file."""
         with open(self.config_path, 'w') as f:
@@ -92,7 +111,8 @@ class EmailFormSystemIntegration:
         try:
             self.email_sender = EmailFormSender(
                 self.config['client_id'], 
-                self.config['client_secret']
+                self.config['client_secret'],
+                self.token_path
             )
             return self.email_sender.authenticate()
         except Exception as e:
@@ -137,7 +157,8 @@ class EmailFormSystemIntegration:
         try:
             self.sharepoint_onedrive = SharePointOneDriveIntegration(
                 self.config['client_id'], 
-                self.config['client_secret']
+                self.config['client_secret'],
+                self.token_path
             )
             return self.sharepoint_onedrive.authenticate()
         except Exception as e:
@@ -152,20 +173,20 @@ class EmailFormSystemIntegration:
             list: List of form dictionaries
         """
         forms = []
-        for filename in os.listdir(self.forms_dir):
-            if filename.endswith('.pdf'):
-                form_path = os.path.join(self.forms_dir, filename)
-                form_stat = os.stat(form_path)
-                forms.append({
-                    'id': len(forms) + 1,
-                    'name': os.path.splitext(filename)[0],
-                    'description': f"Form {len(forms) + 1}",
-                    'createdAt': datetime.fromtimestamp(form_stat.st_ctime).strftime('%Y-%m-%d'),
-                    'status': 'active',
-                    'sentCount': 0,
-                    'returnedCount': 0,
-                    'path': form_path
-                })
+        for form in self.forms_registry.list():
+            forms.append({
+                'id': form['id'],
+                'name': form['name'],
+                'description': f"Form {form['name']}",
+                'createdAt': form['created'][:10],
+                'status': 'active',
+                'sentCount': 0,
+                'returnedCount': 0,
+                'path': form['path'],
+                'size': form['size'],
+                'pages': form['pages'],
+                'fields': form['fields']
+            })
         
         return forms
     
@@ -231,7 +252,7 @@ class EmailFormSystemIntegration:
         
         if self.tracking_db:
             try:
-                return self.tracking_db.import_recipients(file_path)
+                return self.tracking_db.import_recipients(file_path)['imported']
             except Exception as e:
                 print(f"Error importing recipients: {e}")
         
@@ -242,7 +263,7 @@ class EmailFormSystemIntegration:
         Send form emails to selected recipients.
         
         Args:
-            form_id (int): Form ID
+            form_id (str): Form ID (file name)
             recipient_ids (list): List of recipient IDs
             subject (str, optional): Email subject
             body (str, optional): Email body
@@ -258,12 +279,8 @@ class EmailFormSystemIntegration:
             self.initialize_tracking_db()
         
         # Get form path
-        forms = self.get_forms()
-        form_path = None
-        for form in forms:
-            if form['id'] == form_id:
-                form_path = form['path']
-                break
+        form = self.forms_registry.get(form_id)
+        form_path = form['path'] if form else None
         
         if not form_path:
             return {'sent': 0, 'failed': len(recipient_ids), 'error': 'Form not found'}
@@ -370,12 +387,14 @@ class EmailFormSystemIntegration:
         
         return None
     
-    def extract_data_from_forms(self, form_ids=None):
+    def extract_data_from_forms(self, form_ids=None, progress=None, cancelled=None):
         """
         Extract data from returned forms.
         
         Args:
             form_ids (list, optional): List of form IDs to process
+            progress (callable, optional): Called with (done, total, form result) after each form
+            cancelled (callable, optional): Returns True when processing should stop
             
         Returns:
             dict: Result dictionary with processed, success, and failed counts
@@ -387,7 +406,8 @@ class EmailFormSystemIntegration:
             
             if not form_ids:
                 # Process all PDFs in the returned forms directory
-                result = process_pdf_batch(self.returned_forms_dir, self.extracted_dir)
+                result = process_pdf_batch(self.returned_forms_dir, self.extracted_dir, catalog=self.extracted_catalog,
+                                           forms_registry=self.forms_registry)
                 return result
             else:
                 # Process specific forms
@@ -399,35 +419,57 @@ class EmailFormSystemIntegration:
                 # Filter forms by ID
                 forms_to_process = []
                 for item in tracking_data:
-                    if item.get('id') in form_ids and item.get('formPath'):
-                        forms_to_process.append(item.get('formPath'))
+                    if item.get('id') in form_ids and item.get('form_path'):
+                        forms_to_process.append(item)
                 
                 # Process each form
                 processed = 0
                 success = 0
                 failed = 0
                 
-                for form_path in forms_to_process:
+                for index, item in enumerate(forms_to_process):
+                    if cancelled and cancelled():
+                        break
+                    
+                    form_path = item['form_path']
+                    email = item['recipient_email']
+                    status = 'Missing'
                     if os.path.exists(form_path):
                         try:
+                            # Use the schema of the template the form was sent from
+                            schema = self.forms_registry.get_schema(item['form_id']) if item.get('form_id') else None
+                            if schema is None:
+                                schema = self.forms_registry.match_schema(form_fingerprint(PdfReader(form_path)))
+                            
                             extractor = PDFDataExtractor(form_path)
-                            data = extractor.extract_all_data()
+                            data = extractor.extract_all_data(schema=schema)
                             
                             # Save extracted data
                             filename = os.path.splitext(os.path.basename(form_path))[0]
                             output_path = os.path.join(self.extracted_dir, f"{filename}_data.json")
-                            extractor.save_extracted_data(output_path, data)
+                            extractor.save_extracted_data(output_path, data, self.extracted_catalog)
                             
                             processed += 1
                             success += 1
                             
                             # Update tracking database
-                            self.tracking_db.update_processing_status(form_path, 'Completed')
+                            self.tracking_db.update_processing_status(email, 'Completed')
+                            status = 'Completed'
                         except Exception as e:
                             print(f"Error processing {form_path}: {e}")
                             failed += 1
                             # Update tracking database
-                            self.tracking_db.update_processing_status(form_path, 'Error')
+                            self.tracking_db.update_processing_status(email, 'Error')
+                            status = 'Error'
+                    
+                    if progress:
+                        progress(index + 1, len(forms_to_process), {
+                            'id': item['id'],
+                            'recipientEmail': email,
+                            'recipientName': item['recipient_name'],
+                            'formPath': form_path,
+                            'status': status
+                        })
                 
                 return {
                     'processed': processed,
@@ -443,33 +485,96 @@ class EmailFormSystemIntegration:
                 'error': str(e)
             }
     
-    def get_extracted_data(self):
+    def get_extracted_data(self, offset=0, limit=None):
         """
-        Get extracted data from files.
+        Get extracted data from the extracted data catalog.
         
+        Args:
+            offset (int, optional): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+            
         Returns:
             list: List of extracted data dictionaries
         """
-        extracted_data = []
-        if os.path.exists(self.extracted_dir):
-            for filename in os.listdir(self.extracted_dir):
-                if filename.endswith('.json'):
-                    try:
-                        with open(os.path.join(self.extracted_dir, filename), 'r') as f:
-                            data = json.load(f)
-                            extracted_data.append({
-                                'id': len(extracted_data) + 1,
-                                'formName': os.path.splitext(os.path.basename(data.get('metadata', {}).get('filename', 'Unknown')))[0],
-                                'recipient': data.get('extracted_data', {}).get('name', 'Unknown'),
-                                'email': data.get('extracted_data', {}).get('email', 'unknown@example.com'),
-                                'extractionDate': datetime.fromtimestamp(os.path.getmtime(os.path.join(self.extracted_dir, filename))).strftime('%Y-%m-%d %H:%M:%S'),
-                                'extractionMethod': ','.join(data.get('metadata', {}).get('extraction_methods', [])),
-                                'fields': data.get('extracted_data', {})
-                            })
-                    except Exception as e:
-                        print(f"Error loading extracted data from {filename}: {e}")
-        
-        return extracted_data
+        return self.get_extracted_data_page(offset, limit)['items']
+    
+    def get_extracted_data_page(self, offset=0, limit=None):
+        """
+        Get a page of extracted data with the total record count.
+        
+        The catalog is refreshed first; only files changed since the last
+        refresh are parsed.
+        
+        Args:
+            offset (int, optional): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+            
+        Returns:
+            dict: Page dictionary with items, total, offset and limit
+        """
+        try:
+            self.extracted_catalog.refresh()
+            items, total = self.extracted_catalog.query(offset, limit)
+        except Exception as e:
+            print(f"Error loading extracted data catalog: {e}")
+            items, total = [], 0
+        
+        return {
+            'items': items,
+            'total': total,
+            'offset': offset,
+            'limit': limit
+        }
+    
+    def resolve_extracted_files(self, data_ids):
+        """
+        Resolve extracted data IDs to their JSON files.
+        
+        Args:
+            data_ids (list): List of data IDs, as integers or numeric strings
+            
+        Returns:
+            list: Paths of the matching JSON files, in request order
+        """
+        self.extracted_catalog.refresh()
+        paths = self.extracted_catalog.get_paths(data_ids)
+        return [paths[data_id] for data_id in data_ids if data_id in paths]
+    
+    def export_records_to_excel(self, data_ids, output_file=None):
+        """
+        Export selected extracted data records to Excel.
+        
+        Records are loaded once from their JSON files and handed to the
+        Excel transfer in memory.
+        
+        Args:
+            data_ids (list): List of data IDs to export
+            output_file (str, optional): Path to save Excel file
+            
+        Returns:
+            str: Path to exported file, None if error
+        """
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            
+            if not output_file:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                output_file = os.path.join(self.results_dir, f"form_data_{timestamp}.xlsx")
+            
+            files_to_export = self.resolve_extracted_files(data_ids)
+            if not files_to_export:
+                return None
+            
+            records = []
+            for file_path in files_to_export:
+                with open(file_path, 'r') as f:
+                    records.append(json.load(f))
+            
+            tracking_file = os.path.join(self.data_dir, 'tracking.xlsx')
+            return process_extracted_records(records, output_file, tracking_file)
+        except Exception as e:
+            print(f"Error exporting data: {e}")
+            return None
     
     def export_data_to_excel(self, data_ids=None, output_file=None):
         """
@@ -482,6 +587,10 @@ class EmailFormSystemIntegration:
         Returns:
             str: Path to exported file, None if error
         """
+        if data_ids:
+            # Export specific data records
+            return self.export_records_to_excel(data_ids, output_file)
+        
         try:
             # Create output directory
             os.makedirs(self.results_dir, exist_ok=True)
@@ -494,57 +603,13 @@ class EmailFormSystemIntegration:
             
             tracking_file = os.path.join(self.data_dir, 'tracking.xlsx')
             
-            if not data_ids:
-                # Export all extracted data
-                if os.path.exists(self.extracted_dir):
-                    # Process all JSON files in the extracted directory
-                    result_file = process_extracted_data(self.extracted_dir, output_file, tracking_file)
-                    return result_file
-                else:
-                    return None
+            # Export all extracted data
+            if os.path.exists(self.extracted_dir):
+                # Process all JSON files in the extracted directory
+                result_file = process_extracted_data(self.extracted_dir, output_file, tracking_file)
+                return result_file
             else:
-                # Export specific data files
-                # Get extracted data
-                extracted_data = self.get_extracted_data()
-                
-                # Filter by ID
-                files_to_export = []
-                for data in extracted_data:
-                    if data['id'] in data_ids:
-                        # Find the corresponding file
-                        for filename in os.listdir(self.extracted_dir):
-                            if filename.endswith('.json'):
-                                with open(os.path.join(self.extracted_dir, filename), 'r') as f:
-                                    file_data = json.load(f)
-                                    if (file_data.get('extracted_data', {}).get('name') == data['recipient'] and
-                                        file_data.get('extracted_data', {}).get('email') == data['email']):
-                                        files_to_export.append(os.path.join(self.extracted_dir, filename))
-                                        break
-                
-                if files_to_export:
-                    # Create a temporary directory for selected files
-                    import tempfile
-                    import shutil
-                    
-                    temp_dir = tempfile.mkdtemp()
-                    try:
-                        # Copy selected files to temp directory
-                        for file_path in files_to_export:
-                            shutil.copy(file_path, temp_dir)
-                        
-                        # Process the files
-                        result_file = process_extracted_data(temp_dir, output_file, tracking_file)
-                        
-                        # Clean up
-                        shutil.rmtree(temp_dir)
-                        
-                        return result_file
-                    except Exception as e:
-                        # Clean up
-                        shutil.rmtree(temp_dir)
-                        raise e
-                else:
-                    return None
+                return None
         except Exception as e:
             print(f"Error exporting data: {e}")
             return None
@@ -600,16 +665,50 @@ class EmailFormSystemIntegration:
         try:
             if destination.lower() == 'sharepoint':
                 if self.sharepoint_onedrive.connect_to_sharepoint(self.config['sharepoint_site']):
-                    result = self.sharepoint_onedrive.create_backup(self.data_dir, destination='sharepoint', folder=folder)
+                    result = self.sharepoint_onedrive.create_backup(self.data_dir, folder, use_sharepoint=True, incremental=True)
                     return result
                 else:
                     return {'uploaded_files': 0, 'total_size': 0, 'error': 'Failed to connect to SharePoint'}
             else:  # onedrive
                 if self.sharepoint_onedrive.connect_to_onedrive():
-                    result = self.sharepoint_onedrive.create_backup(self.data_dir, destination='onedrive', folder=folder)
+                    result = self.sharepoint_onedrive.create_backup(self.data_dir, folder, incremental=True)
                     return result
                 else:
                     return {'uploaded_files': 0, 'total_size': 0, 'error': 'Failed to connect to OneDrive'}
         except Exception as e:
             print(f"Error creating backup: {e}")
             return {'uploaded_files': 0, 'total_size': 0, 'error': str(e)}
+    
+    def download_returned_forms(self, source='onedrive', folder='ReturnedForms/*.pdf'):
+        """
+        Download returned forms from cloud storage into the returned forms directory.
+        
+        Forms already downloaded and unchanged remotely are skipped, so this
+        can be run before every extraction.
+        
+        Args:
+            source (str, optional): 'onedrive' or 'sharepoint'
+            folder (str, optional): Folder path in source, optionally with a wildcard pattern
+            
+        Returns:
+            dict: Result dictionary with downloaded, skipped and failed file counts,
+                and an error message if the remote folder couldn't be listed completely
+        """
+        if not self.sharepoint_onedrive:
+            if not self.initialize_sharepoint_onedrive():
+                return {'downloaded_files': 0, 'error': 'SharePoint/OneDrive not initialized'}
+        
+        try:
+            if source.lower() == 'sharepoint':
+                if self.sharepoint_onedrive.connect_to_sharepoint(self.config['sharepoint_site']):
+                    return self.sharepoint_onedrive.download_files(folder, self.returned_forms_dir, use_sharepoint=True)
+                else:
+                    return {'downloaded_files': 0, 'error': 'Failed to connect to SharePoint'}
+            else:  # onedrive
+                if self.sharepoint_onedrive.connect_to_onedrive():
+                    return self.sharepoint_onedrive.download_files(folder, self.returned_forms_dir)
+                else:
+                    return {'downloaded_files': 0, 'error': 'Failed to connect to OneDrive'}
+        except Exception as e:
+            print(f"Error downloading returned forms: {e}")
+            return {'downloaded_files': 0, 'error': str(e)}
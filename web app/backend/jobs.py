@@ -0,0 +1,547 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import traceback
+import multiprocessing
+from datetime import datetime, timedelta
+
+# Default queue database, next to the other backend data
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'jobs.db')
+
+# Registered job handlers by job kind
+HANDLERS = {}
+
+# Number of most recent events kept for clients catching up
+EVENT_RETENTION = 10000
+
+# Seconds between heartbeats of a worker running a job
+HEARTBEAT_INTERVAL = 10
+
+# Seconds without a heartbeat after which a running job's worker is considered dead
+HEARTBEAT_TIMEOUT = 120
+
+def job_handler(kind):
+    """
+    Register a function as the handler for a job kind.
+    
+    Args:
+        kind (str): Job kind the handler processes
+    
+    Returns:
+        callable: Decorator registering the handler
+    """
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+class Job:
+    """
+    A claimed job, as seen by its handler.
+    """
+    
+    def __init__(self, queue, job_id, kind, payload):
+        self.queue = queue
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+    
+    def progress(self, done, total=None, message=None):
+        """
+        Report handler progress.
+        
+        Args:
+            done (int): Number of work items completed
+            total (int, optional): Total number of work items
+            message (str, optional): Progress message
+        """
+        self.queue.update_progress(self.id, done, total, message)
+    
+    def event(self, event_type, data):
+        """
+        Publish an event about this job's work.
+        
+        Args:
+            event_type (str): Event type, e.g. 'send', 'return', 'extraction'
+            data (dict): JSON-serializable event data
+        """
+        self.queue.publish(event_type, data, self.id)
+    
+    def cancel_requested(self):
+        """
+        Check whether cancellation was requested for this job.
+        
+        Returns:
+            bool: True if the handler should stop at the next safe point
+        """
+        return self.queue.is_cancel_requested(self.id)
+
+class JobQueue:
+    """
+    Persistent SQLite-backed queue of long-running jobs.
+    
+    Web workers enqueue jobs and read their status; worker processes claim
+    queued jobs one at a time and record progress and results. Job changes
+    and handler events are appended to an event log that clients can follow
+    from any process.
+    """
+    
+    def __init__(self, db_path=None):
+        """
+        Initialize the queue, creating the database if needed.
+        
+        Args:
+            db_path (str, optional): Path to the SQLite queue database
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    created_by TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    worker TEXT,
+                    heartbeat_at TEXT,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER,
+                    progress_message TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT
+                )
+            ''')
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'heartbeat_at' not in columns:
+                try:
+                    conn.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at TEXT')
+                except sqlite3.OperationalError:
+                    # Added concurrently by another process
+                    pass
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    type TEXT NOT NULL,
+                    job_id INTEGER,
+                    data TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def _to_dict(row):
+        """
+        Convert a job row to the API job format.
+        
+        Args:
+            row (sqlite3.Row): Job row
+        
+        Returns:
+            dict: Job dictionary
+        """
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'createdBy': row['created_by'],
+            'createdAt': row['created_at'],
+            'startedAt': row['started_at'],
+            'finishedAt': row['finished_at'],
+            'progress': {
+                'done': row['progress_done'],
+                'total': row['progress_total'],
+                'message': row['progress_message']
+            },
+            'cancelRequested': bool(row['cancel_requested']),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error']
+        }
+    
+    def enqueue(self, kind, payload, created_by=None):
+        """
+        Add a job to the queue.
+        
+        Args:
+            kind (str): Job kind, matching a registered handler
+            payload (dict): JSON-serializable job arguments
+            created_by (str, optional): User who created the job
+        
+        Returns:
+            int: Job ID
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO jobs (kind, payload, created_by, created_at) VALUES (?, ?, ?, ?)',
+                (kind, json.dumps(payload), created_by, datetime.now().isoformat())
+            )
+            job_id = cursor.lastrowid
+        
+        self.publish('job', {'id': job_id, 'kind': kind, 'status': 'queued'}, job_id)
+        return job_id
+    
+    def get(self, job_id):
+        """
+        Get a job by ID.
+        
+        Args:
+            job_id (int): Job ID
+        
+        Returns:
+            dict: Job dictionary, or None if not found
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def list(self, status=None, limit=50):
+        """
+        List the most recent jobs.
+        
+        Args:
+            status (str, optional): Only list jobs with this status
+            limit (int): Maximum number of jobs to return
+        
+        Returns:
+            list: Job dictionaries, newest first
+        """
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?', (status, limit)).fetchall()
+            else:
+                rows = conn.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+    
+    def cancel(self, job_id):
+        """
+        Cancel a job.
+        
+        Queued jobs are cancelled immediately; running jobs are flagged and
+        stop at their handler's next safe point.
+        
+        Args:
+            job_id (int): Job ID
+        
+        Returns:
+            bool: True if the job was cancelled or flagged, False if it already finished
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), job_id)
+            )
+            if cursor.rowcount:
+                self.publish('job', {'id': job_id, 'status': 'cancelled'}, job_id)
+                return True
+            
+            cursor = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+            )
+            return cursor.rowcount > 0
+    
+    def claim(self, worker):
+        """
+        Atomically claim the oldest queued job.
+        
+        Args:
+            worker (str): Identifier of the claiming worker
+        
+        Returns:
+            Job: Claimed job, or None if the queue is empty
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            
+            now = datetime.now().isoformat()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (worker, now, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        
+        self.publish('job', {'id': row['id'], 'kind': row['kind'], 'status': 'running'}, row['id'])
+        return Job(self, row['id'], row['kind'], json.loads(row['payload']))
+    
+    def update_progress(self, job_id, done, total=None, message=None):
+        """
+        Record job progress.
+        
+        Args:
+            job_id (int): Job ID
+            done (int): Number of work items completed
+            total (int, optional): Total number of work items
+            message (str, optional): Progress message
+        """
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET progress_done = ?, progress_total = COALESCE(?, progress_total), '
+                'progress_message = COALESCE(?, progress_message) WHERE id = ?',
+                (done, total, message, job_id)
+            )
+        
+        self.publish('progress', {'id': job_id, 'done': done, 'total': total, 'message': message}, job_id)
+    
+    def heartbeat(self, job_id):
+        """
+        Record that the worker running a job is still alive.
+        
+        Args:
+            job_id (int): Job ID
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                (datetime.now().isoformat(), job_id)
+            )
+    
+    def is_cancel_requested(self, job_id):
+        """
+        Check the cancellation flag of a job.
+        
+        Args:
+            job_id (int): Job ID
+        
+        Returns:
+            bool: True if cancellation was requested
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+    
+    def finish(self, job_id, status, result=None, error=None):
+        """
+        Mark a job as finished.
+        
+        Args:
+            job_id (int): Job ID
+            status (str): Final status ('completed', 'failed', 'cancelled')
+            result: JSON-serializable handler result
+            error (str, optional): Error message
+        """
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.now().isoformat(), job_id)
+            )
+        
+        self.publish('job', {'id': job_id, 'status': status, 'error': error}, job_id)
+        self.prune_events()
+    
+    def publish(self, event_type, data, job_id=None):
+        """
+        Append an event to the event log.
+        
+        Args:
+            event_type (str): Event type
+            data (dict): JSON-serializable event data
+            job_id (int, optional): Job the event belongs to
+        
+        Returns:
+            int: Event ID
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO events (type, job_id, data, created_at) VALUES (?, ?, ?, ?)',
+                (event_type, job_id, json.dumps(data), datetime.now().isoformat())
+            )
+            return cursor.lastrowid
+    
+    def events_since(self, last_event_id, limit=100):
+        """
+        Get the events published after a given event.
+        
+        Args:
+            last_event_id (int): ID of the last event the client has seen
+            limit (int): Maximum number of events to return
+        
+        Returns:
+            list: Event dictionaries, oldest first
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?', (last_event_id, limit)
+            ).fetchall()
+        
+        return [{
+            'id': row['id'],
+            'type': row['type'],
+            'jobId': row['job_id'],
+            'data': json.loads(row['data']),
+            'createdAt': row['created_at']
+        } for row in rows]
+    
+    def last_event_id(self):
+        """
+        Get the ID of the most recent event.
+        
+        Returns:
+            int: Event ID, 0 if no events were published
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT MAX(id) FROM events').fetchone()
+        return row[0] or 0
+    
+    def prune_events(self):
+        """Drop events older than the retained window."""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?', (EVENT_RETENTION,))
+    
+    def fail_interrupted(self, timeout=HEARTBEAT_TIMEOUT):
+        """
+        Mark running jobs whose worker stopped sending heartbeats as failed.
+        
+        Jobs of live workers, including those of other instances sharing the
+        queue database, keep running.
+        
+        Args:
+            timeout (float): Seconds without a heartbeat after which a worker is considered dead
+        
+        Returns:
+            int: Number of jobs marked as failed
+        """
+        cutoff = (datetime.now() - timedelta(seconds=timeout)).isoformat()
+        error = 'Interrupted: worker stopped while running the job'
+        
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            job_ids = [row['id'] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (cutoff,)
+            )]
+            conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                [(error, datetime.now().isoformat(), job_id) for job_id in job_ids]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        
+        for job_id in job_ids:
+            self.publish('job', {'id': job_id, 'status': 'failed', 'error': error}, job_id)
+        return len(job_ids)
+
+def run_job(queue, job):
+    """
+    Run a claimed job with its registered handler and record the outcome.
+    
+    Args:
+        queue (JobQueue): Queue the job was claimed from
+        job (Job): Claimed job
+    """
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        queue.finish(job.id, 'failed', error=f"No handler for job kind: {job.kind}")
+        return
+    
+    # Keep the job's heartbeat fresh while the handler runs
+    stopped = threading.Event()
+    def beat():
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                queue.heartbeat(job.id)
+            except sqlite3.Error as e:
+                print(f"Error recording heartbeat for job {job.id}: {e}")
+    heartbeat = threading.Thread(target=beat, daemon=True)
+    heartbeat.start()
+    
+    try:
+        result = handler(job)
+        status = 'cancelled' if job.cancel_requested() else 'completed'
+        queue.finish(job.id, status, result=result)
+    except Exception as e:
+        traceback.print_exc()
+        queue.finish(job.id, 'failed', error=str(e))
+    finally:
+        stopped.set()
+        heartbeat.join()
+
+def run_worker(db_path=None, poll_interval=1.0, stop_event=None):
+    """
+    Process queued jobs until stopped.
+    
+    While idle, the worker also fails jobs of workers that stopped sending
+    heartbeats, e.g. after a crash.
+    
+    Args:
+        db_path (str, optional): Path to the SQLite queue database
+        poll_interval (float): Seconds to wait when the queue is empty
+        stop_event (multiprocessing.Event, optional): Event that stops the worker
+    """
+    queue = JobQueue(db_path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Job worker {worker} started")
+    last_sweep = 0
+    
+    while stop_event is None or not stop_event.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            if time.time() - last_sweep >= HEARTBEAT_INTERVAL:
+                last_sweep = time.time()
+                interrupted = queue.fail_interrupted()
+                if interrupted:
+                    print(f"Job worker {worker} marked {interrupted} interrupted jobs as failed")
+            time.sleep(poll_interval)
+            continue
+        
+        print(f"Job worker {worker} running job {job.id} ({job.kind})")
+        run_job(queue, job)
+
+def start_workers(count, db_path=None, target=None):
+    """
+    Start job worker processes.
+    
+    Jobs left running by workers that are no longer alive are marked as failed first.
+    
+    Args:
+        count (int): Number of worker processes
+        db_path (str, optional): Path to the SQLite queue database
+        target (callable, optional): Worker entry point, run_worker by default
+    
+    Returns:
+        tuple: (list of processes, stop event)
+    """
+    interrupted = JobQueue(db_path).fail_interrupted()
+    if interrupted:
+        print(f"Marked {interrupted} interrupted jobs as failed")
+    
+    stop_event = multiprocessing.Event()
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=target or run_worker, args=(db_path, 1.0, stop_event), daemon=True)
+        process.start()
+        processes.append(process)
+    
+    return processes, stop_event
@@ -0,0 +1,188 @@
+import os
+import re
+import gzip
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Static directories whose files are served under content-hashed names
+HASHED_DIRS = ('js', 'css')
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# Asset references in index.html
+ASSET_REFERENCE = re.compile(r'((?:src|href)=")((?:js|css)/[^"]+)(")')
+
+def compress(data, encoding):
+    """
+    Compress a response body.
+    
+    Args:
+        data (bytes): Uncompressed body
+        encoding (str): 'br' or 'gzip'
+    
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the best supported content encoding the client accepts.
+    
+    Args:
+        accept_encodings (werkzeug.datastructures.MIMEAccept): Parsed Accept-Encoding header
+    
+    Returns:
+        str: 'br', 'gzip', or None for identity
+    """
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def hashed_name(path, digest):
+    """
+    Insert a content hash before a file's extension.
+    
+    Args:
+        path (str): Relative asset path, e.g. 'js/core/api.js'
+        digest (str): Content hash
+    
+    Returns:
+        str: Hashed path, e.g. 'js/core/api.3f2a9c81d0e4.js'
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+class StaticAssets:
+    """
+    Content-hashed, precompressed frontend assets.
+    
+    Files under js/ and css/ are read once per change, hashed and
+    compressed ahead of time, and index.html is rewritten to reference
+    the hashed names. Hashed names never change content, so they can be
+    cached by browsers indefinitely.
+    """
+    
+    def __init__(self, static_folder):
+        """
+        Initialize the asset manifest.
+        
+        Args:
+            static_folder (str): Frontend directory
+        """
+        self.static_folder = static_folder
+        self.lock = threading.Lock()
+        self.assets = {}
+        self.hashed = {}
+        self.index = None
+    
+    def refresh(self):
+        """
+        Re-read assets whose modification time or size changed.
+        
+        Returns:
+            bool: True if any asset changed
+        """
+        changed = False
+        seen = set()
+        
+        with self.lock:
+            for directory in HASHED_DIRS:
+                for root, _, files in os.walk(os.path.join(self.static_folder, directory)):
+                    for filename in files:
+                        full_path = os.path.join(root, filename)
+                        path = os.path.relpath(full_path, self.static_folder).replace(os.sep, '/')
+                        stat_result = os.stat(full_path)
+                        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+                        seen.add(path)
+                        
+                        asset = self.assets.get(path)
+                        if asset and asset['signature'] == signature:
+                            continue
+                        
+                        with open(full_path, 'rb') as f:
+                            content = f.read()
+                        
+                        if asset:
+                            self.hashed.pop(asset['hashed_name'], None)
+                        asset = {
+                            'signature': signature,
+                            'hashed_name': hashed_name(path, hashlib.sha256(content).hexdigest()[:12]),
+                            'content': {None: content, 'gzip': compress(content, 'gzip')}
+                        }
+                        if brotli is not None:
+                            asset['content']['br'] = compress(content, 'br')
+                        
+                        self.assets[path] = asset
+                        self.hashed[asset['hashed_name']] = path
+                        changed = True
+            
+            for path in set(self.assets) - seen:
+                self.hashed.pop(self.assets.pop(path)['hashed_name'], None)
+                changed = True
+            
+            if changed:
+                self.index = None
+        
+        return changed
+    
+    def lookup(self, hashed_path):
+        """
+        Find a hashed asset.
+        
+        Args:
+            hashed_path (str): Requested path
+        
+        Returns:
+            dict: Asset, or None if the path is not a current hashed name
+        """
+        if not self.assets:
+            self.refresh()
+        
+        path = self.hashed.get(hashed_path)
+        return self.assets.get(path) if path else None
+    
+    def render_index(self):
+        """
+        Get index.html with asset references rewritten to hashed names.
+        
+        Returns:
+            dict: Rendered index with 'content' by encoding and an 'etag'
+        """
+        self.refresh()
+        
+        index_path = os.path.join(self.static_folder, 'index.html')
+        stat_result = os.stat(index_path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        
+        with self.lock:
+            if self.index and self.index['signature'] == signature:
+                return self.index
+            
+            with open(index_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            
+            def replace(match):
+                asset = self.assets.get(match.group(2))
+                return match.group(1) + (asset['hashed_name'] if asset else match.group(2)) + match.group(3)
+            
+            content = ASSET_REFERENCE.sub(replace, html).encode('utf-8')
+            self.index = {
+                'signature': signature,
+                'etag': hashlib.sha256(content).hexdigest()[:16],
+                'content': {None: content, 'gzip': compress(content, 'gzip')}
+            }
+            if brotli is not None:
+                self.index['content']['br'] = compress(content, 'br')
+            
+            return self.index
@@ -0,0 +1,219 @@
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path to import from scripts
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts import tracking_database, email_sender
+
+import jobs
+from integration import EmailFormSystemIntegration
+
+# Sent forms are written to the tracking spreadsheet in batches of this many,
+# since every write rewrites the whole spreadsheet
+TRACKING_BATCH_SIZE = 50
+
+@jobs.job_handler('send_form')
+def send_form(job):
+    """
+    Send a form to a list of recipients and track each sent email.
+    
+    A 'send' event is published for every recipient as it is processed.
+    Sent forms are tracked in batches, and once more when the job ends.
+    
+    Args:
+        job (jobs.Job): Job with form_id, form_path, subject, message,
+            signature and recipients in its payload
+    
+    Returns:
+        dict: Sent/failed counts and per-recipient results
+    """
+    payload = job.payload
+    recipients = payload['recipients']
+    results = []
+    
+    # Authenticate once up front, so a missing or expired login fails the job instead of every recipient
+    integration = EmailFormSystemIntegration()
+    if not integration.initialize_email_sender():
+        raise RuntimeError('Email sender not initialized')
+    
+    # Sent forms not yet written to the tracking spreadsheet, with their results
+    pending = []
+    
+    def track_pending():
+        try:
+            tracking_database.add_tracking_records([record for record, _ in pending])
+        except Exception as e:
+            for _, result in pending:
+                result['message'] = f"Email sent, but tracking failed: {e}"
+        pending.clear()
+    
+    job.progress(0, len(recipients), 'Sending emails')
+    try:
+        for i, recipient in enumerate(recipients):
+            if job.cancel_requested():
+                break
+            
+            try:
+                # Personalize message
+                personalized_message = payload['message'].replace('{Name}', recipient['name'])
+                personalized_message += f"\n\n{payload['signature']}"
+                
+                # Send email
+                email_sender.send_email(
+                    recipient['email'],
+                    recipient['name'],
+                    payload['subject'],
+                    personalized_message,
+                    payload['form_path'],
+                    sender=integration.email_sender
+                )
+                
+                results.append({
+                    "recipient": recipient,
+                    "status": "sent",
+                    "message": "Email sent successfully"
+                })
+                
+                # Track the sent form with the next batch
+                pending.append(({
+                    'email': recipient['email'],
+                    'name': recipient['name'],
+                    'form_id': payload['form_id'],
+                    'form_name': os.path.splitext(payload['form_id'])[0],
+                    'sent_date': datetime.now()
+                }, results[-1]))
+            except Exception as e:
+                results.append({
+                    "recipient": recipient,
+                    "status": "failed",
+                    "message": str(e)
+                })
+            
+            job.event('send', dict(
+                results[-1],
+                formId=payload['form_id'],
+                activity=tracking_database.activity_entry(datetime.now().isoformat(), 'Sent', recipient['name'])
+                if results[-1]['status'] == 'sent' else None
+            ))
+            job.progress(i + 1)
+            
+            if len(pending) >= TRACKING_BATCH_SIZE:
+                track_pending()
+    finally:
+        # Emails already sent are tracked even if the job is cancelled or fails
+        track_pending()
+    
+    sent = sum(1 for result in results if result['status'] == 'sent')
+    return {
+        "sent": sent,
+        "failed": len(results) - sent,
+        "skipped": len(recipients) - len(results),
+        "results": results
+    }
+
+@jobs.job_handler('check_returns')
+def check_returns(job):
+    """
+    Check the mailbox for returned forms.
+    
+    A 'return' event is published for every newly returned form.
+    
+    Args:
+        job (jobs.Job): Job with an empty payload
+    
+    Returns:
+        dict: Number of newly returned forms
+    """
+    returned = {record['id'] for record in tracking_database.get_tracking_data() if record['returned']}
+    
+    job.progress(0, 1, 'Checking mailbox')
+    result = EmailFormSystemIntegration().check_for_returned_forms()
+    if isinstance(result, dict) and result.get('error'):
+        raise RuntimeError(result['error'])
+    job.progress(1)
+    
+    new_returns = 0
+    for record in tracking_database.get_tracking_data():
+        if record['returned'] and record['id'] not in returned:
+            new_returns += 1
+            job.event('return', {
+                "id": record['id'],
+                "recipientEmail": record['recipient_email'],
+                "recipientName": record['recipient_name'],
+                "formName": record['form_name'],
+                "dateReturned": record['date_returned'],
+                "activity": tracking_database.activity_entry(
+                    record['date_returned'] or datetime.now().isoformat(), 'Returned', record['recipient_name']
+                )
+            })
+    
+    return {
+        "message": "Check completed",
+        "newReturns": new_returns
+    }
+
+@jobs.job_handler('extract')
+def extract(job):
+    """
+    Extract data from returned forms.
+    
+    An 'extraction' event is published as each form completes.
+    
+    Args:
+        job (jobs.Job): Job with the tracking record IDs in form_ids
+    
+    Returns:
+        dict: Processed, successful and failed counts
+    """
+    form_ids = job.payload['form_ids']
+    
+    def form_done(done, total, item):
+        job.event('extraction', dict(item, activity=tracking_database.activity_entry(
+            datetime.now().isoformat(), 'Processed', item['recipientName']
+        ) if item['status'] == 'Completed' else None))
+        job.progress(done, total)
+    
+    job.progress(0, len(form_ids), 'Extracting data')
+    result = EmailFormSystemIntegration().extract_data_from_forms(
+        form_ids,
+        progress=form_done,
+        cancelled=job.cancel_requested
+    )
+    if result.get('error'):
+        raise RuntimeError(result['error'])
+    
+    return {
+        "message": "Extraction completed",
+        "processed": result['processed'] + result['failed'],
+        "successful": result['success'],
+        "failed": result['failed']
+    }
+
+def run_worker(db_path=None, poll_interval=1.0, stop_event=None):
+    """
+    Worker process entry point with all job handlers registered.
+    
+    Args:
+        db_path (str, optional): Path to the SQLite queue database
+        poll_interval (float): Seconds to wait when the queue is empty
+        stop_event (multiprocessing.Event, optional): Event that stops the worker
+    """
+    jobs.run_worker(db_path, poll_interval, stop_event)
+
+def start_workers(count, db_path=None):
+    """
+    Start job worker processes that run the handlers in this module.
+    
+    Args:
+        count (int): Number of worker processes
+        db_path (str, optional): Path to the SQLite queue database
+    
+    Returns:
+        tuple: (list of processes, stop event)
+    """
+    return jobs.start_workers(count, db_path, target=run_worker)
+
+if __name__ == '__main__':
+    # Run a single job worker in the foreground
+    run_worker()
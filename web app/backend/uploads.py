@@ -0,0 +1,109 @@
+import os
+import hashlib
+import tempfile
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Magic bytes every PDF file starts with
+PDF_HEADER = b'%PDF-'
+
+class UploadFile:
+    """
+    Writable upload target that streams to a temporary file.
+    
+    The multipart parser writes the upload chunk by chunk; each chunk is
+    hashed, checked against the size limit and written straight to disk,
+    and the first bytes are kept to sniff the file type. The temporary
+    file lives in the destination directory so commit() is an atomic
+    rename, and it is removed on close unless it was committed.
+    """
+    
+    def __init__(self, directory, max_size):
+        """
+        Create the temporary file.
+        
+        Args:
+            directory (str): Directory the upload will be moved into
+            max_size (int): Maximum upload size in bytes
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', suffix='.part', delete=False)
+        self.max_size = max_size
+        self.size = 0
+        self.header = b''
+        self.sha256 = hashlib.sha256()
+        self.committed = False
+    
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            # The parser drops the file on error, so clean up here
+            self.close()
+            raise RequestEntityTooLarge(f"Upload exceeds the {self.max_size // (1024 * 1024)} MB limit")
+        
+        if len(self.header) < len(PDF_HEADER):
+            self.header += data[:len(PDF_HEADER) - len(self.header)]
+        self.sha256.update(data)
+        return self.file.write(data)
+    
+    def __getattr__(self, name):
+        # Reading, seeking and flushing go to the temporary file; until it
+        # exists, e.g. when creating it failed, there is nothing to delegate to
+        if name == 'file':
+            raise AttributeError(name)
+        return getattr(self.file, name)
+    
+    def __iter__(self):
+        return iter(self.file)
+    
+    @property
+    def is_pdf(self):
+        """True if the upload starts with the PDF header."""
+        return self.header == PDF_HEADER
+    
+    def hexdigest(self):
+        """
+        Get the SHA-256 of the upload.
+        
+        Returns:
+            str: Hex digest of everything written so far
+        """
+        return self.sha256.hexdigest()
+    
+    def commit(self, file_path):
+        """
+        Atomically move the upload to its final path.
+        
+        Args:
+            file_path (str): Destination path, in the upload directory
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.file.name, file_path)
+        self.committed = True
+    
+    def close(self):
+        """Close the upload, deleting the temporary file unless it was committed."""
+        self.file.close()
+        if not self.committed and os.path.exists(self.file.name):
+            os.remove(self.file.name)
+
+class StreamingUploadRequest(Request):
+    """
+    Request class that streams uploaded files to disk instead of buffering them.
+    
+    Only uploads to the endpoints in stream_endpoints are streamed to
+    upload_dir; all other uploads use werkzeug's default temporary files.
+    Set upload_dir, max_upload_size and stream_endpoints on the subclass
+    or the app's request class before use.
+    """
+    
+    upload_dir = tempfile.gettempdir()
+    max_upload_size = 200 * 1024 * 1024
+    stream_endpoints = ()
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in self.stream_endpoints:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return UploadFile(self.upload_dir, self.max_upload_size)
@@ -74,6 +74,39 @@ const api = {
     }
   },
   
+  /**
+   * Build a query string from parameters, skipping empty values
+   * @param {Object} params - Query parameters
+   * @returns {string} - Query string including the leading '?', or ''
+   */
+  query(params = {}) {
+    const search = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        search.append(key, value);
+      }
+    });
+    const queryString = search.toString();
+    return queryString ? `?${queryString}` : '';
+  },
+  
+  /**
+   * Fetch every page of a paged endpoint by following nextCursor
+   * @param {Function} getPage - Function fetching one page for the given parameters
+   * @param {Object} params - Filter and sort parameters
+   * @returns {Promise} - Promise that resolves with the items of all pages
+   */
+  async allPages(getPage, params = {}) {
+    const items = [];
+    let cursor = null;
+    do {
+      const page = await getPage({ ...params, limit: 1000, cursor });
+      items.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return items;
+  },
+  
   /**
    * Authentication API endpoints
    */
@@ -187,7 +220,7 @@ const api = {
      * Send a form to recipients
      * @param {string} id - Form ID
      * @param {Object} data - Send form data (recipients, subject, message)
-     * @returns {Promise} - Promise that resolves with the send response
+     * @returns {Promise} - Promise that resolves with the queued job ({ jobId })
      */
     send(id, data) {
       return api.request(`/forms/${id}/send`, {
@@ -202,11 +235,21 @@ const api = {
    */
   recipients: {
     /**
-     * Get all recipients
-     * @returns {Promise} - Promise that resolves with the recipients list
+     * Get a page of recipients
+     * @param {Object} params - Paging, filter and sort parameters (limit, cursor, sort, order, status, form, dateFrom, dateTo)
+     * @returns {Promise} - Promise that resolves with the page ({ items, total, nextCursor })
      */
-    getAll() {
-      return api.request('/recipients');
+    getAll(params = {}) {
+      return api.request(`/recipients${api.query(params)}`);
+    },
+    
+    /**
+     * Get all recipients, fetching page after page
+     * @param {Object} params - Filter and sort parameters (sort, order, status, form, dateFrom, dateTo)
+     * @returns {Promise} - Promise that resolves with all matching recipients
+     */
+    getAllPages(params = {}) {
+      return api.allPages(page => this.getAll(page), params);
     },
     
     /**
@@ -273,16 +316,32 @@ const api = {
    */
   tracking: {
     /**
-     * Get all tracking records
-     * @returns {Promise} - Promise that resolves with the tracking list
+     * Get a page of tracking records
+     * @param {Object} params - Paging, filter and sort parameters (limit, cursor, sort, order, status, form, recipient, dateFrom, dateTo)
+     * @returns {Promise} - Promise that resolves with the page ({ items, total, nextCursor })
      */
-    getAll() {
-      return api.request('/tracking');
+    getAll(params = {}) {
+      return api.request(`/tracking${api.query(params)}`);
+    },
+    
+    /**
+     * Get a page of tracking records matching the filters
+     * @param {Object} filters - Filters (formId, recipientId, status)
+     * @param {string} cursor - Cursor of the next page (optional)
+     * @returns {Promise} - Promise that resolves with the page ({ items, total, nextCursor })
+     */
+    getFiltered(filters = {}, cursor = null) {
+      return this.getAll({
+        form: filters.formId,
+        recipient: filters.recipientId,
+        status: filters.status,
+        cursor
+      });
     },
     
     /**
      * Check for returned forms
-     * @returns {Promise} - Promise that resolves with the check response
+     * @returns {Promise} - Promise that resolves with the queued job ({ jobId })
      */
     checkReturns() {
       return api.request('/tracking/check-returns', {
@@ -318,7 +377,7 @@ const api = {
     /**
      * Extract data from forms
      * @param {Array} formIds - List of form IDs to extract data from
-     * @returns {Promise} - Promise that resolves with the extraction response
+     * @returns {Promise} - Promise that resolves with the queued job ({ jobId })
      */
     extractData(formIds) {
       return api.request('/extraction/extract', {
@@ -348,6 +407,106 @@ const api = {
     }
   },
   
+  /**
+   * Job API endpoints
+   */
+  jobs: {
+    /**
+     * Get the most recent jobs
+     * @param {Object} params - Filter parameters (status, limit)
+     * @returns {Promise} - Promise that resolves with the job list
+     */
+    getAll(params = {}) {
+      return api.request(`/jobs${api.query(params)}`);
+    },
+    
+    /**
+     * Get a job's status, progress and result
+     * @param {number} id - Job ID
+     * @returns {Promise} - Promise that resolves with the job
+     */
+    get(id) {
+      return api.request(`/jobs/${id}`);
+    },
+    
+    /**
+     * Cancel a queued or running job
+     * @param {number} id - Job ID
+     * @returns {Promise} - Promise that resolves with the updated job
+     */
+    cancel(id) {
+      return api.request(`/jobs/${id}/cancel`, {
+        method: 'POST'
+      });
+    },
+    
+    /**
+     * Wait for a job to finish, following its events
+     * @param {number} id - Job ID
+     * @returns {Promise} - Promise that resolves with the job result, or rejects if the job failed
+     */
+    wait(id) {
+      return new Promise((resolve, reject) => {
+        const check = async () => {
+          try {
+            const job = await this.get(id);
+            if (job.status === 'completed' || job.status === 'cancelled') {
+              source.close();
+              resolve(job.result);
+            } else if (job.status === 'failed') {
+              source.close();
+              reject(new Error(job.error || 'Job failed'));
+            }
+          } catch (error) {
+            source.close();
+            reject(error);
+          }
+        };
+        
+        // Check once the stream is open, in case the job finished before
+        const source = api.events.subscribe({
+          job: event => {
+            if (event.jobId === id) {
+              check();
+            }
+          }
+        });
+        source.addEventListener('open', check, { once: true });
+      });
+    }
+  },
+  
+  /**
+   * Event API endpoints
+   */
+  events: {
+    /**
+     * Subscribe to the server event stream
+     * @param {Object} handlers - Handlers by event type (job, progress, send, return, extraction)
+     * @returns {EventSource} - Event source; call close() to unsubscribe
+     */
+    subscribe(handlers) {
+      const token = localStorage.getItem('token');
+      const source = new EventSource(`${api.baseUrl}/events/stream${api.query({ jwt: token })}`);
+      
+      Object.entries(handlers).forEach(([type, handler]) => {
+        source.addEventListener(type, message => handler(JSON.parse(message.data)));
+      });
+      
+      return source;
+    },
+    
+    /**
+     * Long-poll for events, for clients without EventSource
+     * @param {number} after - ID of the last event seen (optional)
+     * @param {number} timeout - Seconds to wait for new events (optional)
+     * @returns {Promise} - Promise that resolves with { events, lastEventId }
+     */
+    poll(after, timeout) {
+      return api.request(`/events${api.query({ after, timeout })}`);
+    }
+  },
+  
   /**
    * Settings API endpoints
    */
@@ -18,6 +18,71 @@ function initDashboard() {
   
   // Set up event listeners
   setupDashboardEvents();
+  
+  // Apply sends, returns and extractions as they happen
+  subscribeDashboardEvents();
+}
+
+/**
+ * Update the dashboard from server events instead of reloading it
+ */
+function subscribeDashboardEvents() {
+  api.events.subscribe({
+    send: event => {
+      if (event.data.status === 'sent') {
+        incrementCount('emails-sent-count');
+        prependActivity(event.data.activity);
+      }
+    },
+    return: event => {
+      incrementCount('forms-returned-count');
+      prependActivity(event.data.activity);
+    },
+    extraction: event => {
+      if (event.data.activity) {
+        prependActivity(event.data.activity);
+      }
+    }
+  });
+}
+
+/**
+ * Increment a summary card count
+ * @param {string} id - Count element ID
+ */
+function incrementCount(id) {
+  const element = document.getElementById(id);
+  if (element) {
+    element.textContent = (parseInt(element.textContent, 10) || 0) + 1;
+  }
+}
+
+/**
+ * Add an activity row to the top of the activity table
+ * @param {Object} activity - Activity entry (date, activity, status)
+ */
+function prependActivity(activity) {
+  const tableBody = document.getElementById('activity-table-body');
+  
+  if (!tableBody || !activity) return;
+  
+  const emptyRow = tableBody.querySelector('.empty-row');
+  if (emptyRow) {
+    emptyRow.remove();
+  }
+  
+  const row = document.createElement('tr');
+  row.innerHTML = `
+    <td>${formatDate(activity.date)}</td>
+    <td>${activity.activity}</td>
+    <td><span class="status-badge status-${getStatusClass(activity.status)}">${activity.status}</span></td>
+  `;
+  tableBody.insertBefore(row, tableBody.firstChild);
+  
+  // Keep the table at the recent activity size
+  while (tableBody.children.length > 20) {
+    tableBody.removeChild(tableBody.lastChild);
+  }
 }
 
 /**
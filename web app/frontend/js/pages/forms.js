@@ -384,7 +384,7 @@ function viewForm(formId) {
 async function showSendFormModal(formId) {
   try {
     // Get recipients
-    const recipients = await api.recipients.getAll();
+    const recipients = await api.recipients.getAllPages();
     
     // Create recipients checkboxes
     let recipientsHtml = '';
@@ -493,8 +493,8 @@ async function showSendFormModal(formId) {
           sendFormBtn.disabled = true;
           sendFormBtn.innerHTML = '<span class="loading-spinner-sm"></span> Sending...';
           
-          // Send form
-          const result = await api.forms.send(formId, {
+          // Queue the form for sending
+          await api.forms.send(formId, {
             recipients: selectedRecipients,
             subject,
             message
@@ -505,7 +505,7 @@ async function showSendFormModal(formId) {
           
           // Show success notification
           ui.toast({
-            message: `Form sent to ${selectedRecipients.length} recipient(s) successfully!`,
+            message: `Sending form to ${selectedRecipients.length} recipient(s) in the background.`,
             type: 'success'
           });
         } catch (error) {
@@ -9,6 +9,9 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 });
 
+// Cursor of the next page of recipients, or null once all are shown
+let recipientsCursor = null;
+
 /**
  * Initialize recipients functionality
  */
@@ -28,11 +31,11 @@ async function loadRecipients() {
     // Show loading state
     showRecipientsLoading(true);
     
-    // Fetch recipients data from API
+    // Fetch the first page of recipients from API
     const recipients = await api.recipients.getAll();
     
     // Update recipients table
-    updateRecipientsTable(recipients);
+    showRecipientsPage(recipients);
     
     // Hide loading state
     showRecipientsLoading(false);
@@ -50,20 +53,71 @@ async function loadRecipients() {
   }
 }
 
+/**
+ * Load the next page of recipients below the ones shown
+ */
+async function loadMoreRecipients() {
+  const loadMoreBtn = document.getElementById('load-more-recipients-btn');
+  
+  try {
+    if (loadMoreBtn) {
+      loadMoreBtn.disabled = true;
+    }
+    
+    // Fetch the next page of recipients from API
+    const recipients = await api.recipients.getAll({ cursor: recipientsCursor });
+    
+    // Add the recipients to the table and keep the search applied
+    showRecipientsPage(recipients, true);
+    searchRecipients();
+  } catch (error) {
+    console.error('Error loading more recipients:', error);
+    
+    // Show error notification
+    ui.toast({
+      message: 'Error loading more recipients. Please try again.',
+      type: 'error'
+    });
+  } finally {
+    if (loadMoreBtn) {
+      loadMoreBtn.disabled = false;
+    }
+  }
+}
+
+/**
+ * Show a page of recipients and remember where the next page starts
+ * @param {Object} page - Page of recipients ({ items, total, nextCursor })
+ * @param {boolean} append - Whether to add the recipients below the ones shown
+ */
+function showRecipientsPage(page, append = false) {
+  updateRecipientsTable(page.items, append);
+  recipientsCursor = page.nextCursor;
+  
+  // Offer more recipients while there are further pages
+  const loadMore = document.querySelector('.recipients-page .table-load-more');
+  if (loadMore) {
+    loadMore.classList.toggle('hidden', !recipientsCursor);
+  }
+}
+
 /**
  * Update recipients table with recipients data
  * @param {Array} recipients - List of recipients
+ * @param {boolean} append - Whether to add the recipients below the ones shown
  */
-function updateRecipientsTable(recipients) {
+function updateRecipientsTable(recipients, append = false) {
   const tableBody = document.getElementById('recipients-table-body');
   
   if (!tableBody) return;
   
   // Clear table
-  tableBody.innerHTML = '';
+  if (!append) {
+    tableBody.innerHTML = '';
+  }
   
   // Check if there are recipients
-  if (recipients.length === 0) {
+  if (recipients.length === 0 && !append) {
     tableBody.innerHTML = `
       <tr class="empty-row">
         <td colspan="5">No recipients found</td>
@@ -73,6 +127,7 @@ function updateRecipientsTable(recipients) {
   }
   
   // Add recipient rows
+  const rows = document.createDocumentFragment();
   recipients.forEach(recipient => {
     const row = document.createElement('tr');
     row.setAttribute('data-id', recipient.id);
@@ -96,11 +151,12 @@ function updateRecipientsTable(recipients) {
       </td>
     `;
     
-    tableBody.appendChild(row);
+    rows.appendChild(row);
   });
   
-  // Add event listeners to recipient actions
-  setupRecipientActionEvents();
+  // Add event listeners to the new rows' actions
+  setupRecipientActionEvents(rows);
+  tableBody.appendChild(rows);
 }
 
 /**
@@ -130,14 +186,21 @@ function setupRecipientsEvents() {
   if (searchRecipientsInput) {
     searchRecipientsInput.addEventListener('input', ui.debounce(searchRecipients, 300));
   }
+  
+  // Load more recipients button
+  const loadMoreRecipientsBtn = document.getElementById('load-more-recipients-btn');
+  if (loadMoreRecipientsBtn) {
+    loadMoreRecipientsBtn.addEventListener('click', loadMoreRecipients);
+  }
 }
 
 /**
  * Set up recipient action event listeners
+ * @param {ParentNode} container - Element or fragment containing the rows (default: document)
  */
-function setupRecipientActionEvents() {
+function setupRecipientActionEvents(container = document) {
   // Edit recipient buttons
-  document.querySelectorAll('.edit-recipient').forEach(button => {
+  container.querySelectorAll('.edit-recipient').forEach(button => {
     button.addEventListener('click', (e) => {
       const recipientId = e.currentTarget.closest('tr').getAttribute('data-id');
       showEditRecipientModal(recipientId);
@@ -145,7 +208,7 @@ function setupRecipientActionEvents() {
   });
   
   // Send to recipient buttons
-  document.querySelectorAll('.send-to-recipient').forEach(button => {
+  container.querySelectorAll('.send-to-recipient').forEach(button => {
     button.addEventListener('click', (e) => {
       const recipientId = e.currentTarget.closest('tr').getAttribute('data-id');
       showSendToRecipientModal(recipientId);
@@ -153,7 +216,7 @@ function setupRecipientActionEvents() {
   });
   
   // Delete recipient buttons
-  document.querySelectorAll('.delete-recipient').forEach(button => {
+  container.querySelectorAll('.delete-recipient').forEach(button => {
     button.addEventListener('click', (e) => {
       const recipientId = e.currentTarget.closest('tr').getAttribute('data-id');
       confirmDeleteRecipient(recipientId);
@@ -500,8 +563,8 @@ async function showSendToRecipientModal(recipientId) {
           sendToRecipientBtn.disabled = true;
           sendToRecipientBtn.innerHTML = '<span class="loading-spinner-sm"></span> Sending...';
           
-          // Send form
-          const result = await api.forms.send(formId, {
+          // Queue the form for sending
+          await api.forms.send(formId, {
             recipients: [recipient],
             subject,
             message
@@ -512,7 +575,7 @@ async function showSendToRecipientModal(recipientId) {
           
           // Show success notification
           ui.toast({
-            message: `Form sent to ${recipient.name} successfully!`,
+            message: `Sending form to ${recipient.name} in the background.`,
             type: 'success'
           });
           
@@ -765,7 +828,7 @@ async function importRecipients() {
     
     // Show success notification
     ui.toast({
-      message: `${result.imported} recipients imported successfully!`,
+      message: `${result.imported} recipients imported (${result.duplicates} duplicates and ${result.invalid} invalid rows skipped).`,
       type: 'success'
     });
     
@@ -9,6 +9,10 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 });
 
+// Filters of the tracking records shown and the cursor of their next page
+let trackingFilters = {};
+let trackingCursor = null;
+
 /**
  * Initialize tracking functionality
  */
@@ -28,11 +32,12 @@ async function loadTracking() {
     // Show loading state
     showTrackingLoading(true);
     
-    // Fetch tracking data from API
+    // Fetch the first page of tracking data from API
     const tracking = await api.tracking.getAll();
     
     // Update tracking table
-    updateTrackingTable(tracking);
+    trackingFilters = {};
+    showTrackingPage(tracking);
     
     // Hide loading state
     showTrackingLoading(false);
@@ -50,20 +55,70 @@ async function loadTracking() {
   }
 }
 
+/**
+ * Load the next page of tracking records below the ones shown
+ */
+async function loadMoreTracking() {
+  const loadMoreBtn = document.getElementById('load-more-tracking-btn');
+  
+  try {
+    if (loadMoreBtn) {
+      loadMoreBtn.disabled = true;
+    }
+    
+    // Fetch the next page with the same filters
+    const tracking = await api.tracking.getFiltered(trackingFilters, trackingCursor);
+    
+    // Add the records to the table
+    showTrackingPage(tracking, true);
+  } catch (error) {
+    console.error('Error loading more tracking data:', error);
+    
+    // Show error notification
+    ui.toast({
+      message: 'Error loading more tracking data. Please try again.',
+      type: 'error'
+    });
+  } finally {
+    if (loadMoreBtn) {
+      loadMoreBtn.disabled = false;
+    }
+  }
+}
+
+/**
+ * Show a page of tracking records and remember where the next page starts
+ * @param {Object} page - Page of tracking records ({ items, total, nextCursor })
+ * @param {boolean} append - Whether to add the records below the ones shown
+ */
+function showTrackingPage(page, append = false) {
+  updateTrackingTable(page.items, append);
+  trackingCursor = page.nextCursor;
+  
+  // Offer more records while there are further pages
+  const loadMore = document.querySelector('.tracking-page .table-load-more');
+  if (loadMore) {
+    loadMore.classList.toggle('hidden', !trackingCursor);
+  }
+}
+
 /**
  * Update tracking table with tracking data
  * @param {Array} tracking - List of tracking records
+ * @param {boolean} append - Whether to add the records below the ones shown
  */
-function updateTrackingTable(tracking) {
+function updateTrackingTable(tracking, append = false) {
   const tableBody = document.getElementById('tracking-table-body');
   
   if (!tableBody) return;
   
   // Clear table
-  tableBody.innerHTML = '';
+  if (!append) {
+    tableBody.innerHTML = '';
+  }
   
   // Check if there are tracking records
-  if (tracking.length === 0) {
+  if (tracking.length === 0 && !append) {
     tableBody.innerHTML = `
       <tr class="empty-row">
         <td colspan="6">No tracking records found</td>
@@ -73,6 +128,7 @@ function updateTrackingTable(tracking) {
   }
   
   // Add tracking rows
+  const rows = document.createDocumentFragment();
   tracking.forEach(record => {
     const row = document.createElement('tr');
     row.setAttribute('data-id', record.id);
@@ -125,11 +181,12 @@ function updateTrackingTable(tracking) {
       </td>
     `;
     
-    tableBody.appendChild(row);
+    rows.appendChild(row);
   });
   
-  // Add event listeners to tracking actions
-  setupTrackingActionEvents();
+  // Add event listeners to the new rows' actions
+  setupTrackingActionEvents(rows);
+  tableBody.appendChild(rows);
 }
 
 /**
@@ -166,16 +223,23 @@ function setupTrackingEvents() {
     filterStatusSelect.addEventListener('change', filterTracking);
   }
   
+  // Load more tracking records button
+  const loadMoreTrackingBtn = document.getElementById('load-more-tracking-btn');
+  if (loadMoreTrackingBtn) {
+    loadMoreTrackingBtn.addEventListener('click', loadMoreTracking);
+  }
+  
   // Load filter options
   loadFilterOptions();
 }
 
 /**
  * Set up tracking action event listeners
+ * @param {ParentNode} container - Element or fragment containing the rows (default: document)
  */
-function setupTrackingActionEvents() {
+function setupTrackingActionEvents(container = document) {
   // View form buttons
-  document.querySelectorAll('.view-form').forEach(button => {
+  container.querySelectorAll('.view-form').forEach(button => {
     button.addEventListener('click', (e) => {
       const trackingId = e.currentTarget.closest('tr').getAttribute('data-id');
       viewForm(trackingId);
@@ -183,7 +247,7 @@ function setupTrackingActionEvents() {
   });
   
   // View return buttons
-  document.querySelectorAll('.view-return').forEach(button => {
+  container.querySelectorAll('.view-return').forEach(button => {
     button.addEventListener('click', (e) => {
       const trackingId = e.currentTarget.closest('tr').getAttribute('data-id');
       viewReturn(trackingId);
@@ -191,7 +255,7 @@ function setupTrackingActionEvents() {
   });
   
   // Extract data buttons
-  document.querySelectorAll('.extract-data').forEach(button => {
+  container.querySelectorAll('.extract-data').forEach(button => {
     button.addEventListener('click', (e) => {
       const trackingId = e.currentTarget.closest('tr').getAttribute('data-id');
       extractData(trackingId);
@@ -199,7 +263,7 @@ function setupTrackingActionEvents() {
   });
   
   // Resend form buttons
-  document.querySelectorAll('.resend-form').forEach(button => {
+  container.querySelectorAll('.resend-form').forEach(button => {
     button.addEventListener('click', (e) => {
       const trackingId = e.currentTarget.closest('tr').getAttribute('data-id');
       resendForm(trackingId);
@@ -233,7 +297,7 @@ async function loadFilterOptions() {
     }
     
     // Get recipients
-    const recipients = await api.recipients.getAll();
+    const recipients = await api.recipients.getAllPages();
     
     // Update recipient filter
     const filterRecipientSelect = document.getElementById('filter-recipient');
@@ -284,11 +348,12 @@ async function filterTracking() {
       filters.status = status;
     }
     
-    // Fetch filtered tracking data
+    // Fetch the first page of filtered tracking data
     const tracking = await api.tracking.getFiltered(filters);
     
     // Update tracking table
-    updateTrackingTable(tracking);
+    trackingFilters = filters;
+    showTrackingPage(tracking);
     
     // Hide loading state
     showTrackingLoading(false);
@@ -318,8 +383,9 @@ async function checkReturns() {
       checkReturnsBtn.innerHTML = '<span class="loading-spinner-sm"></span> Checking...';
     }
     
-    // Check for returns
-    const result = await api.tracking.checkReturns();
+    // Check for returns and wait for the background job
+    const job = await api.tracking.checkReturns();
+    const result = await api.jobs.wait(job.jobId);
     
     // Show success notification
     ui.toast({
@@ -301,13 +301,17 @@ document.getElementById('loginForm').addEventListener('submit', function(e) {
 });
 EOL
 
-# Create a production-ready gunicorn configuration
+# Create a production-ready gunicorn configuration, unless the backend ships one
+if [ ! -f /home/ubuntu/email_form_system/web_app/backend/gunicorn_config.py ]; then
 echo "Creating production-ready gunicorn configuration..."
 cat > /home/ubuntu/email_form_system/web_app/backend/gunicorn_config.py << EOL
 bind = "0.0.0.0:5000"
+worker_class = "gthread"
 workers = 4
+threads = 8
 timeout = 120
 EOL
+fi
 
 # Create a systemd service file for the application
 echo "Creating systemd service file..."
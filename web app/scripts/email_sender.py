@@ -10,33 +10,34 @@ import os
 import sys
 import datetime
 import pandas as pd
-from O365 import Account, FileSystemTokenBackend
 from O365.message import Message, MessageAttachment
 
+# Imported as part of the scripts package by the web app, or directly when run as a script
+try:
+    from scripts import m365_session
+except ImportError:
+    import m365_session
+
 class EmailFormSender:
-    def __init__(self, client_id, client_secret, token_path='./o365_token'):
+    def __init__(self, client_id=None, client_secret=None, token_path=None):
         """
         Initialize the EmailFormSender with Microsoft 365 credentials.
         
         Args:
-            client_id (str): Microsoft 365 application client ID
-            client_secret (str): Microsoft 365 application client secret
-            token_path (str): Path to store authentication tokens
+            client_id (str, optional): Microsoft 365 application client ID, the configured session's by default
+            client_secret (str, optional): Microsoft 365 application client secret
+            token_path (str, optional): Path to store authentication tokens
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_path = token_path
         
-        # Ensure token directory exists
-        os.makedirs(os.path.dirname(token_path), exist_ok=True)
-        
-        # Set up authentication with Microsoft 365
-        self.token_backend = FileSystemTokenBackend(token_path=token_path)
-        self.account = Account((client_id, client_secret), token_backend=self.token_backend)
+        # Use the shared Microsoft 365 session for these credentials
+        self.account = m365_session.get_account(client_id, client_secret, token_path)
+        self.token_backend = self.account.con.token_backend
         
         # Define required scopes for email and SharePoint access
-        self.scopes = ['offline_access', 'message_all', 'mail.readwrite', 'mail.send', 
-                       'files.readwrite.all', 'sites.readwrite.all']
+        self.scopes = m365_session.SCOPES
     
     def authenticate(self):
         """
@@ -45,11 +46,35 @@ class EmailFormSender:
         Returns:
             bool: True if authentication is successful, False otherwise
         """
-        if not self.account.is_authenticated:
-            # Initiate authentication flow
-            result = self.account.authenticate(scopes=self.scopes)
-            return result
-        return True
+        return m365_session.authenticate(self.account, self.scopes)
+    
+    def send_email(self, email, name, subject, body, form_path):
+        """
+        Send an email with a form attachment to one recipient.
+        
+        Args:
+            email (str): Recipient email address
+            name (str): Recipient name
+            subject (str): Subject line for the email
+            body (str): Body text for the email
+            form_path (str): Path to the PDF form to attach
+            
+        Returns:
+            bool: True if the email was sent, False otherwise
+        """
+        # Create a new message
+        message = Message(parent=self.account.mailbox())
+        message.subject = subject
+        message.body = body
+        message.to.add((email, name))
+        
+        # Attach the form
+        with open(form_path, 'rb') as form_file:
+            form_content = form_file.read()
+        message.attachments.add((os.path.basename(form_path), form_content))
+        
+        # Send the message
+        return message.send()
     
     def send_form_emails(self, recipients_file, email_subject, email_body, form_path):
         """
@@ -85,27 +110,12 @@ class EmailFormSender:
         if 'Form Status' not in tracking_df.columns:
             tracking_df['Form Status'] = 'Not Returned'
         
-        # Get the mailbox
-        mailbox = self.account.mailbox()
-        
         # Process each recipient
         for index, recipient in tracking_df.iterrows():
             if pd.notna(recipient['Email']) and recipient['Email'].strip():
                 try:
-                    # Create a new message
-                    message = Message(parent=mailbox)
-                    message.subject = email_subject
-                    message.body = email_body.replace('{Name}', recipient['Name'])
-                    message.to.add(recipient['Email'])
-                    
-                    # Attach the form
-                    with open(form_path, 'rb') as form_file:
-                        form_content = form_file.read()
-                    form_name = os.path.basename(form_path)
-                    message.attachments.add((form_name, form_content))
-                    
-                    # Send the message
-                    if message.send():
+                    body = email_body.replace('{Name}', recipient['Name'])
+                    if self.send_email(recipient['Email'], recipient['Name'], email_subject, body, form_path):
                         # Update tracking information
                         tracking_df.at[index, 'Date Sent'] = datetime.datetime.now()
                         tracking_df.at[index, 'Email Status'] = 'Sent'
@@ -185,6 +195,24 @@ class EmailFormSender:
         tracking_df.to_excel(tracking_file, index=False)
         return tracking_df
 
+def send_email(email, name, subject, body, form_path, sender=None):
+    """
+    Send an email with a form attachment to one recipient.
+    
+    A RuntimeError is raised if the email could not be sent.
+    
+    Args:
+        email (str): Recipient email address
+        name (str): Recipient name
+        subject (str): Subject line for the email
+        body (str): Body text for the email
+        form_path (str): Path to the PDF form to attach
+        sender (EmailFormSender, optional): Authenticated sender, one using the configured shared session by default
+    """
+    sender = sender or EmailFormSender()
+    if not sender.send_email(email, name, subject, body, form_path):
+        raise RuntimeError(f"Failed to send email to {email}")
+
 def create_tracking_spreadsheet(output_file, recipients_list=None):
     """
     Create or update a tracking spreadsheet for email form distribution.
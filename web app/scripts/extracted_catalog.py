@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Extracted Data Catalog
+
+This script maintains a persistent SQLite catalog of the JSON files written by
+the PDF data extractor. Each file gets a stable ID, and only files whose
+modification time or size changed since the last refresh are re-parsed.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import contextlib
+from datetime import datetime
+
+# IDs looked up per query, well below SQLite's limit on query parameters
+MAX_QUERY_IDS = 500
+
+class ExtractedDataCatalog:
+    def __init__(self, extracted_dir, db_path=None):
+        """
+        Initialize the catalog for a directory of extracted data files.
+        
+        Args:
+            extracted_dir (str): Directory containing extracted data JSON files
+            db_path (str, optional): Path to the SQLite catalog file
+        """
+        self.extracted_dir = extracted_dir
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.abspath(extracted_dir)), 'extracted_catalog.db')
+        
+        # Create the catalog schema if it doesn't exist
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL UNIQUE,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    form_name TEXT,
+                    recipient TEXT,
+                    email TEXT,
+                    extraction_date TEXT,
+                    extraction_methods TEXT,
+                    fields TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_records_extraction_date ON records (extraction_date)')
+    
+    @contextlib.contextmanager
+    def _connect(self):
+        """
+        Open a connection to the catalog database for one transaction.
+        
+        The transaction is committed when the block succeeds and rolled
+        back when it raises; the connection is closed either way.
+        
+        Returns:
+            sqlite3.Connection: Connection with row access by column name
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _summarize(data, stat_result):
+        """
+        Build the catalog columns for an extracted data file.
+        
+        Args:
+            data (dict): Extracted data in the PDFDataExtractor JSON layout
+            stat_result (os.stat_result): File status of the JSON file
+        
+        Returns:
+            dict: Catalog column values
+        """
+        metadata = data.get('metadata', {})
+        extracted_data = data.get('extracted_data', {}) or {}
+        return {
+            'mtime_ns': stat_result.st_mtime_ns,
+            'size': stat_result.st_size,
+            'form_name': os.path.splitext(os.path.basename(metadata.get('filename', 'Unknown')))[0],
+            'recipient': extracted_data.get('name', 'Unknown'),
+            'email': extracted_data.get('email', 'unknown@example.com'),
+            'extraction_date': datetime.fromtimestamp(stat_result.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+            'extraction_methods': ','.join(metadata.get('extraction_methods', [])),
+            'fields': json.dumps(extracted_data)
+        }
+    
+    def _upsert(self, conn, filename, summary):
+        """
+        Insert or update a catalog row, keeping the existing ID.
+        
+        Args:
+            conn (sqlite3.Connection): Open catalog connection
+            filename (str): JSON file name relative to the extracted directory
+            summary (dict): Catalog column values
+        """
+        conn.execute('''
+            INSERT INTO records (filename, mtime_ns, size, form_name, recipient, email,
+                                 extraction_date, extraction_methods, fields)
+            VALUES (:filename, :mtime_ns, :size, :form_name, :recipient, :email,
+                    :extraction_date, :extraction_methods, :fields)
+            ON CONFLICT(filename) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size = excluded.size,
+                form_name = excluded.form_name,
+                recipient = excluded.recipient,
+                email = excluded.email,
+                extraction_date = excluded.extraction_date,
+                extraction_methods = excluded.extraction_methods,
+                fields = excluded.fields
+        ''', dict(summary, filename=filename))
+    
+    def record_file(self, file_path, data=None):
+        """
+        Add or update a single extracted data file in the catalog.
+        
+        Called by extraction right after it writes its output, so the
+        catalog stays current without a directory scan.
+        
+        Args:
+            file_path (str): Path to the extracted data JSON file
+            data (dict, optional): Data that was written, loaded from the file if None
+        
+        Returns:
+            int: Catalog ID of the record
+        """
+        if data is None:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+        
+        filename = os.path.basename(file_path)
+        with self._connect() as conn:
+            self._upsert(conn, filename, self._summarize(data, os.stat(file_path)))
+            row = conn.execute('SELECT id FROM records WHERE filename = ?', (filename,)).fetchone()
+        return row['id']
+    
+    def refresh(self):
+        """
+        Bring the catalog in line with the extracted data directory.
+        
+        Only files that are new, or whose modification time or size changed,
+        are parsed. Rows for deleted files are removed.
+        
+        Returns:
+            dict: Counts of added/updated and removed records
+        """
+        results = {'updated': 0, 'removed': 0}
+        if not os.path.isdir(self.extracted_dir):
+            return results
+        
+        with self._connect() as conn:
+            known = {
+                row['filename']: (row['mtime_ns'], row['size'])
+                for row in conn.execute('SELECT filename, mtime_ns, size FROM records')
+            }
+            
+            seen = set()
+            with os.scandir(self.extracted_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+                    
+                    seen.add(entry.name)
+                    stat_result = entry.stat()
+                    if known.get(entry.name) == (stat_result.st_mtime_ns, stat_result.st_size):
+                        continue
+                    
+                    try:
+                        with open(entry.path, 'r') as f:
+                            data = json.load(f)
+                        self._upsert(conn, entry.name, self._summarize(data, stat_result))
+                        results['updated'] += 1
+                    except Exception as e:
+                        print(f"Error loading extracted data from {entry.name}: {e}")
+            
+            removed = [(filename,) for filename in known if filename not in seen]
+            if removed:
+                conn.executemany('DELETE FROM records WHERE filename = ?', removed)
+                results['removed'] = len(removed)
+        
+        return results
+    
+    @staticmethod
+    def _to_dict(row):
+        """
+        Convert a catalog row to the extracted data summary format.
+        
+        Args:
+            row (sqlite3.Row): Catalog row
+        
+        Returns:
+            dict: Extracted data summary
+        """
+        return {
+            'id': row['id'],
+            'formName': row['form_name'],
+            'recipient': row['recipient'],
+            'email': row['email'],
+            'extractionDate': row['extraction_date'],
+            'extractionMethod': row['extraction_methods'],
+            'fields': json.loads(row['fields']) if row['fields'] else {}
+        }
+    
+    def query(self, offset=0, limit=None):
+        """
+        Get a page of catalog records, newest extraction first.
+        
+        Args:
+            offset (int): Number of records to skip
+            limit (int, optional): Maximum number of records to return
+        
+        Returns:
+            tuple: (list of record dictionaries, total record count)
+        """
+        with self._connect() as conn:
+            total = conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+            rows = conn.execute(
+                'SELECT * FROM records ORDER BY extraction_date DESC, id DESC LIMIT ? OFFSET ?',
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        
+        return [self._to_dict(row) for row in rows], total
+    
+    def get_paths(self, record_ids):
+        """
+        Resolve catalog IDs to extracted data file paths.
+        
+        IDs may be given as integers or as strings, as sent by the web
+        frontend; IDs that are not numbers are ignored.
+        
+        Args:
+            record_ids (list): List of catalog IDs
+        
+        Returns:
+            dict: Mapping of each requested ID found, as given, to its JSON file path
+        """
+        requested = {}
+        for record_id in record_ids:
+            try:
+                requested.setdefault(int(record_id), []).append(record_id)
+            except (TypeError, ValueError):
+                continue
+        
+        ids = list(requested)
+        paths = {}
+        with self._connect() as conn:
+            for start in range(0, len(ids), MAX_QUERY_IDS):
+                chunk = ids[start:start + MAX_QUERY_IDS]
+                placeholders = ','.join('?' for _ in chunk)
+                for row in conn.execute(f'SELECT id, filename FROM records WHERE id IN ({placeholders})', chunk):
+                    for record_id in requested[row['id']]:
+                        paths[record_id] = os.path.join(self.extracted_dir, row['filename'])
+        
+        return paths
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    if len(sys.argv) < 2:
+        print("Usage: python extracted_catalog.py <extracted_dir> [db_path]")
+        sys.exit(1)
+    
+    catalog = ExtractedDataCatalog(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    results = catalog.refresh()
+    records, total = catalog.query()
+    
+    print(f"Catalog refreshed: {results['updated']} updated, {results['removed']} removed")
+    print(f"{total} extracted records:")
+    for record in records:
+        print(f"  [{record['id']}] {record['formName']} - {record['recipient']} ({record['email']})")
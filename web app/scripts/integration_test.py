@@ -15,7 +15,9 @@ import sys
 import json
 import shutil
 import argparse
+import threading
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Add scripts directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -26,7 +28,8 @@ from create_sample_tracking import create_sample_tracking_spreadsheet
 from tracking_database import TrackingDatabase
 from pdf_extractor import PDFDataExtractor, process_pdf_batch
 from excel_transfer import process_extracted_data
-from sharepoint_onedrive import SharePointOneDriveIntegration
+from sharepoint_onedrive import SharePointOneDriveIntegration, DriveThrottle
+from m365_session import PooledConnection
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -212,6 +215,70 @@ def test_cloud_storage(assets, excel_results, client_id=None, client_secret=None
         print(f"Error testing cloud storage: {e}")
         return {}
 
+def test_drive_throttling(throttled_requests=3):
+    """
+    Test that throttled Graph responses reach the shared drive back-off.
+    
+    A local server answers the first requests with 429 and a Retry-After
+    header. The request goes through a real pooled Connection session,
+    whose own retries run out first, and must then be retried by the
+    DriveThrottle after the Retry-After delay.
+    
+    Args:
+        throttled_requests (int): Number of requests answered with 429
+        
+    Returns:
+        dict: Dictionary with throttling results, empty if the test failed
+    """
+    received = []
+    
+    class ThrottlingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            received.append(self.path)
+            if len(received) <= throttled_requests:
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                body = b'{"value": []}'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # One retry inside the session, so the throttle has to handle the rest
+        connection = PooledConnection(('test-client', 'test-secret'), request_retries=1)
+        throttle = DriveThrottle()
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1.0/me/drive/root/children"
+        
+        response = throttle.call(connection.naive_request, url, 'get')
+        results = {
+            'status_code': response.status_code,
+            'requests': len(received),
+            'backed_off': throttle.resume_at > 0
+        }
+        print(f"Throttled request completed after {results['requests']} requests")
+        
+        if response.status_code != 200 or not results['backed_off']:
+            print("Throttling was not handled by the drive back-off")
+            return {}
+        return results
+    
+    except Exception as e:
+        print(f"Error testing drive throttling: {e}")
+        return {}
+    finally:
+        server.shutdown()
+        server.server_close()
+
 def run_complete_workflow_test(client_id=None, client_secret=None):
     """
     Run a complete workflow test of the email form system.
@@ -228,7 +295,8 @@ def run_complete_workflow_test(client_id=None, client_secret=None):
         'assets': {},
         'extraction': {},
         'excel': {},
-        'cloud': {}
+        'cloud': {},
+        'throttling': {}
     }
     
     # Step 1: Set up test environment
@@ -258,6 +326,9 @@ def run_complete_workflow_test(client_id=None, client_secret=None):
     cloud_results = test_cloud_storage(assets, excel_results, client_id, client_secret)
     results['cloud'] = cloud_results
     
+    # Step 6: Test throttling of cloud storage requests
+    results['throttling'] = test_drive_throttling()
+    
     # Print summary
     print("\nWorkflow Test Summary:")
     print(f"  Environment Setup: {'Success' if results['setup'] else 'Failed'}")
@@ -265,6 +336,7 @@ def run_complete_workflow_test(client_id=None, client_secret=None):
     print(f"  PDF Extraction: {'Success' if results['extraction'] else 'Failed'}")
     print(f"  Excel Transfer: {'Success' if results['excel'] else 'Failed'}")
     print(f"  Cloud Storage: {'Success' if results['cloud'] else 'Skipped' if not client_id else 'Failed'}")
+    print(f"  Drive Throttling: {'Success' if results['throttling'] else 'Failed'}")
     
     return results
 
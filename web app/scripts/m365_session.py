@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Microsoft 365 Session
+
+This script provides one shared, authenticated Microsoft 365 session for the
+email sender, the SharePoint/OneDrive integration and the command line and
+web entry points. Each set of credentials and token path gets a single
+Account, so the token is loaded from disk once, kept in memory, refreshed
+once for everyone and written back to the token file when it changes. The
+account's HTTP sessions keep a pool of keep-alive connections, so requests
+from all components reuse open TLS connections.
+"""
+
+import os
+import sys
+import threading
+from requests.adapters import HTTPAdapter
+from O365 import Account, FileSystemTokenBackend
+from O365.connection import Connection
+
+# Scopes of all components, requested together so one token serves them all
+SCOPES = ['offline_access', 'message_all', 'mail.readwrite', 'mail.send',
+          'files.readwrite.all', 'sites.readwrite.all']
+
+# Keep-alive connections kept open per host, enough for concurrent uploads and downloads
+POOL_MAXSIZE = 16
+
+# Default token location, used when no token path is given
+DEFAULT_TOKEN_PATH = './o365_token'
+
+class PooledConnection(Connection):
+    """Connection whose HTTP sessions keep a larger pool of keep-alive connections."""
+    
+    def get_session(self, load_token=False):
+        return self._pooled(super().get_session(load_token))
+    
+    def get_naive_session(self):
+        return self._pooled(super().get_naive_session())
+    
+    @staticmethod
+    def _pooled(session):
+        """
+        Mount pooled adapters on a session, keeping its retry policy.
+        
+        Once the retries of a throttled (429/503) or failing request run
+        out, the last response is returned instead of a RetryError, so
+        callers see its status and Retry-After header; the drive throttle
+        of sharepoint_onedrive relies on this to pause all threads.
+        
+        Args:
+            session (requests.Session): Session to configure
+        
+        Returns:
+            requests.Session: The same session
+        """
+        for prefix in ('http://', 'https://'):
+            retry = session.get_adapter(prefix).max_retries.new(raise_on_status=False)
+            session.mount(prefix, HTTPAdapter(pool_maxsize=POOL_MAXSIZE, max_retries=retry))
+        return session
+
+class PooledAccount(Account):
+    """Account that connects through a PooledConnection."""
+    
+    connection_constructor = PooledConnection
+
+_accounts = {}
+_default = None
+_lock = threading.Lock()
+_auth_lock = threading.Lock()
+
+def configure(client_id, client_secret, token_path=None):
+    """
+    Set the credentials used when get_account() is called without them.
+    
+    Args:
+        client_id (str): Microsoft 365 application client ID
+        client_secret (str): Microsoft 365 application client secret
+        token_path (str, optional): Path to store authentication tokens
+    """
+    global _default
+    with _lock:
+        _default = (client_id, client_secret, token_path or DEFAULT_TOKEN_PATH)
+
+def get_account(client_id=None, client_secret=None, token_path=None):
+    """
+    Get the shared account for a set of credentials, creating it on first use.
+    
+    Args:
+        client_id (str, optional): Microsoft 365 application client ID, the configured one by default
+        client_secret (str, optional): Microsoft 365 application client secret
+        token_path (str, optional): Path to store authentication tokens
+    
+    Returns:
+        Account: Shared account
+    """
+    if client_id is None:
+        if _default is None:
+            raise RuntimeError("Microsoft 365 credentials are not configured")
+        client_id, client_secret, default_token_path = _default
+        token_path = token_path or default_token_path
+    
+    token_path = os.path.abspath(token_path or DEFAULT_TOKEN_PATH)
+    key = (client_id, client_secret, token_path)
+    
+    with _lock:
+        account = _accounts.get(key)
+        if account is None:
+            # Ensure token directory exists
+            os.makedirs(os.path.dirname(token_path), exist_ok=True)
+            
+            token_backend = FileSystemTokenBackend(token_path=token_path)
+            account = PooledAccount((client_id, client_secret), token_backend=token_backend)
+            _accounts[key] = account
+        return account
+
+def authenticate(account, scopes=None):
+    """
+    Authenticate an account with Microsoft 365 if it has no valid token yet.
+    
+    Args:
+        account (Account): Account to authenticate
+        scopes (list, optional): Scopes to request, all components' scopes by default
+    
+    Returns:
+        bool: True if authentication is successful, False otherwise
+    """
+    # Serialized so only one caller runs the interactive flow
+    with _auth_lock:
+        if account.is_authenticated:
+            return True
+        return account.authenticate(requested_scopes=scopes or SCOPES)
+
+def reset():
+    """Forget all shared accounts, e.g. after credentials were changed or revoked."""
+    global _default
+    with _lock:
+        _accounts.clear()
+        _default = None
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    if len(sys.argv) < 3:
+        print("Usage: python m365_session.py <client_id> <client_secret> [token_path]")
+        sys.exit(1)
+    
+    account = get_account(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    if authenticate(account):
+        print("Authentication successful")
+    else:
+        print("Authentication failed")
+        sys.exit(1)
@@ -15,11 +15,110 @@ import os
 import sys
 import re
 import json
+import hashlib
 import subprocess
 import tempfile
 from pypdf import PdfReader
 import pandas as pd
 
+# AcroForm field types by /FT value
+FIELD_TYPES = {'/Tx': 'text', '/Btn': 'button', '/Ch': 'choice', '/Sig': 'signature'}
+
+def inherited_value(field, key):
+    """
+    Get a field attribute, following /Parent links for inherited attributes.
+    
+    Args:
+        field (DictionaryObject): Field or widget annotation
+        key (str): Attribute key, e.g. '/FT' or '/V'
+        
+    Returns:
+        The attribute value, or None if not set
+    """
+    while field is not None:
+        if key in field:
+            return field[key]
+        parent = field.get('/Parent')
+        field = parent.get_object() if parent is not None else None
+    return None
+
+def qualified_field_name(field):
+    """
+    Get the fully qualified name of a field, e.g. 'address.city'.
+    
+    Args:
+        field (DictionaryObject): Field or widget annotation
+        
+    Returns:
+        str: Qualified field name, '' if the field has no name
+    """
+    parts = []
+    while field is not None:
+        if '/T' in field:
+            parts.append(str(field['/T']))
+        parent = field.get('/Parent')
+        field = parent.get_object() if parent is not None else None
+    return '.'.join(reversed(parts))
+
+def form_fingerprint(reader):
+    """
+    Identify a form layout from its page count and top-level field names.
+    
+    Only the top-level /Fields array is read, so a returned form can be
+    matched to its template without walking the field tree.
+    
+    Args:
+        reader (PdfReader): Open PDF
+        
+    Returns:
+        str: Fingerprint, equal for forms filled in from the same template
+    """
+    names = []
+    acroform = reader.trailer['/Root'].get('/AcroForm')
+    if acroform is not None:
+        for field in acroform.get_object().get('/Fields', []):
+            names.append(str(field.get_object().get('/T', '')))
+    return hashlib.sha256(json.dumps([len(reader.pages), sorted(names)]).encode()).hexdigest()
+
+def extract_field_schema(reader):
+    """
+    Extract the AcroForm field schema of a form template.
+    
+    Every widget is recorded with its page and its index in the page's
+    /Annots array, so filled-in copies of the template can be read with
+    direct lookups.
+    
+    Args:
+        reader (PdfReader): Open PDF
+        
+    Returns:
+        dict: 'fingerprint' and 'fields' (name, type, page, rect, annot)
+    """
+    fields = []
+    for page_index, page in enumerate(reader.pages):
+        annots = page.get('/Annots')
+        if annots is None:
+            continue
+        
+        for annot_index, annot in enumerate(annots.get_object()):
+            annot = annot.get_object()
+            if annot.get('/Subtype') != '/Widget':
+                continue
+            
+            name = qualified_field_name(annot)
+            if not name:
+                continue
+            
+            fields.append({
+                'name': name,
+                'type': FIELD_TYPES.get(inherited_value(annot, '/FT'), 'unknown'),
+                'page': page_index,
+                'rect': [float(value) for value in annot.get('/Rect', [])],
+                'annot': annot_index
+            })
+    
+    return {'fingerprint': form_fingerprint(reader), 'fields': fields}
+
 class PDFDataExtractor:
     def __init__(self, form_path):
         """
@@ -38,10 +137,39 @@ class PDFDataExtractor:
         if not form_path.lower().endswith('.pdf'):
             raise ValueError(f"File is not a PDF: {form_path}")
     
-    def extract_form_fields(self):
+    def extract_fields_with_schema(self, reader, schema):
+        """
+        Read form field values at the widget positions recorded in a template schema.
+        
+        Args:
+            reader (PdfReader): Open PDF
+            schema (dict): Template schema from extract_field_schema
+            
+        Returns:
+            dict: Field names and values, or None if the form doesn't match the schema
+        """
+        form_data = {}
+        for field in schema['fields']:
+            try:
+                annot = reader.pages[field['page']]['/Annots'].get_object()[field['annot']].get_object()
+            except (IndexError, KeyError):
+                return None
+            
+            if qualified_field_name(annot) != field['name']:
+                return None
+            
+            if field['name'] not in form_data or form_data[field['name']] is None:
+                form_data[field['name']] = inherited_value(annot, '/V')
+        
+        return form_data
+    
+    def extract_form_fields(self, schema=None):
         """
         Extract form fields from a fillable PDF form.
         
+        Args:
+            schema (dict, optional): Field schema of the form's template, for direct lookups
+        
         Returns:
             dict: Dictionary of form field names and values
         """
@@ -49,6 +177,13 @@ class PDFDataExtractor:
             # Open the PDF
             reader = PdfReader(self.form_path)
             
+            # Read the fields directly if the form matches its template
+            if schema:
+                form_data = self.extract_fields_with_schema(reader, schema)
+                if form_data is not None:
+                    return form_data
+                print(f"Form {self.form_path} doesn't match its template schema, reading all fields")
+            
             # Check if the PDF has form fields
             if reader.get_fields():
                 # Extract form fields
@@ -233,12 +368,13 @@ class PDFDataExtractor:
         
         return table_data
     
-    def extract_all_data(self, custom_patterns=None):
+    def extract_all_data(self, custom_patterns=None, schema=None):
         """
         Extract all data from the PDF using multiple methods.
         
         Args:
             custom_patterns (dict, optional): Dictionary of custom field patterns
+            schema (dict, optional): Field schema of the form's template
             
         Returns:
             dict: Dictionary containing all extracted data
@@ -256,7 +392,7 @@ class PDFDataExtractor:
         }
         
         # Try form field extraction
-        form_fields = self.extract_form_fields()
+        form_fields = self.extract_form_fields(schema)
         if form_fields:
             result['form_fields'] = form_fields
             result['metadata']['extraction_methods'].append('form_fields')
@@ -287,13 +423,14 @@ class PDFDataExtractor:
         
         return result
     
-    def save_extracted_data(self, output_file, data=None):
+    def save_extracted_data(self, output_file, data=None, catalog=None):
         """
         Save extracted data to a JSON file.
         
         Args:
             output_file (str): Path to save the extracted data
             data (dict, optional): Data to save, if None, extract all data
+            catalog (ExtractedDataCatalog, optional): Catalog to record the saved file in
             
         Returns:
             str: Path to the saved file
@@ -306,6 +443,10 @@ class PDFDataExtractor:
         with open(output_file, 'w') as f:
             json.dump(data, f, indent=2)
         
+        # Keep the extracted data catalog current
+        if catalog is not None:
+            catalog.record_file(output_file, data)
+        
         return output_file
     
     def extract_to_dataframe(self, custom_patterns=None):
@@ -339,7 +480,7 @@ class PDFDataExtractor:
         
         return df
 
-def process_pdf_batch(pdf_dir, output_dir, custom_patterns=None):
+def process_pdf_batch(pdf_dir, output_dir, custom_patterns=None, catalog=None, forms_registry=None):
     """
     Process a batch of PDF files and extract data.
     
@@ -347,6 +488,8 @@ def process_pdf_batch(pdf_dir, output_dir, custom_patterns=None):
         pdf_dir (str): Directory containing PDF files
         output_dir (str): Directory to save extracted data
         custom_patterns (dict, optional): Dictionary of custom field patterns
+        catalog (ExtractedDataCatalog, optional): Catalog to record saved files in
+        forms_registry (FormsRegistry, optional): Registry to match forms to template schemas
         
     Returns:
         pd.DataFrame: DataFrame containing extracted data from all PDFs
@@ -368,13 +511,18 @@ def process_pdf_batch(pdf_dir, output_dir, custom_patterns=None):
         print(f"Processing {pdf_file}...")
         
         try:
+            # Match the form to its template schema
+            schema = None
+            if forms_registry is not None:
+                schema = forms_registry.match_schema(form_fingerprint(PdfReader(pdf_path)))
+            
             # Extract data
             extractor = PDFDataExtractor(pdf_path)
-            data = extractor.extract_all_data(custom_patterns)
+            data = extractor.extract_all_data(custom_patterns, schema)
             
             # Save extracted data
             output_file = os.path.join(output_dir, f"{os.path.splitext(pdf_file)[0]}_data.json")
-            extractor.save_extracted_data(output_file, data)
+            extractor.save_extracted_data(output_file, data, catalog)
             
             # Add to combined data
             combined_data = {}